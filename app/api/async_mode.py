@@ -0,0 +1,60 @@
+import asyncio
+import functools
+import inspect
+from typing import List
+from fastapi import APIRouter, params
+from fastapi.routing import APIRoute
+from app.core.database import get_read_session, get_session, run_in_session
+
+# Dependencies that hand a route its database session. In async mode
+# main.py overrides them to yield an AsyncSession instead.
+SESSION_DEPENDENCIES = {get_session, get_read_session}
+
+ROUTE_OPTIONS = (
+    "response_model", "status_code", "tags", "dependencies", "summary", "description",
+    "response_description", "responses", "deprecated", "methods", "operation_id",
+    "response_model_include", "response_model_exclude", "response_model_by_alias",
+    "response_model_exclude_unset", "response_model_exclude_defaults", "response_model_exclude_none",
+    "include_in_schema", "response_class", "name", "callbacks", "openapi_extra",
+    "generate_unique_id_function",
+)
+
+
+def _session_params(endpoint) -> List[str]:
+    return [
+        name for name, param in inspect.signature(endpoint).parameters.items()
+        if isinstance(param.default, params.Depends) and param.default.dependency in SESSION_DEPENDENCIES
+    ]
+
+
+def _async_endpoint(endpoint, session_param: str):
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        session = kwargs.pop(session_param)
+        return await run_in_session(session, lambda sync_session: endpoint(**kwargs, **{session_param: sync_session}))
+    return wrapper
+
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    """Return a copy of ``router`` whose sync, session-using endpoints are
+    ``async def`` wrappers.
+
+    The wrapper runs the original handler body through
+    ``AsyncSession.run_sync``, so it executes on the event loop against the
+    async driver instead of occupying a threadpool slot, and the handlers in
+    ``app/api/*.py`` stay the single source of route logic for both modes.
+    Handlers that also do blocking work other than queries (password
+    hashing) are written ``async def`` and are left as they are.
+    """
+    async_router = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+        endpoint = route.endpoint
+        session_params = _session_params(endpoint)
+        if session_params and not asyncio.iscoroutinefunction(endpoint):
+            endpoint = _async_endpoint(endpoint, session_params[0])
+        options = {option: getattr(route, option) for option in ROUTE_OPTIONS}
+        async_router.add_api_route(route.path, endpoint, **options)
+    return async_router
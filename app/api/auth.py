@@ -2,8 +2,11 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Form
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
-from app.core.auth import authenticate_user, create_access_token, get_current_active_user, require_admin
+from app.core.auth import (
+    authenticate_user, create_access_token, get_current_active_user, principal_cache, principal_claims, require_admin
+)
 from app.core.config import settings
+from app.core.hashing import password_hasher
 from app.core.database import get_session
 from app.models.schemas import Token, UserResponse
 from app.models.models import User
@@ -15,7 +18,7 @@ async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     session: Session = Depends(get_session)
 ):
-    user = authenticate_user(session, form_data.username, form_data.password)
+    user = await authenticate_user(session, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -24,7 +27,7 @@ async def login_for_access_token(
         )
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data=principal_claims(user), expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -46,4 +49,12 @@ async def admin_only_route(current_user: User = Depends(require_admin)):
         "message": f"Hello Admin {current_user.name}! This is an admin-only route.",
         "user_role": current_user.role,
         "access_level": "admin"
-    }
\ No newline at end of file
+    }
+
+@router.get("/principal-cache")
+async def principal_cache_stats(current_user: User = Depends(require_admin)):
+    return principal_cache.stats()
+
+@router.get("/password-hashing")
+async def password_hashing_stats(current_user: User = Depends(require_admin)):
+    return password_hasher.stats()
\ No newline at end of file
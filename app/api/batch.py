@@ -0,0 +1,22 @@
+from typing import List
+from fastapi import APIRouter, Request, Response
+from app.models.schemas import BatchRequestItem, BatchResult
+from app.core.batch import BatchDispatcher, check_batch
+from app.core.database import read_router
+from app.core.replicas import primary_cookie
+from app.core.serialization import json_list
+
+router = APIRouter()
+
+@router.post("", response_model=List[BatchResult])
+async def run_batch(items: List[BatchRequestItem], request: Request, response: Response):
+    """Run several API requests in one round trip. Results come back in
+    request order, each with its own status, headers and body; a failed
+    sub-request does not stop the others. Consecutive GETs run concurrently,
+    and every other request runs alone, in order."""
+    check_batch(items)
+    dispatcher = BatchDispatcher(request.app, request.scope)
+    results = await dispatcher.run(items)
+    if dispatcher.wrote and read_router.replicas:
+        response.headers.append("set-cookie", primary_cookie())
+    return json_list(results, response)
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func
 from sqlmodel import Session, select
 from typing import List
-from app.models.models import Label
-from app.core.database import get_session
+from app.models.models import Label, TaskLabelLink
+from app.models.schemas import LabelRead
+from app.core.database import get_read_session, get_session
+from app.core.conditional import conditional_list
+from app.core.serialization import json_list
 
 router = APIRouter()
 
@@ -16,7 +20,23 @@ def create_label(label: Label, session: Session = Depends(get_session)):
     session.refresh(label)
     return label
 
-@router.get("/", response_model=List[Label])
-def read_labels(session: Session = Depends(get_session)):
-    labels = session.exec(select(Label)).all()
-    return labels
\ No newline at end of file
+@router.get("/", response_model=List[LabelRead], response_model_exclude_unset=True)
+def read_labels(
+    request: Request,
+    response: Response,
+    with_counts: bool = False,
+    session: Session = Depends(get_read_session)
+):
+    if not with_counts:
+        labels = session.exec(select(Label)).all()
+        # Labels are never edited, so the ids identify the page.
+        conditional_list(request, response, [label.id for label in labels])
+        return json_list((LabelRead(**label.model_dump()).model_dump(exclude_unset=True) for label in labels), response)
+    query = (
+        select(Label, func.count(TaskLabelLink.task_id))
+        .outerjoin(TaskLabelLink, TaskLabelLink.label_id == Label.id)
+        .group_by(Label.id)
+    )
+    counted = session.exec(query).all()
+    conditional_list(request, response, [(label.id, count) for label, count in counted])
+    return json_list((LabelRead(**label.model_dump(), task_count=count).model_dump() for label, count in counted), response)
\ No newline at end of file
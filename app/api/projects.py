@@ -1,37 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlmodel import Session, select
 from typing import List, Optional
 from app.models.models import Project, User
-from app.core.database import get_session
+from app.core.config import settings
+from app.core.database import get_read_session, get_session
+from app.core.stats import stats_cache
+from app.core.conditional import conditional_get, conditional_list, item_etag, newest
+from app.core.pagination import NEXT_CURSOR_HEADER, attr_key, datetime_key, paginate
+from app.core.serialization import json_list, serializer_for
 
 router = APIRouter()
 
+PROJECT_FIELDS = tuple(Project.model_fields)
+
+PROJECT_SORT_KEYS = {
+    "id": attr_key(Project.id, "id"),
+    "created_at": datetime_key(Project.created_at, "created_at"),
+}
+
 @router.post("/", response_model=Project, status_code=status.HTTP_201_CREATED)
 def create_project(project: Project, session: Session = Depends(get_session)):
     owner = session.get(User, project.owner_id)
     if not owner:
         raise HTTPException(status_code=400, detail="Owner not found")
     session.add(project)
-    session.commit()
-    session.refresh(project)
+    with stats_cache.writing():
+        session.commit()
+        session.refresh(project)
+        stats_cache.project_created(project)
     return project
 
 @router.get("/", response_model=List[Project])
 def read_projects(
-    skip: int = 0, 
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
     owner_id: Optional[int] = None,
-    session: Session = Depends(get_session)
+    sort: str = "id",
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_session)
 ):
-    query = select(Project).where(Project.is_active == True)
+    conditions = [Project.is_active == True]
     if owner_id:
-        query = query.where(Project.owner_id == owner_id)
-    projects = session.exec(query.offset(skip).limit(limit)).all()
-    return projects
+        conditions.append(Project.owner_id == owner_id)
+    query = select(Project).where(*conditions)
+    page = paginate(session, query, Project.id, PROJECT_SORT_KEYS, sort=sort, cursor=cursor, skip=skip, limit=limit)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    conditional_list(request, response, [(project.id, project.version) for project in page.items], newest(page.items))
+    return json_list(map(serializer_for(PROJECT_FIELDS), page.items), response)
 
 @router.get("/{project_id}", response_model=Project)
-def read_project(project_id: int, session: Session = Depends(get_session)):
+def read_project(project_id: int, request: Request, response: Response, session: Session = Depends(get_read_session)):
     project = session.get(Project, project_id)
     if not project or not project.is_active:
         raise HTTPException(status_code=404, detail="Project not found")
+    conditional_get(request, response, item_etag(project), project.updated_at)
     return project
\ No newline at end of file
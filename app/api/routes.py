@@ -1,5 +1,7 @@
 from fastapi import APIRouter
-from app.api import users, projects, tasks, labels, auth
+from app.api import users, projects, tasks, labels, auth, stats, batch
+from app.api.async_mode import asyncify_router
+from app.core.config import settings
 
 api_router = APIRouter()
 
@@ -7,4 +9,9 @@ api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
-api_router.include_router(labels.router, prefix="/labels", tags=["labels"])
\ No newline at end of file
+api_router.include_router(labels.router, prefix="/labels", tags=["labels"])
+api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+api_router.include_router(batch.router, prefix="/batch", tags=["batch"])
+
+if settings.DB_ASYNC:
+    api_router = asyncify_router(api_router)
\ No newline at end of file
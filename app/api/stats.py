@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+from app.models.schemas import StatsResponse
+from app.core.database import get_session
+from app.core.stats import stats_cache
+
+router = APIRouter()
+
+@router.get("/", response_model=StatsResponse)
+def read_stats(session: Session = Depends(get_session)):
+    return stats_cache.get(session)
@@ -1,13 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, cast, exists, func, literal, select as select_columns, union_all
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
-from typing import List, Optional
+from typing import List, Optional, Set, Union
 from datetime import datetime
-from app.models.models import Task, Project, User
-from app.models.enums import TaskStatus, TaskPriority
-from app.core.database import get_session
+from app.models.models import Task, Project, User, TaskLabelLink, task_priority_rank
+from app.models.enums import ExportFormat, LabelMatch, TaskStatus, TaskPriority
+from app.models.schemas import BulkItem, ImportReport, TaskChanges, TaskFacets, TaskRead
+from app.core.bulk import bulk_delete, bulk_update
+from app.core.changes import record_deletions, task_changes
+from app.core.conditional import check_if_match, conditional_get, conditional_list, item_etag, newest
+from app.core.config import settings
+from app.core.database import engine, get_async_engine, get_read_session, get_session, read_router
+from app.core.events import event_stream, task_events, task_keys, task_payload
+from app.core.export import EXPORT_ENCODERS, stream_export, stream_export_async
+from app.core.importer import TaskImporter, import_stream, load_reference_ids_async
+from app.core.stats import stats_cache
+from app.core.search import search_tasks_query
+from app.core.pagination import NEXT_CURSOR_HEADER, SortKey, attr_key, datetime_key, paginate, parse_sort
+from app.core.serialization import json_list, parse_fields, serializer_for
 
 router = APIRouter()
 
+PRIORITY_RANK = {priority: rank for rank, priority in enumerate(TaskPriority)}
+
+TASK_SORT_KEYS = {
+    "id": attr_key(Task.id, "id"),
+    "due_date": datetime_key(Task.due_date, "due_date", nullable=True),
+    "created_at": datetime_key(Task.created_at, "created_at"),
+    "priority": SortKey(column=task_priority_rank, value=lambda task: PRIORITY_RANK[task.priority]),
+}
+
+# ?include= name -> relationship, each batch-loaded with one extra SELECT
+TASK_INCLUDES = {
+    "labels": Task.labels,
+    "assignee": Task.assigned_to,
+    "project": Task.project,
+}
+
+# TaskRead fields that are task columns, i.e. everything ?fields= may select
+TASK_FIELDS = tuple(name for name in TaskRead.model_fields if name not in TASK_INCLUDES)
+TASK_SUMMARIES = {
+    "labels": serializer_for(("id", "name", "color")),
+    "assignee": serializer_for(("id", "name", "email")),
+    "project": serializer_for(("id", "name")),
+}
+
+def parse_includes(include: Optional[str]) -> Set[str]:
+    if not include:
+        return set()
+    names = {name.strip() for name in include.split(",") if name.strip()}
+    unknown = names - TASK_INCLUDES.keys()
+    if unknown:
+        allowed = ", ".join(sorted(TASK_INCLUDES))
+        raise HTTPException(status_code=400, detail=f"Invalid include '{', '.join(sorted(unknown))}'. Allowed: {allowed}")
+    return names
+
+def include_options(includes: Set[str]):
+    return [selectinload(TASK_INCLUDES[name]) for name in sorted(includes)]
+
+def task_etag(task: Task, includes: Set[str]) -> str:
+    embedded = []
+    if "labels" in includes:
+        embedded.append(sorted(label.id for label in task.labels))
+    if "assignee" in includes:
+        embedded.append(task.assigned_to.version if task.assigned_to else None)
+    if "project" in includes:
+        embedded.append(task.project.version)
+    return item_etag(task, *embedded)
+
+def task_data(task: Task, includes: Set[str]) -> dict:
+    """``TaskRead`` as a plain dict, which list routes render without
+    validating it against the model."""
+    data = serializer_for(TASK_FIELDS)(task)
+    if "labels" in includes:
+        data["labels"] = [TASK_SUMMARIES["labels"](label) for label in task.labels]
+    if "assignee" in includes:
+        assignee = task.assigned_to
+        data["assignee"] = TASK_SUMMARIES["assignee"](assignee) if assignee else None
+    if "project" in includes:
+        data["project"] = TASK_SUMMARIES["project"](task.project)
+    return data
+
+def task_projection(fields: Optional[str], includes: Set[str], sort: str = "id") -> Optional[tuple]:
+    """Columns to SELECT for ``?fields=``, plus the sort column the next
+    cursor is built from (sort keys are named after it) and the version and
+    update time the page is tagged by; None for whole rows."""
+    selected = parse_fields(fields, TASK_FIELDS)
+    if selected is None:
+        return None
+    if includes:
+        raise HTTPException(status_code=400, detail="Use either fields or include, not both")
+    sort_field, _, _ = parse_sort(sort, TASK_SORT_KEYS)
+    return selected, tuple(dict.fromkeys([*selected, sort_field, "version", "updated_at"]))
+
 @router.post("/", response_model=Task, status_code=status.HTTP_201_CREATED)
 def create_task(task: Task, session: Session = Depends(get_session)):
     project = session.get(Project, task.project_id)
@@ -18,49 +105,276 @@ def create_task(task: Task, session: Session = Depends(get_session)):
         if not user:
             raise HTTPException(status_code=400, detail="Assigned user not found")
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    with stats_cache.writing():
+        session.commit()
+        session.refresh(task)
+        stats_cache.task_created(task)
+    task_events.publish("task.created", [task_payload(task)])
     return task
 
-@router.get("/", response_model=List[Task])
-def read_tasks(
-    skip: int = 0,
-    limit: int = 100,
+def label_condition(label_ids: List[int], label_match: LabelMatch):
+    """Semi-join on tasklabellink (served by its label_id index)."""
+    label_ids = sorted(set(label_ids))
+    if label_match == LabelMatch.ALL:
+        matching = (
+            select(TaskLabelLink.task_id)
+            .where(TaskLabelLink.label_id.in_(label_ids))
+            .group_by(TaskLabelLink.task_id)
+            .having(func.count(TaskLabelLink.label_id) == len(label_ids))
+        )
+        return Task.id.in_(matching)
+    return exists().where(TaskLabelLink.task_id == Task.id, TaskLabelLink.label_id.in_(label_ids))
+
+def task_filters(
     project_id: Optional[int] = None,
     status_filter: Optional[TaskStatus] = None,
     priority_filter: Optional[TaskPriority] = None,
     assigned_to_id: Optional[int] = None,
-    session: Session = Depends(get_session)
-):
-    query = select(Task)
+    label_ids: Optional[List[int]] = Query(None),
+    label_match: LabelMatch = LabelMatch.ANY,
+) -> list:
+    """Query parameters shared by every task list endpoint, as WHERE clauses."""
+    conditions = []
+    if label_ids:
+        conditions.append(label_condition(label_ids, label_match))
     if project_id:
-        query = query.where(Task.project_id == project_id)
+        conditions.append(Task.project_id == project_id)
     if status_filter:
-        query = query.where(Task.status == status_filter)
+        conditions.append(Task.status == status_filter)
     if priority_filter:
-        query = query.where(Task.priority == priority_filter)
+        conditions.append(Task.priority == priority_filter)
     if assigned_to_id:
-        query = query.where(Task.assigned_to_id == assigned_to_id)
-    
-    tasks = session.exec(query.offset(skip).limit(limit)).all()
-    return tasks
+        conditions.append(Task.assigned_to_id == assigned_to_id)
+    return conditions
 
-@router.get("/{task_id}", response_model=Task)
-def read_task(task_id: int, session: Session = Depends(get_session)):
-    task = session.get(Task, task_id)
+@router.get("/", response_model=List[TaskRead], response_model_exclude_unset=True)
+def read_tasks(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    filters: list = Depends(task_filters),
+    sort: str = "id",
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    fields: Optional[str] = None,
+    session: Session = Depends(get_read_session)
+):
+    """``?fields=id,title,status`` returns only those fields (``id`` always),
+    and only those columns are read from the database."""
+    includes = parse_includes(include)
+    projection = task_projection(fields, includes, sort)
+    if projection:
+        selected, columns = projection
+        query = select_columns(*(getattr(Task, name) for name in columns)).where(*filters)
+    else:
+        query = select(Task).options(*include_options(includes)).where(*filters)
+    page = paginate(session, query, Task.id, TASK_SORT_KEYS, sort=sort, cursor=cursor, skip=skip, limit=limit)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if projection:
+        fingerprint = [selected, *((task.id, task.version) for task in page.items)]
+        conditional_list(request, response, fingerprint, newest(page.items))
+        return json_list(map(serializer_for(selected), page.items), response)
+    fingerprint = [sorted(includes), *((task.id, task_etag(task, includes)) for task in page.items)]
+    # Embedded relations change without touching the task's updated_at.
+    conditional_list(request, response, fingerprint, None if includes else newest(page.items))
+    return json_list((task_data(task, includes) for task in page.items), response)
+
+@router.get("/search", response_model=List[TaskRead], response_model_exclude_unset=True)
+def search_tasks(
+    q: str = Query(..., min_length=1),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    filters: list = Depends(task_filters),
+    include: Optional[str] = None,
+    fields: Optional[str] = None,
+    session: Session = Depends(get_read_session)
+):
+    includes = parse_includes(include)
+    projection = task_projection(fields, includes)
+    query, order_by = search_tasks_query(session.get_bind().dialect.name, q)
+    if projection:
+        selected, columns = projection
+        query = query.with_only_columns(*(getattr(Task, name) for name in columns), *query.selected_columns[1:])
+    else:
+        query = query.options(*include_options(includes))
+    rows = session.exec(query.where(*filters).order_by(*order_by).offset(skip).limit(limit)).all()
+    if projection:
+        return json_list(map(serializer_for(selected), rows))
+    return json_list(task_data(task, includes) for task, _ in rows)
+
+@router.get("/export")
+def export_tasks(
+    request: Request,
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    filters: list = Depends(task_filters),
+):
+    """Every task matching the list filters, streamed as NDJSON or CSV."""
+    columns = Task.__table__.columns
+    encoder = EXPORT_ENCODERS[export_format]([column.name for column in columns])
+    query = select_columns(*columns).where(*filters).order_by(Task.id)
+    replica = read_router.pick(request.headers.get("cookie"))
+    if settings.DB_ASYNC:
+        body = stream_export_async(replica.async_engine if replica else get_async_engine(), query, encoder)
+    else:
+        body = stream_export(replica.engine if replica else engine, query, encoder)
+    return StreamingResponse(
+        body,
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format.value}"'},
+    )
+
+@router.post("/import", response_model=ImportReport)
+async def import_tasks(
+    request: Request,
+    import_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    resume_from: int = Query(0, ge=0),
+):
+    """Load tasks from an NDJSON or CSV request body, read as it streams in
+    and written in committed batches. After a failure, send the same body
+    again with ``resume_from`` set to the reported ``checkpoint``."""
+    project_ids, user_ids = await load_reference_ids_async()
+    importer = TaskImporter(import_format, project_ids, user_ids, resume_from=resume_from)
+    report = await import_stream(importer, request.stream())
+    if report.imported:
+        stats_cache.invalidate()
+        task_events.publish("tasks.imported", imported=report.imported)
+    return report
+
+@router.get("/facets", response_model=TaskFacets)
+def read_task_facets(filters: list = Depends(task_filters), session: Session = Depends(get_read_session)):
+    """Per-label, per-status and per-priority counts for the filtered tasks,
+    computed in one UNION ALL over a CTE of the matching rows."""
+    filtered = select(Task.id, Task.status, Task.priority).where(*filters).cte("filtered")
+    facet_query = union_all(
+        select(literal("total"), literal("total"), func.count()).select_from(filtered),
+        select(literal("status"), cast(filtered.c.status, String), func.count())
+        .group_by(filtered.c.status),
+        select(literal("priority"), cast(filtered.c.priority, String), func.count())
+        .group_by(filtered.c.priority),
+        select(literal("label"), cast(TaskLabelLink.label_id, String), func.count())
+        .join_from(filtered, TaskLabelLink, TaskLabelLink.task_id == filtered.c.id)
+        .group_by(TaskLabelLink.label_id),
+    )
+    facets = {
+        "total": 0,
+        "labels": [],
+        "status": {task_status.value: 0 for task_status in TaskStatus},
+        "priority": {priority.value: 0 for priority in TaskPriority},
+    }
+    # Enum columns store member names, so map them back to their values.
+    for facet, key, count in session.exec(facet_query):
+        if facet == "total":
+            facets["total"] = count
+        elif facet == "status":
+            facets["status"][TaskStatus[key].value] = count
+        elif facet == "priority":
+            facets["priority"][TaskPriority[key].value] = count
+        else:
+            facets["labels"].append({"id": int(key), "count": count})
+    facets["labels"].sort(key=lambda label: (-label["count"], label["id"]))
+    return facets
+
+@router.get("/changes", response_model=TaskChanges, response_model_exclude_unset=True)
+def read_task_changes(
+    since: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    session: Session = Depends(get_session),
+):
+    """Delta sync: tasks changed and ids of tasks deleted since the
+    ``since`` watermark (all tasks when omitted), with the next watermark.
+    Call again while ``has_more``. A watermark older than the tombstone
+    retention gets 410; sync from scratch then. Served by the primary: a
+    lagging replica could let the watermark skip writes."""
+    changes = task_changes(session, since, limit)
+    return TaskChanges(
+        changed=[task_data(task, set()) for task in changes.changed],
+        deleted=changes.deleted,
+        watermark=changes.watermark.encode(),
+        has_more=changes.has_more,
+    )
+
+@router.get("/stream")
+async def stream_task_events(project_id: Optional[int] = None, assigned_to_id: Optional[int] = None):
+    """Server-sent events for task changes, optionally only those in one
+    project or assigned to one user. The stream opens with ``ready`` and
+    ends with ``overflow`` if the client falls too far behind; reconnect and
+    refetch after either."""
+    task_events.check_capacity()
+    return StreamingResponse(
+        event_stream(task_events, project_id, assigned_to_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.delete("/bulk")
+def bulk_delete_tasks(task_ids: List[Union[int, BulkItem]], session: Session = Depends(get_session)):
+    result = bulk_delete(
+        session, Task, task_ids,
+        dependents=[TaskLabelLink.task_id],
+        returning=[Task.status, Task.priority, Task.project_id, Task.assigned_to_id],
+    )
+    record_deletions(session, result.applied)
+    with stats_cache.writing():
+        session.commit()
+        for row in result.rows:
+            stats_cache.task_deleted(row.status, row.priority)
+    task_events.publish("tasks.bulk_deleted", [task_keys(row) for row in result.rows])
+    return {"deleted_count": len(result.applied), "results": result.report("deleted")}
+
+@router.put("/bulk/status")
+def bulk_update_task_status(
+    task_ids: List[Union[int, BulkItem]], 
+    new_status: TaskStatus, 
+    session: Session = Depends(get_session)
+):
+    result = bulk_update(
+        session, Task, task_ids, {"status": new_status},
+        returning=[Task.project_id, Task.assigned_to_id, Task.version],
+    )
+    session.commit()
+    if result.applied:
+        stats_cache.invalidate()
+    task_events.publish(
+        "tasks.bulk_updated",
+        [dict(task_keys(row), status=new_status.value, version=row.version) for row in result.rows],
+    )
+    return {"updated_count": len(result.applied), "results": result.report("updated")}
+
+@router.get("/{task_id}", response_model=TaskRead, response_model_exclude_unset=True)
+def read_task(
+    task_id: int,
+    request: Request,
+    response: Response,
+    include: Optional[str] = None,
+    session: Session = Depends(get_read_session)
+):
+    includes = parse_includes(include)
+    task = session.get(Task, task_id, options=include_options(includes))
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    conditional_get(request, response, task_etag(task, includes), task.updated_at)
+    return task_data(task, includes)
 
 @router.put("/{task_id}", response_model=Task)
-def update_task(task_id: int, task_update: Task, session: Session = Depends(get_session)):
+def update_task(
+    task_id: int,
+    task_update: Task,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session)
+):
     db_task = session.get(Task, task_id)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    if task_update.version != db_task.version:
+    # If-Match, when sent, replaces the version check on the body.
+    if not check_if_match(request, item_etag(db_task)) and task_update.version != db_task.version:
         raise HTTPException(status_code=409, detail="Concurrent modification detected")
     
+    old_status, old_priority = db_task.status, db_task.priority
+    previous = task_keys(db_task)
     task_data = task_update.dict(exclude_unset=True, exclude={"id"})
     task_data["version"] = db_task.version + 1
     task_data["updated_at"] = datetime.utcnow()
@@ -69,8 +383,15 @@ def update_task(task_id: int, task_update: Task, session: Session = Depends(get_
         setattr(db_task, key, value)
     
     session.add(db_task)
-    session.commit()
-    session.refresh(db_task)
+    with stats_cache.writing():
+        session.commit()
+        session.refresh(db_task)
+        stats_cache.task_changed(old_status, old_priority, db_task)
+    payload = task_payload(db_task)
+    if task_keys(db_task) != previous:
+        payload["previous"] = previous
+    task_events.publish("task.updated", [payload])
+    response.headers["ETag"] = item_etag(db_task)
     return db_task
 
 @router.delete("/{task_id}")
@@ -78,33 +399,12 @@ def delete_task(task_id: int, session: Session = Depends(get_session)):
     task = session.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    deleted_status, deleted_priority = task.status, task.priority
+    deleted = task_keys(task)
     session.delete(task)
-    session.commit()
+    record_deletions(session, [task_id])
+    with stats_cache.writing():
+        session.commit()
+        stats_cache.task_deleted(deleted_status, deleted_priority)
+    task_events.publish("task.deleted", [deleted])
     return {"message": "Task deleted"}
-
-@router.delete("/bulk")
-def bulk_delete_tasks(task_ids: List[int], session: Session = Depends(get_session)):
-    deleted_count = 0
-    for task_id in task_ids:
-        task = session.get(Task, task_id)
-        if task:
-            session.delete(task)
-            deleted_count += 1
-    session.commit()
-    return {"deleted_count": deleted_count}
-
-@router.put("/bulk/status")
-def bulk_update_task_status(
-    task_ids: List[int], 
-    new_status: TaskStatus, 
-    session: Session = Depends(get_session)
-):
-    updated_count = 0
-    for task_id in task_ids:
-        task = session.get(Task, task_id)
-        if task:
-            task.status = new_status
-            task.updated_at = datetime.utcnow()
-            updated_count += 1
-    session.commit()
-    return {"updated_count": updated_count}
\ No newline at end of file
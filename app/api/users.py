@@ -1,23 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlmodel import Session, select
-from typing import List
+from typing import List, Optional
 from app.models.models import User
 from app.models.schemas import UserResponse, UserCreate, UserUpdate
-from app.core.database import get_session
-from app.core.auth import get_password_hash
+from app.core.config import settings
+from app.core.database import get_read_session, get_session, run_in_session
+from app.core.auth import principal_cache
+from app.core.hashing import password_hasher
+from app.core.stats import stats_cache
+from app.core.conditional import check_if_match, conditional_get, conditional_list, item_etag
+from app.core.pagination import NEXT_CURSOR_HEADER, attr_key, datetime_key, paginate
+from app.core.serialization import json_list, serializer_for
 
 router = APIRouter()
 
-@router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user_data: UserCreate, session: Session = Depends(get_session)):
-    db_user = session.exec(select(User).where(User.email == user_data.email)).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
+USER_FIELDS = tuple(UserResponse.model_fields)
+
+USER_SORT_KEYS = {
+    "id": attr_key(User.id, "id"),
+    "email": attr_key(User.email, "email"),
+    "created_at": datetime_key(User.created_at, "created_at"),
+}
+
+def _email_taken(session: Session, email: str) -> bool:
+    return session.exec(select(User.id).where(User.email == email)).first() is not None
+
+def _insert_user(session: Session, user_data: UserCreate, password_hash: str) -> User:
     user = User(
         email=user_data.email,
         name=user_data.name,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=password_hash,
         role=user_data.role
     )
     session.add(user)
@@ -25,35 +37,67 @@ def create_user(user_data: UserCreate, session: Session = Depends(get_session)):
     session.refresh(user)
     return user
 
+# async, like login: the bcrypt hash is awaited on the hashing pool rather
+# than blocking the thread the handler body runs on, which in DB_ASYNC mode
+# is the event loop.
+@router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def create_user(user_data: UserCreate, session: Session = Depends(get_session)):
+    if await run_in_session(session, _email_taken, user_data.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    password_hash = await password_hasher.hash(user_data.password)
+    with stats_cache.writing():
+        user = await run_in_session(session, _insert_user, user_data, password_hash)
+        stats_cache.user_created(user)
+    return user
+
 @router.get("/", response_model=List[UserResponse])
 def read_users(
-    skip: int = 0, 
-    limit: int = 100, 
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
     active_only: bool = True,
-    session: Session = Depends(get_session)
+    sort: str = "id",
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_session)
 ):
-    query = select(User)
-    if active_only:
-        query = query.where(User.is_active == True)
-    users = session.exec(query.offset(skip).limit(limit)).all()
-    return users
+    conditions = [User.is_active == True] if active_only else []
+    query = select(User).where(*conditions)
+    page = paginate(session, query, User.id, USER_SORT_KEYS, sort=sort, cursor=cursor, skip=skip, limit=limit)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    conditional_list(request, response, [(user.id, user.version) for user in page.items])
+    return json_list(map(serializer_for(USER_FIELDS), page.items), response)
 
 @router.get("/{user_id}", response_model=UserResponse)
-def read_user(user_id: int, session: Session = Depends(get_session)):
+def read_user(user_id: int, request: Request, response: Response, session: Session = Depends(get_read_session)):
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    conditional_get(request, response, item_etag(user))
     return user
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(user_id: int, user_update: UserUpdate, session: Session = Depends(get_session)):
+def update_user(
+    user_id: int,
+    user_update: UserUpdate,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session)
+):
     db_user = session.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    if user_update.version != db_user.version:
-        raise HTTPException(status_code=409, detail="Concurrent modification detected")
+    # If-Match, when sent, replaces the version check on the body.
+    if not check_if_match(request, item_etag(db_user)):
+        if user_update.version is None:
+            raise HTTPException(status_code=428, detail="Send If-Match or version")
+        if user_update.version != db_user.version:
+            raise HTTPException(status_code=409, detail="Concurrent modification detected")
     
+    was_active = db_user.is_active
+    old_email = db_user.email
     user_data = user_update.dict(exclude_unset=True, exclude={"version"})
     user_data["version"] = db_user.version + 1
     
@@ -61,8 +105,12 @@ def update_user(user_id: int, user_update: UserUpdate, session: Session = Depend
         setattr(db_user, key, value)
     
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    with stats_cache.writing():
+        session.commit()
+        session.refresh(db_user)
+        stats_cache.user_activity_changed(was_active, db_user.is_active)
+    principal_cache.invalidate(old_email, db_user.email)
+    response.headers["ETag"] = item_etag(db_user)
     return db_user
 
 @router.delete("/{user_id}")
@@ -70,7 +118,12 @@ def delete_user(user_id: int, session: Session = Depends(get_session)):
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    was_active, email = user.is_active, user.email
     user.is_active = False
+    user.version += 1
     session.add(user)
-    session.commit()
+    with stats_cache.writing():
+        session.commit()
+        stats_cache.user_activity_changed(was_active, False)
+    principal_cache.invalidate(email)
     return {"message": "User deactivated"}
\ No newline at end of file
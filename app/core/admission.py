@@ -0,0 +1,258 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+from app.core.config import settings
+
+LOGIN_PATH = f"{settings.API_V1_STR}/auth/login"
+# Never queued or throttled: probes, metrics, static files and long-lived
+# event streams (which would hold a slot for as long as they stay open).
+EXEMPT_PREFIXES = ("/health", "/metrics", "/static", f"{settings.API_V1_STR}/tasks/stream")
+# Weight of the newest request in the average slot hold time.
+HOLD_TIME_SMOOTHING = 0.1
+RATE_LIMITED_DETAIL = "Too many requests, slow down"
+OVERLOADED_DETAIL = "Server busy, retry shortly"
+
+
+class Overloaded(Exception):
+    def __init__(self, limiter: "ConcurrencyLimiter", reason: str, retry_after: float):
+        self.limiter = limiter
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """At most ``limit`` requests at once, then a FIFO queue of at most
+    ``max_queue`` waiting up to ``max_wait`` seconds.
+
+    A request is turned away at once when the queue is full, or when the
+    queue ahead of it, at the average hold time, would not drain within
+    ``max_wait``: failing fast beats timing out after the wait.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_use = 0
+        self.hold_seconds = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.outcomes: Dict[str, int] = {"admitted": 0, "queued": 0, "queue_full": 0, "deadline": 0, "timeout": 0}
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def estimated_wait(self) -> float:
+        return self.hold_seconds * (len(self._waiters) + 1) / self.limit
+
+    def _reject(self, reason: str):
+        self.outcomes[reason] += 1
+        raise Overloaded(self, reason, max(self.estimated_wait(), self.hold_seconds))
+
+    async def acquire(self):
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            self.outcomes["admitted"] += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+        if self.estimated_wait() > self.max_wait:
+            self._reject("deadline")
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.outcomes["queued"] += 1
+        try:
+            # release() hands its slot straight to the waiter, in_use unchanged.
+            await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            self._reject("timeout")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(0.0)
+            raise
+        finally:
+            if not future.done() or future.cancelled():
+                try:
+                    self._waiters.remove(future)
+                except ValueError:
+                    pass
+        self.outcomes["admitted"] += 1
+
+    def release(self, held_seconds: float):
+        if held_seconds:
+            self.hold_seconds += HOLD_TIME_SMOOTHING * (held_seconds - self.hold_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_use -= 1
+
+
+class TokenBuckets:
+    """One token bucket per key (client IP or user): ``rate`` requests per
+    second sustained, ``burst`` at once. Least recently seen keys beyond
+    ``max_keys`` are forgotten, which only ever refills their bucket."""
+
+    def __init__(self, name: str, rate: float, burst: float, max_keys: int = 100_000):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.limited = 0
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def take(self, key: str) -> float:
+        """Spend a token for ``key``; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+            self.limited += 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def _token_subject(headers: List[Tuple[bytes, bytes]]) -> Optional[str]:
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            try:
+                return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+            except JWTError:
+                return None
+    return None
+
+
+class AdmissionController:
+    """Per-client rate limits, then per-route and global concurrency limits.
+
+    The global limiter is sized to the connection pool, so requests wait in
+    a short, bounded queue here instead of piling up on the pool; route
+    limiters (exact ``METHOD path`` matches) stop one expensive endpoint from
+    taking every slot.
+    """
+
+    def __init__(self):
+        max_wait = settings.ADMISSION_MAX_WAIT_MS / 1000
+        self.global_limiter = ConcurrencyLimiter(
+            "global", settings.ADMISSION_CONCURRENCY, settings.ADMISSION_MAX_QUEUE, max_wait,
+        )
+        self.route_limiters = {
+            route: ConcurrencyLimiter(route, limit, settings.ADMISSION_MAX_QUEUE, max_wait)
+            for route, limit in settings.ADMISSION_ROUTE_LIMITS.items()
+        }
+        self.ip_buckets = TokenBuckets("ip", settings.RATE_LIMIT_IP_PER_SECOND, settings.RATE_LIMIT_IP_BURST)
+        self.user_buckets = TokenBuckets("user", settings.RATE_LIMIT_USER_PER_SECOND, settings.RATE_LIMIT_USER_BURST)
+        self.login_buckets = TokenBuckets(
+            "login", settings.RATE_LIMIT_LOGIN_PER_SECOND, settings.RATE_LIMIT_LOGIN_BURST,
+        )
+
+    def rate_limit(self, scope) -> float:
+        """Seconds the client has to wait, or 0 when it may proceed."""
+        client = scope.get("client")
+        ip = client[0] if client else "unknown"
+        buckets = [(self.ip_buckets, ip)]
+        if scope["path"] == LOGIN_PATH:
+            buckets.append((self.login_buckets, ip))
+        elif self.user_buckets.enabled:
+            subject = _token_subject(scope.get("headers", []))
+            if subject is not None:
+                buckets.append((self.user_buckets, subject))
+        return max((bucket.take(key) for bucket, key in buckets if bucket.enabled), default=0.0)
+
+    def route_limiter(self, scope) -> Optional[ConcurrencyLimiter]:
+        return self.route_limiters.get(f"{scope['method']} {scope['path']}")
+
+    def limiters(self, scope) -> List[ConcurrencyLimiter]:
+        # Route limiter first, so a request queued for a busy route does not
+        # hold a global slot while it waits.
+        route_limiter = self.route_limiter(scope)
+        return [route_limiter, self.global_limiter] if route_limiter else [self.global_limiter]
+
+    def metric_lines(self) -> List[str]:
+        limiters = [self.global_limiter, *self.route_limiters.values()]
+        lines = [
+            "# HELP admission_requests_total Admission decisions by limiter and outcome.",
+            "# TYPE admission_requests_total counter",
+        ]
+        for limiter in limiters:
+            for outcome, count in limiter.outcomes.items():
+                lines.append(f'admission_requests_total{{limiter="{limiter.name}",outcome="{outcome}"}} {count}')
+        for name, help_text, read in (
+            ("admission_in_use", "Slots held by requests being served.", lambda limiter: limiter.in_use),
+            ("admission_queue_depth", "Requests waiting for a slot.", lambda limiter: limiter.queued),
+            ("admission_hold_seconds", "Average time a request holds its slot.", lambda limiter: limiter.hold_seconds),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f'{name}{{limiter="{limiter.name}"}} {read(limiter)}' for limiter in limiters]
+        lines += ["# HELP rate_limited_total Requests refused by a token bucket.", "# TYPE rate_limited_total counter"]
+        for buckets in (self.ip_buckets, self.user_buckets, self.login_buckets):
+            lines.append(f'rate_limited_total{{bucket="{buckets.name}"}} {buckets.limited}')
+        return lines
+
+
+admission = AdmissionController()
+
+
+def retry_after_header(retry_after: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+
+def _retry_response(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status_code, headers=retry_after_header(retry_after))
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying ``admission``: 429 when a client is over
+    its rate, 503 when the server is over capacity, both with Retry-After."""
+
+    def __init__(self, app, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            return await self.app(scope, receive, send)
+        wait = self.controller.rate_limit(scope)
+        if wait:
+            response = _retry_response(429, RATE_LIMITED_DETAIL, wait)
+            return await response(scope, receive, send)
+        held: List[ConcurrencyLimiter] = []
+        try:
+            for limiter in self.controller.limiters(scope):
+                await limiter.acquire()
+                held.append(limiter)
+        except Overloaded as overloaded:
+            for limiter in held:
+                limiter.release(0.0)
+            response = _retry_response(503, OVERLOADED_DETAIL, overloaded.retry_after)
+            return await response(scope, receive, send)
+        except BaseException:
+            for limiter in held:
+                limiter.release(0.0)
+            raise
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - start
+            for limiter in held:
+                limiter.release(elapsed)
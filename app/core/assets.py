@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict, Iterable
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response
+from app.core.compression import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are built
+    brotli = None
+
+# Fingerprinted URLs change whenever the content does.
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Plain asset URLs and page shells are revalidated on every use.
+REVALIDATE = "no-cache"
+# Below this, compression saves less than the header costs.
+MIN_COMPRESS_BYTES = 256
+TEXT_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+# Best first; the first one the client accepts is served.
+PREFERRED_ENCODINGS = ("br", "gzip")
+
+
+class Precompressed:
+    """A body and its precompressed variants. Compression runs once, at the
+    highest levels, since its cost is paid only at startup."""
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.variants: Dict[str, bytes] = {}
+        if len(body) < MIN_COMPRESS_BYTES or not media_type.startswith(TEXT_TYPES):
+            return
+        candidates = {"gzip": gzip.compress(body, 9, mtime=0)}
+        if brotli is not None:
+            candidates["br"] = brotli.compress(body, quality=11)
+        self.variants = {coding: data for coding, data in candidates.items() if len(data) < len(body)}
+
+    def response(self, headers: Headers, cache_control: str) -> Response:
+        """The best variant the request accepts, or a 304 when its
+        ``If-None-Match`` already names it."""
+        accepted = accepted_encodings(headers.get("accept-encoding"))
+        coding = next((coding for coding in PREFERRED_ENCODINGS if coding in self.variants and coding in accepted), None)
+        etag = f'"{self.digest}-{coding}"' if coding else f'"{self.digest}"'
+        response_headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if_none_match = headers.get("if-none-match", "")
+        if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=response_headers)
+        if coding:
+            response_headers["Content-Encoding"] = coding
+        return Response(self.variants.get(coding, self.body), media_type=self.media_type, headers=response_headers)
+
+
+class StaticAssets:
+    """Serves a directory from memory, under content-fingerprinted names.
+
+    ``url("app.js")`` gives ``/static/app.<hash>.js``, which is cached by
+    browsers for a year: a changed file gets a new URL. The plain name
+    still works but is revalidated every time. Files are read once, so
+    edits need a restart.
+    """
+
+    def __init__(self, directory: str, prefix: str = "/static"):
+        self.directory = directory
+        self.prefix = prefix
+        self._assets: Dict[str, Precompressed] = {}
+        self._fingerprinted: Dict[str, str] = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.relpath(os.path.join(root, name), directory).replace(os.sep, "/")
+                self._add(path)
+
+    def _add(self, path: str):
+        with open(os.path.join(self.directory, path), "rb") as file:
+            body = file.read()
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if media_type == "application/javascript":
+            media_type += "; charset=utf-8"  # Response adds it to text/* itself
+        asset = Precompressed(body, media_type)
+        stem, extension = os.path.splitext(path)
+        self._assets[path] = asset
+        self._fingerprinted[f"{stem}.{asset.digest}{extension}"] = path
+
+    def url(self, path: str) -> str:
+        asset = self._assets[path]
+        stem, extension = os.path.splitext(path)
+        return f"{self.prefix}/{stem}.{asset.digest}{extension}"
+
+    async def __call__(self, scope, receive, send):
+        path = scope["path"].lstrip("/")
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        elif path in self._fingerprinted:
+            response = self._assets[self._fingerprinted[path]].response(Headers(scope=scope), IMMUTABLE)
+        elif path in self._assets:
+            response = self._assets[path].response(Headers(scope=scope), REVALIDATE)
+        else:
+            response = PlainTextResponse("Not Found", status_code=404)
+        await response(scope, receive, send)
+
+
+class PageCache:
+    """Page shells rendered once and kept precompressed, with an ETag.
+
+    The templates take no per-request data, so each renders to the same
+    bytes for the life of the process; browsers revalidate with
+    ``If-None-Match`` and get a 304 until a deploy changes the page (or the
+    asset URLs in it).
+    """
+
+    def __init__(self, environment, names: Iterable[str]):
+        self._pages = {
+            name: Precompressed(environment.get_template(name).render().encode(), "text/html")
+            for name in names
+        }
+
+    def response(self, request, name: str) -> Response:
+        return self._pages[name].response(request.headers, REVALIDATE)
+
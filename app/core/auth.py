@@ -1,22 +1,112 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session, select
 from app.core.config import settings
-from app.core.database import get_session
+from app.core.database import get_session, run_in_session
+from app.core.hashing import password_hasher
 from app.models.models import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+class PrincipalCache:
+    """Bounded LRU + TTL cache of authenticated users keyed by token subject.
+
+    Entries are detached ``User`` instances. ``update_user`` and
+    ``delete_user`` invalidate the subject they touch; tokens that carry a
+    ``ver`` claim newer than the cached version also force a reload, which
+    covers changes made by another process. The TTL bounds staleness for
+    anything else.
+
+    A load that started before a subject was invalidated may have read the
+    old row, so callers take ``generation()`` before loading and ``put``
+    skips the user when the subject was invalidated since.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Generation of each subject's last invalidation; those older than
+        # ``_floor`` are forgotten, and loads started before it are not kept.
+        self._generation = 0
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, subject: str, min_version: Optional[int] = None) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None:
+                user, expires_at = entry
+                if expires_at > time.monotonic() and (min_version is None or user.version >= min_version):
+                    self._entries.move_to_end(subject)
+                    self.hits += 1
+                    return user
+                del self._entries[subject]
+            self.misses += 1
+            return None
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def put(self, subject: str, user: User, generation: int):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation < self._floor or self._invalidated.get(subject, -1) > generation:
+                return
+            self._entries[subject] = (user, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *subjects: str):
+        with self._lock:
+            self._generation += 1
+            for subject in subjects:
+                if self._entries.pop(subject, None) is not None:
+                    self.invalidations += 1
+                self._invalidated[subject] = self._generation
+                self._invalidated.move_to_end(subject)
+            while len(self._invalidated) > max(self.maxsize, 1):
+                _, generation = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, generation)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._invalidated.clear()
+            self._generation += 1
+            self._floor = self._generation
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify_sync(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash_sync(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -28,34 +118,97 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def authenticate_user(session: Session, email: str, password: str) -> Optional[User]:
-    user = session.exec(select(User).where(User.email == email)).first()
+def principal_claims(user: User) -> dict:
+    """JWT claims identifying ``user``; id and version ride along when
+    ``TOKEN_PRINCIPAL_CLAIMS`` is enabled. The role is left out, since
+    authorization reads it from the loaded user."""
+    claims = {"sub": user.email}
+    if settings.TOKEN_PRINCIPAL_CLAIMS:
+        claims.update({"uid": user.id, "ver": user.version})
+    return claims
+
+def _get_user_by_email(session: Session, email: str) -> Optional[User]:
+    return session.exec(select(User).where(User.email == email)).first()
+
+def _store_password_hash(session: Session, user: User, password_hash: str):
+    user.password_hash = password_hash
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+
+async def authenticate_user(session: Session, email: str, password: str) -> Optional[User]:
+    user = await run_in_session(session, _get_user_by_email, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+    if not valid:
         return None
+    if new_hash:
+        # The stored hash predates the current BCRYPT_ROUNDS; upgrade it.
+        await run_in_session(session, _store_password_hash, user, new_hash)
+    return user
+
+def _load_principal(session: Session, email: str, user_id: Optional[int]) -> Optional[User]:
+    if user_id is not None:
+        user = session.get(User, user_id)
+        if user is not None and user.email != email:
+            user = None
+    else:
+        user = _get_user_by_email(session, email)
+    if user is not None:
+        session.expunge(user)
     return user
 
+# Scope key under which the batch endpoint hands its sub-requests a
+# ``SharedPrincipal``.
+SHARED_PRINCIPAL_SCOPE_KEY = "shared_principal"
+
+class SharedPrincipal:
+    """The user behind one bearer token, resolved by the first sub-request
+    of a batch that needs it and reused by the others."""
+
+    def __init__(self, token: str):
+        self.token = token
+        self.user: Optional[User] = None
+        self.lock = asyncio.Lock()
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: Session = Depends(get_session)
 ) -> User:
+    shared = request.scope.get(SHARED_PRINCIPAL_SCOPE_KEY)
+    if shared is None or shared.token != credentials.credentials:
+        return await authenticate_token(session, credentials.credentials)
+    async with shared.lock:
+        if shared.user is None:
+            shared.user = await authenticate_token(session, credentials.credentials)
+    return shared.user
+
+async def authenticate_token(session: Session, token: str) -> User:
+    """The user a bearer token names; 401 when it is invalid or the user is gone."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = session.exec(select(User).where(User.email == email)).first()
+    user = principal_cache.get(email, min_version=payload.get("ver"))
+    if user is not None:
+        return user
+
+    generation = principal_cache.generation()
+    user = await run_in_session(session, _load_principal, email, payload.get("uid"))
     if user is None:
         raise credentials_exception
+    principal_cache.put(email, user, generation)
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import orjson
+from fastapi import HTTPException
+from fastapi.middleware.asyncexitstack import AsyncExitStackMiddleware
+from starlette.datastructures import Headers
+from starlette.middleware.exceptions import ExceptionMiddleware
+from app.core.admission import (
+    LOGIN_PATH, OVERLOADED_DETAIL, RATE_LIMITED_DETAIL, Overloaded, admission, retry_after_header,
+)
+from app.core.auth import SHARED_PRINCIPAL_SCOPE_KEY, SharedPrincipal
+from app.core.config import settings
+from app.core.database import read_router
+from app.core.replicas import PRIMARY_COOKIE, SAFE_METHODS
+from app.models.schemas import BatchRequestItem
+
+BATCH_PATH = f"{settings.API_V1_STR}/batch"
+# Never dispatched from a batch: the batch itself; the event stream, which
+# does not end; and login and import, which are limited per HTTP request
+# (the login bucket, two imports at a time) and have no use in a batch.
+EXCLUDED_PATHS = (
+    BATCH_PATH, f"{settings.API_V1_STR}/tasks/stream", LOGIN_PATH, f"{settings.API_V1_STR}/tasks/import",
+)
+# Batch request headers every sub-request starts from.
+INHERITED_HEADERS = ("authorization", "cookie")
+# Describe the sub-response's encoding, not its content.
+DROPPED_HEADERS = {"content-length"}
+
+
+def check_batch(items: List[BatchRequestItem]):
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_REQUESTS} requests per batch")
+    for index, item in enumerate(items):
+        path = item.path.partition("?")[0]
+        if not path.startswith(f"{settings.API_V1_STR}/") or path.rstrip("/") in EXCLUDED_PATHS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Request {index}: path must be an {settings.API_V1_STR} route other than "
+                       f"{', '.join(EXCLUDED_PATHS)}",
+            )
+
+
+def dispatch_groups(items: List[BatchRequestItem]) -> List[List[int]]:
+    """Indexes of ``items`` in execution order: each run of consecutive reads
+    is one group, run concurrently; each write is a group of its own, so it
+    sees the reads before it and the reads after it see its effect."""
+    groups: List[List[int]] = []
+    for index, item in enumerate(items):
+        if item.method in SAFE_METHODS and groups and items[groups[-1][0]].method in SAFE_METHODS:
+            groups[-1].append(index)
+        else:
+            groups.append([index])
+    return groups
+
+
+def _decode_body(content: bytes, content_type: str) -> Any:
+    if not content:
+        return None
+    if content_type.split(";")[0].strip() == "application/json":
+        return orjson.loads(content)
+    return content.decode("utf-8", errors="replace")
+
+
+class BatchDispatcher:
+    """Runs the sub-requests of one batch through the app's routes in-process.
+
+    Each sub-request goes through the same routing, dependencies and
+    exception handlers as over HTTP, but not through the middleware: the
+    batch as a whole holds a global admission slot and is recorded in the
+    metrics, its database queries included. Each sub-request still takes a
+    token from the caller's rate limit buckets and holds its route's
+    concurrency slot, if ADMISSION_ROUTE_LIMITS lists it; when refused, the
+    middleware's 429 or 503 becomes its result. Sub-requests carrying the
+    batch's bearer token share one ``SharedPrincipal``, so the token is
+    decoded and its user looked up once.
+    """
+
+    def __init__(self, app, scope):
+        handlers = {key: handler for key, handler in app.exception_handlers.items() if key not in (500, Exception)}
+        self.app = ExceptionMiddleware(AsyncExitStackMiddleware(app.router), handlers=handlers, debug=app.debug)
+        self.scope = scope
+        headers = Headers(scope=scope)
+        self.headers = {name: headers[name] for name in INHERITED_HEADERS if name in headers}
+        scheme, _, token = self.headers.get("authorization", "").partition(" ")
+        self.principal = SharedPrincipal(token) if scheme.lower() == "bearer" and token else None
+        self.wrote = False
+
+    async def run(self, items: List[BatchRequestItem]) -> List[Dict[str, Any]]:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        semaphore = asyncio.Semaphore(max(1, settings.BATCH_CONCURRENCY))
+
+        async def run_one(index: int):
+            async with semaphore:
+                results[index] = await self.call(items[index])
+
+        for group in dispatch_groups(items):
+            await asyncio.gather(*(run_one(index) for index in group))
+            if items[group[0]].method not in SAFE_METHODS and results[group[0]]["status"] < 400:
+                self._after_write()
+        return results
+
+    def _after_write(self):
+        self.wrote = True
+        # The write may have changed the principal (a user editing itself).
+        if self.principal is not None:
+            self.principal.user = None
+        # Later reads must see the write: keep them off lagging replicas.
+        if read_router.replicas:
+            pin = f"{PRIMARY_COOKIE}={time.time() + settings.READ_STICKY_SECONDS:.3f}"
+            cookie = self.headers.get("cookie")
+            self.headers["cookie"] = f"{cookie}; {pin}" if cookie else pin
+
+    def _sub_scope(self, item: BatchRequestItem, body: bytes) -> Dict[str, Any]:
+        path, _, query = item.path.partition("?")
+        headers = dict(self.headers)
+        headers.update((name.lower(), value) for name, value in item.headers.items())
+        if item.body is not None:
+            headers.setdefault("content-type", "application/json")
+        headers["content-length"] = str(len(body))
+        parent = self.scope
+        return {
+            "type": "http",
+            "asgi": parent.get("asgi", {"version": "3.0"}),
+            "http_version": parent.get("http_version", "1.1"),
+            "method": item.method,
+            "scheme": parent.get("scheme", "http"),
+            "server": parent.get("server"),
+            "client": parent.get("client"),
+            "root_path": parent.get("root_path", ""),
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+            "app": parent.get("app"),
+            SHARED_PRINCIPAL_SCOPE_KEY: self.principal,
+        }
+
+    async def call(self, item: BatchRequestItem) -> Dict[str, Any]:
+        body = b"" if item.body is None else orjson.dumps(item.body)
+        scope = self._sub_scope(item, body)
+        if not settings.ADMISSION_ENABLED:
+            return await self._dispatch(item, scope, body)
+        wait = admission.rate_limit(scope)
+        if wait:
+            return self._refused(item, 429, RATE_LIMITED_DETAIL, wait)
+        limiter = admission.route_limiter(scope)
+        if limiter is None:
+            return await self._dispatch(item, scope, body)
+        try:
+            await limiter.acquire()
+        except Overloaded as overloaded:
+            return self._refused(item, 503, OVERLOADED_DETAIL, overloaded.retry_after)
+        start = time.perf_counter()
+        try:
+            return await self._dispatch(item, scope, body)
+        finally:
+            limiter.release(time.perf_counter() - start)
+
+    @staticmethod
+    def _refused(item: BatchRequestItem, status_code: int, detail: str, retry_after: float) -> Dict[str, Any]:
+        return {"id": item.id, "status": status_code, "headers": retry_after_header(retry_after), "body": {"detail": detail}}
+
+    async def _dispatch(self, item: BatchRequestItem, scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Nothing more will arrive; streaming responses wait here for a
+            # disconnect until they finish.
+            await asyncio.get_running_loop().create_future()
+
+        start: Tuple[int, List[Tuple[bytes, bytes]]] = (500, [])
+        chunks: List[bytes] = []
+
+        async def send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = (message["status"], message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            logging.exception(f"Batch sub-request {item.method} {item.path} failed")
+            return {"id": item.id, "status": 500, "headers": {}, "body": {"detail": "Internal Server Error"}}
+        status_code, raw_headers = start
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in raw_headers if name.decode("latin-1") not in DROPPED_HEADERS
+        }
+        return {
+            "id": item.id,
+            "status": status_code,
+            "headers": headers,
+            "body": _decode_body(b"".join(chunks), headers.get("content-type", "")),
+        }
@@ -0,0 +1,129 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import delete, tuple_, update
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.models.schemas import BulkItem
+
+
+@dataclass
+class BulkResult:
+    """Per-id outcome of a bulk statement.
+
+    ``applied`` holds the ids that were updated/deleted, ``missing`` the ids
+    with no row, and ``conflict`` the ids whose row exists but whose version
+    did not match the expected one. ``rows`` are the RETURNING rows of the
+    applied ids.
+    """
+    applied: List[int] = field(default_factory=list)
+    missing: List[int] = field(default_factory=list)
+    conflict: List[int] = field(default_factory=list)
+    rows: List[Any] = field(default_factory=list)
+
+    def report(self, applied_key: str) -> Dict[str, List[int]]:
+        return {applied_key: self.applied, "missing": self.missing, "conflict": self.conflict}
+
+
+def normalize_items(items: Iterable[Union[int, BulkItem]]) -> Tuple[List[int], Dict[int, int]]:
+    """Split a bulk payload into plain ids and ``id -> expected version`` pairs.
+
+    Duplicate ids are collapsed, keeping the first occurrence.
+    """
+    plain: List[int] = []
+    versioned: Dict[int, int] = {}
+    seen = set()
+    for item in items:
+        item_id, version = (item, None) if isinstance(item, int) else (item.id, item.version)
+        if item_id in seen:
+            continue
+        seen.add(item_id)
+        if version is None:
+            plain.append(item_id)
+        else:
+            versioned[item_id] = version
+    return plain, versioned
+
+
+def _chunks(values: Sequence[Any], size: int):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _match_conditions(model, plain: List[int], versioned: Dict[int, int], chunk_size: int):
+    """Yield one WHERE clause per chunk, plus the ids and versioned flag it covers."""
+    for chunk in _chunks(plain, chunk_size):
+        yield model.id.in_(chunk), chunk, False
+    for chunk in _chunks(list(versioned.items()), chunk_size):
+        yield tuple_(model.id, model.version).in_(chunk), [item_id for item_id, _ in chunk], True
+
+
+def _classify(session: Session, model, result: BulkResult, ids: List[int], returned: List[Any], versioned: bool):
+    applied = {row.id for row in returned}
+    result.applied.extend(item_id for item_id in ids if item_id in applied)
+    result.rows.extend(returned)
+    leftover = [item_id for item_id in ids if item_id not in applied]
+    if not leftover:
+        return
+    # Only versioned chunks can miss an existing row; one lookup tells
+    # version conflicts apart from ids that do not exist.
+    existing = set(session.exec(select(model.id).where(model.id.in_(leftover))).all()) if versioned else set()
+    for item_id in leftover:
+        (result.conflict if item_id in existing else result.missing).append(item_id)
+
+
+def bulk_update(
+    session: Session,
+    model,
+    items: Iterable[Union[int, BulkItem]],
+    values: Dict[str, Any],
+    returning: Sequence[Any] = (),
+    chunk_size: Optional[int] = None,
+) -> BulkResult:
+    """Apply ``values`` to every row in ``items`` with one UPDATE per chunk.
+
+    Each matched row gets ``version`` bumped and ``updated_at`` refreshed, and
+    items carrying an expected version only match when it is still current.
+    The caller owns the transaction.
+    """
+    chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+    plain, versioned = normalize_items(items)
+    values = dict(values, version=model.version + 1, updated_at=datetime.utcnow())
+    columns = (model.id, *returning)
+    result = BulkResult()
+    for condition, ids, is_versioned in _match_conditions(model, plain, versioned, chunk_size):
+        statement = update(model).where(condition).values(**values).execution_options(synchronize_session=False)
+        returned = session.exec(statement.returning(*columns)).all()
+        _classify(session, model, result, ids, returned, is_versioned)
+    return result
+
+
+def bulk_delete(
+    session: Session,
+    model,
+    items: Iterable[Union[int, BulkItem]],
+    dependents: Sequence[Any] = (),
+    returning: Sequence[Any] = (),
+    chunk_size: Optional[int] = None,
+) -> BulkResult:
+    """Delete every row in ``items`` with one DELETE per chunk.
+
+    ``dependents`` are foreign-key columns (e.g. link-table columns) whose rows
+    are removed first for the rows being deleted. The caller owns the
+    transaction.
+    """
+    chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+    plain, versioned = normalize_items(items)
+    columns = (model.id, *returning)
+    result = BulkResult()
+    for condition, ids, is_versioned in _match_conditions(model, plain, versioned, chunk_size):
+        for column in dependents:
+            session.exec(
+                delete(column.class_)
+                .where(column.in_(select(model.id).where(condition)))
+                .execution_options(synchronize_session=False)
+            )
+        statement = delete(model).where(condition).execution_options(synchronize_session=False)
+        returned = session.exec(statement.returning(*columns)).all()
+        _classify(session, model, result, ids, returned, is_versioned)
+    return result
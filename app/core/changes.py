@@ -0,0 +1,156 @@
+import asyncio
+import base64
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, insert, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.core.database import engine
+from app.models.models import Task, TaskTombstone
+
+# (timestamp, id) of the last row delivered from one keyset.
+Position = Tuple[datetime, int]
+
+# Each process purges expired tombstones this often (and at startup).
+PURGE_INTERVAL_SECONDS = 3600
+
+
+@dataclass
+class Watermark:
+    """Where a client's delta sync stopped, in the task and tombstone
+    keysets; handed out as an opaque token."""
+    tasks: Position
+    tombstones: Position
+
+    def encode(self) -> str:
+        payload = json.dumps(
+            {"t": [self.tasks[0].isoformat(), self.tasks[1]], "d": [self.tombstones[0].isoformat(), self.tombstones[1]]},
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "Watermark":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            tasks, tombstones = (
+                (datetime.fromisoformat(payload[key][0]), int(payload[key][1])) for key in ("t", "d")
+            )
+        except (ValueError, KeyError, TypeError, IndexError):
+            raise HTTPException(status_code=400, detail="Invalid watermark")
+        return cls(tasks, tombstones)
+
+
+@dataclass
+class Changes:
+    changed: List[Task]
+    deleted: List[int]
+    watermark: Watermark
+    has_more: bool
+
+
+def retention_cutoff(now: datetime) -> datetime:
+    return now - timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+
+
+def _fetch(session: Session, query, columns, since: Position, limit: int) -> list:
+    return session.exec(
+        query.where(tuple_(*columns) > tuple_(*since)).order_by(*columns).limit(limit + 1)
+    ).all()
+
+
+def _advance(since: Position, rows: list, key: Callable[[Any], Position], horizon: datetime, more: bool) -> Position:
+    """Position after ``rows``, held back at ``horizon``: a transaction that
+    stamped an older time may not have committed yet, so rows newer than the
+    horizon are sent again next time. Once caught up, move to the horizon."""
+    position = since
+    for row in rows:
+        if key(row)[0] > horizon:
+            return position
+        position = key(row)
+    if not more and (horizon, 0) > position:
+        position = (horizon, 0)
+    return position
+
+
+def task_changes(session: Session, since: Optional[str], limit: int) -> Changes:
+    """Tasks changed and ids deleted after ``since`` (everything, on a first
+    sync), in ``updated_at`` / ``deleted_at`` order, at most ``limit`` each."""
+    now = datetime.utcnow()
+    horizon = now - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+    if since is None:
+        # A first sync downloads every task; earlier deletions do not concern it.
+        watermark = Watermark((datetime.min, 0), (horizon, 0))
+    else:
+        watermark = Watermark.decode(since)
+        if watermark.tombstones[0] < retention_cutoff(now):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Watermark is older than the tombstone retention; sync again without since",
+            )
+
+    tasks = _fetch(session, select(Task), (Task.updated_at, Task.id), watermark.tasks, limit)
+    tombstones = _fetch(
+        session, select(TaskTombstone), (TaskTombstone.deleted_at, TaskTombstone.id), watermark.tombstones, limit,
+    )
+    more_tasks, more_tombstones = len(tasks) > limit, len(tombstones) > limit
+    tasks, tombstones = tasks[:limit], tombstones[:limit]
+    next_watermark = Watermark(
+        _advance(watermark.tasks, tasks, lambda task: (task.updated_at, task.id), horizon, more_tasks),
+        _advance(
+            watermark.tombstones, tombstones, lambda tombstone: (tombstone.deleted_at, tombstone.id),
+            horizon, more_tombstones,
+        ),
+    )
+    # When the whole page is still settling, the next call would return it
+    # again: report no more and let the client come back later.
+    has_more = (more_tasks and next_watermark.tasks == (tasks[-1].updated_at, tasks[-1].id)) or (
+        more_tombstones and next_watermark.tombstones == (tombstones[-1].deleted_at, tombstones[-1].id)
+    )
+    return Changes(
+        changed=tasks,
+        deleted=[tombstone.task_id for tombstone in tombstones],
+        watermark=next_watermark,
+        has_more=has_more,
+    )
+
+
+def record_deletions(session: Session, task_ids: Iterable[int]):
+    """Leave tombstones for deleted tasks, in the caller's transaction."""
+    now = datetime.utcnow()
+    rows = [{"task_id": task_id, "deleted_at": now} for task_id in task_ids]
+    if rows:
+        session.execute(insert(TaskTombstone.__table__), rows)
+
+
+def purge_tombstones(session_or_connection) -> int:
+    """Drop tombstones past the retention period; returns how many."""
+    result = session_or_connection.execute(
+        delete(TaskTombstone.__table__).where(TaskTombstone.deleted_at < retention_cutoff(datetime.utcnow()))
+    )
+    if result.rowcount:
+        logging.info(f"Purged {result.rowcount} task tombstones")
+    return result.rowcount
+
+
+def _purge_committed() -> int:
+    with engine.begin() as connection:
+        return purge_tombstones(connection)
+
+
+async def purge_tombstones_periodically(interval: float = PURGE_INTERVAL_SECONDS):
+    """Run ``purge_tombstones`` every ``interval`` seconds until cancelled,
+    so tombstones expire whether or not this process sees any deletes."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_purge_committed)
+        except SQLAlchemyError as e:
+            logging.warning(f"Tombstone purge failed ({e.__class__.__name__}), retrying in {interval:.0f}s")
@@ -0,0 +1,88 @@
+import gzip
+from typing import Optional, Set
+from starlette.datastructures import Headers, MutableHeaders
+
+COMPRESSIBLE_TYPES = ("application/json",)
+# Added inside a strong ETag when the body is gzipped: the two encodings are
+# different bytes, so they get different tags.
+GZIP_ETAG_SUFFIX = "-gzip"
+
+
+def accepted_encodings(header: Optional[str]) -> Set[str]:
+    """Codings an ``Accept-Encoding`` header allows; ``q=0`` excludes one and
+    ``*`` stands for the ones this app produces."""
+    accepted = set()
+    for item in (header or "").split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.update(("gzip", "br") if coding == "*" else (coding,))
+    return accepted
+
+
+def add_vary(headers: MutableHeaders, value: str = "Accept-Encoding"):
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = value
+    elif value.lower() not in vary.lower():
+        headers["Vary"] = f"{vary}, {value}"
+
+
+class CompressionMiddleware:
+    """Gzips JSON responses of at least ``minimum_size`` bytes for clients
+    that accept gzip.
+
+    Only bodies sent in one message are compressed, which covers every
+    rendered JSON response; streams (exports, server-sent events) pass
+    through untouched, and so does anything already encoded. A strong
+    ETag gets ``GZIP_ETAG_SUFFIX``, as ``"v3-gzip"``, which
+    ``app.core.conditional`` strips again before comparing, so either form
+    works in ``If-Match`` and ``If-None-Match``.
+    """
+
+    def __init__(self, app, minimum_size: int, level: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.minimum_size <= 0:
+            return await self.app(scope, receive, send)
+        accepts_gzip = "gzip" in accepted_encodings(Headers(scope=scope).get("accept-encoding"))
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "").split(";")[0].strip()
+                if media_type in COMPRESSIBLE_TYPES and "content-encoding" not in headers:
+                    start_message = message
+                    return
+                return await send(message)
+            if start_message is None or message["type"] != "http.response.body":
+                return await send(message)
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+            add_vary(headers)
+            body = message.get("body", b"")
+            if accepts_gzip and not message.get("more_body", False) and len(body) >= self.minimum_size:
+                body = gzip.compress(body, self.level)
+                headers["Content-Encoding"] = "gzip"
+                headers["Content-Length"] = str(len(body))
+                etag = headers.get("etag")
+                if etag and etag.startswith('"'):
+                    headers["ETag"] = f'{etag[:-1]}{GZIP_ETAG_SUFFIX}"'
+                message = dict(message, body=body)
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,128 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, List, Optional
+from fastapi import HTTPException, Request, Response, status
+from app.core.compression import GZIP_ETAG_SUFFIX
+
+
+def _digest(parts: tuple, length: int) -> str:
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:length]
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over ``parts``; equal parts always give the same tag."""
+    return f'"{_digest(parts, 20)}"'
+
+
+def item_etag(row, *extra: Any) -> str:
+    """ETag of a single row: its version, plus ``extra`` for any embedded
+    relations. The plain form (no extra) is what ``If-Match`` compares to."""
+    if not extra:
+        return f'"v{row.version}"'
+    return f'"v{row.version}-{_digest(extra, 12)}"'
+
+
+def http_date(value: datetime) -> str:
+    # Timestamps are stored as naive UTC.
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return parsed
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _etag_list(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _identity_tag(tag: str) -> str:
+    """``tag`` as the uncompressed representation's, since the compression
+    middleware marks gzipped ones with ``GZIP_ETAG_SUFFIX``."""
+    suffix = f'{GZIP_ETAG_SUFFIX}"'
+    return f'{tag[:-len(suffix)]}"' if tag.endswith(suffix) else tag
+
+
+def _weak_match(header: str, etag: str) -> Optional[str]:
+    """The tag in ``header`` that matches ``etag``, as the client sent it
+    (less any ``W/``), or None."""
+    for tag in _etag_list(header):
+        tag = tag[2:] if tag.startswith("W/") else tag
+        if tag == "*" or _identity_tag(tag) == etag:
+            return etag if tag == "*" else tag
+    return None
+
+
+def conditional_get(request: Request, response: Response, etag: str, last_modified: Optional[datetime] = None):
+    """Set ``ETag``/``Last-Modified`` on ``response``, or raise a 304 when the
+    client's ``If-None-Match``/``If-Modified-Since`` shows its copy is current.
+
+    Call it before serializing the body so a 304 skips that work.
+    ``If-Modified-Since`` is only consulted without ``If-None-Match``.
+    """
+    headers: Dict[str, str] = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if_none_match = request.headers.get("if-none-match")
+    not_modified = False
+    if if_none_match is not None:
+        matched = _weak_match(if_none_match, etag)
+        not_modified = matched is not None
+        if not_modified:
+            # Echo the client's tag, so a gzipped copy stays labelled as one.
+            headers["ETag"] = matched
+    elif last_modified is not None and "if-modified-since" in request.headers:
+        since = _parse_http_date(request.headers["if-modified-since"])
+        not_modified = since is not None and last_modified.replace(microsecond=0) <= since
+    if not_modified:
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+
+def conditional_list(
+    request: Request,
+    response: Response,
+    fingerprint: Iterable[Any],
+    last_modified: Optional[datetime] = None,
+):
+    """``conditional_get`` for a list page, tagged by ``fingerprint``: one
+    entry per row that changes whenever the row's rendering does (its id and
+    version, plus whatever else the route varies it by).
+
+    Call it with the page's rows before serializing them so a 304 skips
+    that work. ``last_modified`` is the newest ``updated_at`` on the page;
+    it cannot see rows that have since left the page (deleted or filtered
+    out), so ``If-None-Match`` is the exact check and ``If-Modified-Since``
+    the approximate one.
+    """
+    conditional_get(request, response, make_etag(*fingerprint), last_modified)
+
+
+def newest(rows: Iterable[Any]) -> Optional[datetime]:
+    """The latest ``updated_at`` among ``rows``, for ``Last-Modified``."""
+    return max((row.updated_at for row in rows), default=None)
+
+
+def check_if_match(request: Request, etag: str) -> bool:
+    """Evaluate ``If-Match`` against the row's current ``etag``.
+
+    Returns False when the header is absent, True when it matches, and
+    raises 412 when it does not.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return False
+    tags = _etag_list(if_match)
+    if "*" in tags or etag in map(_identity_tag, tags):
+        return True
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Resource has been modified",
+        headers={"ETag": etag},
+    )
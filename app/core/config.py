@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://user:password@db:5432/testdb")
@@ -7,17 +7,135 @@ class Settings:
     PROJECT_NAME: str = "QA Take-Home Exam API"
     VERSION: str = "1.0.0"
     
-    # Database settings
-    DB_POOL_SIZE: int = 10
-    DB_MAX_OVERFLOW: int = 20
+    # Database settings (per process: each prefork worker has its own pool)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    # Serve API routes through an AsyncSession (asyncpg / aiosqlite) instead
+    # of sync sessions on the threadpool
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+    # Read replicas: comma-separated URLs that read-only routes are spread
+    # over. A replica more than REPLICA_MAX_LAG_SECONDS behind, or failing,
+    # is skipped (health re-checked every REPLICA_CHECK_INTERVAL seconds),
+    # and a client's reads stay on the primary for READ_STICKY_SECONDS after
+    # each of its writes.
+    READ_DATABASE_URLS: List[str] = [url.strip() for url in os.getenv("READ_DATABASE_URL", "").split(",") if url.strip()]
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_CHECK_INTERVAL: float = float(os.getenv("REPLICA_CHECK_INTERVAL", "2"))
+    READ_STICKY_SECONDS: float = float(os.getenv("READ_STICKY_SECONDS", "5"))
+
+    # Startup: apply pending schema migrations (waiting up to
+    # DB_STARTUP_TIMEOUT seconds for the database), and optionally seed the
+    # demo data into an empty database
+    MIGRATE_ON_STARTUP: bool = os.getenv("MIGRATE_ON_STARTUP", "true").lower() == "true"
+    SEED_ON_STARTUP: bool = os.getenv("SEED_ON_STARTUP", "false").lower() == "true"
+    DB_STARTUP_TIMEOUT: float = float(os.getenv("DB_STARTUP_TIMEOUT", "60"))
+
+    # Request, query and pool metrics served at /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # With metrics on: log queries at least this slow, and a statement run
+    # this many times in one request as a suspected N+1
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    N_PLUS_ONE_THRESHOLD: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+    # Send X-DB-Query-Count on every response, not only to requests that ask
+    # for it with X-Debug-Queries: 1
+    QUERY_COUNT_HEADER_ALWAYS: bool = os.getenv("QUERY_COUNT_HEADER_ALWAYS", "false").lower() == "true"
+
+    # JSON responses of at least COMPRESSION_MIN_BYTES are gzipped at
+    # COMPRESSION_LEVEL for clients that accept it; 0 turns that off. Static
+    # assets and page shells are precompressed at startup regardless.
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    COMPRESSION_LEVEL: int = int(os.getenv("COMPRESSION_LEVEL", "5"))
+
+    # Task change streams (/api/v1/tasks/stream): "memory" reaches the
+    # streams of this process only, "postgres" relays events between workers
+    # with LISTEN/NOTIFY. A stream more than EVENTS_QUEUE_SIZE events behind
+    # is dropped; idle streams get a keepalive every EVENTS_HEARTBEAT_SECONDS.
+    EVENTS_BACKEND: str = os.getenv("EVENTS_BACKEND", "memory")
+    EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    EVENTS_MAX_SUBSCRIBERS: int = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "10000"))
+
+    # Delta sync (/api/v1/tasks/changes): deleted task ids are kept this long
+    # (purged at startup and hourly in each process, see app/core/changes.py),
+    # and rows stamped within CHANGES_SETTLE_SECONDS are sent again on the
+    # next sync in case an older-stamped write has not committed yet
+    TASK_TOMBSTONE_RETENTION_DAYS: float = float(os.getenv("TASK_TOMBSTONE_RETENTION_DAYS", "30"))
+    CHANGES_SETTLE_SECONDS: float = float(os.getenv("CHANGES_SETTLE_SECONDS", "5"))
+
+    # Admission control (app/core/admission.py). Every request holds one of
+    # ADMISSION_CONCURRENCY slots, sized to the connection pool by default,
+    # and one of its route's slots if ADMISSION_ROUTE_LIMITS lists it (exact
+    # "METHOD path"). Past them, up to ADMISSION_MAX_QUEUE requests wait at
+    # most ADMISSION_MAX_WAIT_MS; the rest get a 503 with Retry-After.
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_CONCURRENCY: int = int(os.getenv("ADMISSION_CONCURRENCY", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+    ADMISSION_ROUTE_LIMITS: Dict[str, int] = {
+        route.strip(): int(limit)
+        for route, limit in (
+            entry.rsplit("=", 1) for entry in os.getenv(
+                "ADMISSION_ROUTE_LIMITS",
+                "POST /api/v1/auth/login=8,GET /api/v1/tasks/=12,GET /api/v1/tasks/search=8,"
+                "GET /api/v1/tasks/export=4,POST /api/v1/tasks/import=2",
+            ).split(",") if entry.strip()
+        )
+    }
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "100"))
+    ADMISSION_MAX_WAIT_MS: float = float(os.getenv("ADMISSION_MAX_WAIT_MS", "500"))
+    # Token buckets (requests per second sustained, and burst) per client IP,
+    # per authenticated user, and a stricter per-IP one for /auth/login.
+    # A rate of 0 turns that bucket off.
+    RATE_LIMIT_IP_PER_SECOND: float = float(os.getenv("RATE_LIMIT_IP_PER_SECOND", "300"))
+    RATE_LIMIT_IP_BURST: float = float(os.getenv("RATE_LIMIT_IP_BURST", "600"))
+    RATE_LIMIT_USER_PER_SECOND: float = float(os.getenv("RATE_LIMIT_USER_PER_SECOND", "100"))
+    RATE_LIMIT_USER_BURST: float = float(os.getenv("RATE_LIMIT_USER_BURST", "200"))
+    RATE_LIMIT_LOGIN_PER_SECOND: float = float(os.getenv("RATE_LIMIT_LOGIN_PER_SECOND", "5"))
+    RATE_LIMIT_LOGIN_BURST: float = float(os.getenv("RATE_LIMIT_LOGIN_BURST", "20"))
+
+    # POST /api/v1/batch: sub-requests per call, and how many of a run of
+    # consecutive GETs execute at once (each holds a pool connection)
+    BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+    # POST /seed-data: most synthetic rows per table in one call (the
+    # endpoint is unauthenticated; seed_data.py has no cap)
+    SEED_MAX_ROWS: int = int(os.getenv("SEED_MAX_ROWS", "1000000"))
+
+    # Bulk operations: ids per UPDATE/DELETE ... WHERE id IN (...) statement
+    BULK_CHUNK_SIZE: int = 500
+    
+    # Streaming export: rows fetched from the server-side cursor per batch
+    EXPORT_BATCH_SIZE: int = 1000
+    # Bulk import: rows per INSERT/COPY, each committed on its own
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+    # Longest input line; a longer one fails its record without being kept
+    IMPORT_MAX_LINE_BYTES: int = int(os.getenv("IMPORT_MAX_LINE_BYTES", str(1024 * 1024)))
     
-    # Pagination defaults
-    DEFAULT_PAGE_SIZE: int = 10
-    MAX_PAGE_SIZE: int = 100
+    # Pagination defaults: ``limit`` on list and search endpoints. Lists
+    # returned 100 rows before ``limit`` was bounded, and still do by default.
+    MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", "100"))
+    DEFAULT_PAGE_SIZE: int = min(int(os.getenv("DEFAULT_PAGE_SIZE", "100")), MAX_PAGE_SIZE)
     
     # JWT settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_PRINCIPAL_CLAIMS: bool = os.getenv("TOKEN_PRINCIPAL_CLAIMS", "true").lower() == "true"
+    
+    # Password hashing: bcrypt cost and the dedicated hashing pool
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+    
+    # Cache of authenticated users resolved by get_current_user. Workers only
+    # drop the users they deactivate themselves, so gunicorn.conf.py shortens
+    # the TTL when it runs more than one.
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+    # Dashboard counts cache; 0 keeps them until a write invalidates them.
+    # Workers only see their own writes, so gunicorn.conf.py sets an expiry
+    # when it runs more than one.
+    STATS_CACHE_TTL_SECONDS: float = float(os.getenv("STATS_CACHE_TTL_SECONDS", "0"))
 
 settings = Settings()
\ No newline at end of file
@@ -1,28 +1,76 @@
-from sqlmodel import SQLModel, create_engine, Session, select
+from fastapi import Request
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import create_engine, Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
-import time
+from app.core.metrics import metrics, timed_pool_class
+from app.core.replicas import ReadRouter, Replica
+from typing import Optional
 import logging
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW
-)
+def pool_options(engine_name: str, is_async: bool = False) -> dict:
+    options = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+    if settings.METRICS_ENABLED:
+        options["poolclass"] = timed_pool_class(engine_name, is_async)
+    return options
 
-def create_db_and_tables():
-    max_retries = 30
-    for attempt in range(max_retries):
-        try:
-            # Drop all tables and recreate them (for development)
-            SQLModel.metadata.drop_all(engine)
-            SQLModel.metadata.create_all(engine)
-            logging.info("Database tables created successfully")
-            break
-        except Exception as e:
-            if attempt == max_retries - 1:
-                raise e
-            logging.warning(f"Database connection attempt {attempt + 1} failed, retrying in 2 seconds...")
-            time.sleep(2)
+def instrumented(engine, engine_name: str):
+    if settings.METRICS_ENABLED:
+        metrics.instrument_engine(getattr(engine, "sync_engine", engine), engine_name)
+    return engine
+
+engine = instrumented(create_engine(settings.DATABASE_URL, **pool_options("sync")), "sync")
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+_async_engine: Optional[AsyncEngine] = None
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in ``url`` for its async counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = instrumented(
+            create_async_engine(async_database_url(settings.DATABASE_URL), **pool_options("async", is_async=True)),
+            "async",
+        )
+    return _async_engine
+
+def make_replica(name: str, url: str) -> Replica:
+    return Replica(
+        name,
+        instrumented(create_engine(url, **pool_options(name)), name),
+        lambda: instrumented(
+            create_async_engine(async_database_url(url), **pool_options(f"{name}-async", is_async=True)),
+            f"{name}-async",
+        ),
+    )
+
+read_router = ReadRouter([
+    make_replica(f"replica{index}", url) for index, url in enumerate(settings.READ_DATABASE_URLS, 1)
+])
+
+def dispose_engines_after_fork():
+    """Drop the pooled connections a forked worker inherited; its pools open
+    new ones on first use. ``close=False`` leaves the parent's sockets alone."""
+    global _async_engine
+    engine.dispose(close=False)
+    _async_engine = None
+    for replica in read_router.replicas:
+        replica.reset_after_fork()
+
+def read_engine(request: Request) -> Engine:
+    """A healthy replica's engine, or the primary's when there is none or
+    the client wrote recently."""
+    replica = read_router.pick(request.headers.get("cookie"))
+    return replica.engine if replica else engine
 
 def seed_initial_data():
     """Seed initial data if it doesn't exist"""
@@ -52,4 +100,27 @@ def seed_initial_data():
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_async_session():
+    async with AsyncSession(get_async_engine()) as session:
+        yield session
+
+def get_read_session(request: Request):
+    """Session for read-only routes, routed by ``read_router``."""
+    with Session(read_engine(request)) as session:
+        yield session
+
+async def get_async_read_session(request: Request):
+    replica = await read_router.pick_async(request.headers.get("cookie"))
+    async with AsyncSession(replica.async_engine if replica else get_async_engine()) as session:
+        yield session
+
+async def run_in_session(session, fn, *args, **kwargs):
+    """Call ``fn(sync_session, *args, **kwargs)`` with whichever session the
+    request got: directly for a sync ``Session``, or through
+    ``AsyncSession.run_sync`` (on the event loop, via the async driver) when
+    ``DB_ASYNC`` is enabled."""
+    if isinstance(session, AsyncSession):
+        return await session.run_sync(fn, *args, **kwargs)
+    return fn(session, *args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,273 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Set
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+
+CHANNEL = "task_events"
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+MAX_NOTIFY_BYTES = 7900
+# Fields every task in an event carries, enough to filter on.
+KEY_FIELDS = ("id", "project_id", "assigned_to_id")
+
+
+def task_payload(task) -> dict:
+    return jsonable_encoder(task)
+
+
+def task_keys(row) -> dict:
+    return {name: getattr(row, name) for name in KEY_FIELDS}
+
+
+class Subscriber:
+    """One open stream: a bounded queue, filled on its event loop.
+
+    A subscriber that falls ``queue_size`` events behind is dropped: its
+    backlog is discarded and the stream ends with an ``overflow`` event, so a
+    slow client never holds memory or slows the publisher.
+    """
+
+    def __init__(self, loop, project_id: Optional[int], assigned_to_id: Optional[int], queue_size: int):
+        self.loop = loop
+        self.project_id = project_id
+        self.assigned_to_id = assigned_to_id
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.dropped = False
+
+    def _matches(self, keys: dict) -> bool:
+        return (
+            (self.project_id is None or keys.get("project_id") == self.project_id)
+            and (self.assigned_to_id is None or keys.get("assigned_to_id") == self.assigned_to_id)
+        )
+
+    def matches(self, task: dict) -> bool:
+        # An update that moves a task out of a filter still reaches it.
+        return self._matches(task) or ("previous" in task and self._matches(task["previous"]))
+
+    def offer(self, event: dict) -> bool:
+        """Queue ``event`` (narrowed to the matching tasks); False once dropped."""
+        if self.dropped:
+            return False
+        if "tasks" in event:
+            tasks = [task for task in event["tasks"] if self.matches(task)]
+            if not tasks:
+                return True
+            if len(tasks) < len(event["tasks"]):
+                event = dict(event, tasks=tasks)
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+
+class PostgresFanout:
+    """Relays events between worker processes through LISTEN/NOTIFY.
+
+    Each process keeps one asyncpg connection that both sends its events
+    (one at a time, from an outbox) and receives everyone's, its own
+    included, so every process delivers the same stream. While the
+    connection is down, events stay in-process.
+    """
+
+    def __init__(self, broker: "EventBroker", url: str):
+        self.broker = broker
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connection = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def connected(self) -> bool:
+        return self.connection is not None and not self.connection.is_closed()
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self._outbox = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._send())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        if self.connected:
+            await self.connection.close()
+
+    async def _listen(self):
+        import asyncpg
+
+        delay = 0.5
+        while True:
+            try:
+                self.connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                self.connection.add_termination_listener(lambda _connection: closed.set())
+                await self.connection.add_listener(CHANNEL, self._on_notify)
+                delay = 0.5
+                await closed.wait()
+                logging.warning("Task event listener disconnected, reconnecting")
+            except (OSError, asyncpg.PostgresError) as e:
+                logging.warning(f"Task event listener unavailable ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            self.connection = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def _send(self):
+        import asyncpg
+
+        while True:
+            payload = await self._outbox.get()
+            try:
+                await self.connection.execute("SELECT pg_notify($1, $2)", CHANNEL, payload)
+            except (AttributeError, OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logging.warning(f"Task event not relayed ({e.__class__.__name__}), delivering locally")
+                self.broker.deliver(json.loads(payload))
+
+    def _on_notify(self, _connection, _pid, _channel, payload: str):
+        self.broker.deliver(json.loads(payload))
+
+    def send(self, event: dict) -> bool:
+        """Queue NOTIFYs for ``event``; False when not connected."""
+        if not self.connected:
+            return False
+        for payload in notify_payloads(event):
+            self.loop.call_soon_threadsafe(self._outbox.put_nowait, payload)
+        return True
+
+
+def notify_payloads(event: dict) -> List[str]:
+    """``event`` as NOTIFY-sized JSON strings: a large bulk event is split
+    into several, and oversized task bodies are cut down to their keys."""
+    payload = json.dumps(event)
+    if len(payload.encode()) < MAX_NOTIFY_BYTES or "tasks" not in event:
+        return [payload]
+    tasks = event["tasks"]
+    if len(tasks) == 1:
+        return [json.dumps(dict(event, tasks=[{name: tasks[0].get(name) for name in KEY_FIELDS}]))]
+    middle = len(tasks) // 2
+    return notify_payloads(dict(event, tasks=tasks[:middle])) + notify_payloads(dict(event, tasks=tasks[middle:]))
+
+
+class EventBroker:
+    """Fans task change events out to the open streams of this process.
+
+    ``publish`` may be called from any thread (sync routes run on the
+    threadpool); delivery is handed to each subscriber's event loop, one
+    callback per loop, and never blocks the publisher. With
+    ``EVENTS_BACKEND=postgres`` events go through ``PostgresFanout`` so
+    streams on every worker see every write.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.fanout: Optional[PostgresFanout] = None
+        self._lock = threading.Lock()
+        self._subscribers: Dict[asyncio.AbstractEventLoop, Set[Subscriber]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def check_capacity(self):
+        if self.subscriber_count >= self.max_subscribers:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many open event streams",
+                headers={"Retry-After": "5"},
+            )
+
+    def subscribe(self, project_id: Optional[int] = None, assigned_to_id: Optional[int] = None) -> Subscriber:
+        loop = asyncio.get_running_loop()
+        subscriber = Subscriber(loop, project_id, assigned_to_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(loop, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.loop, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(subscriber.loop, None)
+
+    def publish(self, event_type: str, tasks: Optional[List[dict]] = None, **fields):
+        """Announce a committed change. ``tasks`` carry at least ``KEY_FIELDS``;
+        events without them (e.g. imports) reach every stream."""
+        event = {"type": event_type, **fields}
+        if tasks is not None:
+            if not tasks:
+                return
+            event["tasks"] = tasks
+        with self._lock:
+            self.published += 1
+        if self.fanout is None or not self.fanout.send(event):
+            self.deliver(event)
+
+    def deliver(self, event: dict):
+        with self._lock:
+            loops = list(self._subscribers)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._deliver_on_loop, loop, event)
+            except RuntimeError:  # loop closed
+                pass
+
+    def _deliver_on_loop(self, loop, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(loop, ()))
+        for subscriber in subscribers:
+            if not subscriber.offer(event):
+                self.unsubscribe(subscriber)
+                with self._lock:
+                    self.dropped += 1
+
+    async def start(self):
+        if settings.EVENTS_BACKEND == "postgres":
+            self.fanout = PostgresFanout(self, settings.DATABASE_URL)
+            await self.fanout.start()
+
+    async def stop(self):
+        if self.fanout is not None:
+            await self.fanout.stop()
+            self.fanout = None
+
+
+def format_event(event: Optional[dict]) -> str:
+    if event is None:
+        return "event: overflow\ndata: {}\n\n"
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(broker: EventBroker, project_id: Optional[int], assigned_to_id: Optional[int]):
+    """Server-sent events for one client: ``ready`` on connect (refetch
+    then), one event per matching change, and a comment line every
+    ``EVENTS_HEARTBEAT_SECONDS`` so proxies keep the idle connection open."""
+    subscriber = broker.subscribe(project_id, assigned_to_id)
+    try:
+        yield "retry: 3000\nevent: ready\ndata: {}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event)
+            if event is None:
+                return
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+task_events = EventBroker(settings.EVENTS_QUEUE_SIZE, settings.EVENTS_MAX_SUBSCRIBERS)
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
+from sqlalchemy import Select
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.config import settings
+from app.models.enums import ExportFormat
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class NdjsonEncoder:
+    media_type = "application/x-ndjson"
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+
+    def header(self) -> str:
+        return ""
+
+    def encode(self, rows: List[Row]) -> str:
+        return "".join(
+            json.dumps(dict(zip(self.columns, map(_plain, row))), separators=(",", ":")) + "\n"
+            for row in rows
+        )
+
+
+class CsvEncoder:
+    media_type = "text/csv"
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+
+    def _write(self, rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    def header(self) -> str:
+        return self._write([self.columns])
+
+    def encode(self, rows: List[Row]) -> str:
+        return self._write(
+            ("" if value is None else _plain(value) for value in row) for row in rows
+        )
+
+
+EXPORT_ENCODERS = {ExportFormat.NDJSON: NdjsonEncoder, ExportFormat.CSV: CsvEncoder}
+
+
+def stream_export(engine: Engine, query: Select, encoder, batch_size: Optional[int] = None) -> Iterator[str]:
+    """Yield ``query``'s rows encoded in batches of ``batch_size``.
+
+    The rows come from one statement on a server-side cursor (``yield_per``
+    turns on ``stream_results``), so the export reads a single consistent
+    snapshot and holds at most one batch in memory however many rows match.
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    yield encoder.header()
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=batch_size).execute(query)
+        for rows in result.partitions():
+            yield encoder.encode(rows)
+
+
+async def stream_export_async(
+    engine: AsyncEngine, query: Select, encoder, batch_size: Optional[int] = None
+) -> AsyncIterator[str]:
+    """``stream_export`` for ``DB_ASYNC`` mode, over the async driver."""
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    yield encoder.header()
+    async with engine.connect() as connection:
+        result = await connection.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield encoder.encode(rows)
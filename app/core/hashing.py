@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.core.config import settings
+
+
+def build_context(rounds: int) -> CryptContext:
+    # Hashes made with any other cost report needs_update(), which drives the
+    # rehash-on-login in authenticate_user.
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification on a dedicated, bounded pool.
+
+    bcrypt releases the GIL, so a small thread pool gives real parallelism
+    while keeping the work off the event loop and out of the AnyIO
+    threadpool that serves sync routes. At most ``max_workers`` hashes run at
+    once; up to ``max_queue`` more may wait, after which callers get a 503.
+    ``max_workers=0`` hashes inline on the calling thread (the old behaviour).
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int, max_queue: int):
+        self.context = context
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.configure(max_workers, max_queue)
+
+    def configure(self, max_workers: int, max_queue: int, context: Optional[CryptContext] = None):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        if context is not None:
+            self.context = context
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+            if max_workers > 0 else None
+        )
+
+    def reset_after_fork(self):
+        """Start a fresh pool in a forked child: the parent's threads are not
+        copied, but its executor and counters are."""
+        self._lock = threading.Lock()
+        self._executor = None
+        self.queued = self.in_flight = 0
+        self.configure(self.max_workers, self.max_queue)
+
+    def _run(self, fn: Callable, *args):
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent password operations, retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self.queued += 1
+        if self._executor is None:
+            future: Future = Future()
+            try:
+                future.set_result(self._run(fn, *args))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+        return self._executor.submit(self._run, fn, *args)
+
+    def hash_sync(self, password: str) -> str:
+        return self._submit(self.context.hash, password).result()
+
+    def verify_sync(self, password: str, hashed: str) -> bool:
+        return self._submit(self.context.verify, password, hashed).result()
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self.context.hash, password))
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify ``password``; the second item is a new hash when ``hashed``
+        was made with a different cost factor and should be replaced."""
+        valid, new_hash = await asyncio.wrap_future(self._submit(self.context.verify_and_update, password, hashed))
+        if new_hash:
+            with self._lock:
+                self.rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self.queued,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+            }
+
+
+password_hasher = PasswordHasher(
+    build_context(settings.BCRYPT_ROUNDS),
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,353 @@
+import csv
+import io
+import json
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.config import settings
+from app.core.database import engine, get_async_engine
+from app.models.enums import ExportFormat
+from app.models.models import Project, Task, User
+from app.models.schemas import ImportReport, TaskImportRow
+
+# Errors beyond this many are counted in ``failed`` but not listed.
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_COLUMNS = (
+    "title", "description", "status", "priority", "project_id", "assigned_to_id",
+    "due_date", "created_at", "updated_at", "version",
+)
+
+
+def load_reference_ids(connection: Connection) -> Tuple[Set[int], Set[int]]:
+    """All project and user ids, so rows are validated without lookups."""
+    project_ids = set(connection.execute(select(Project.id)).scalars())
+    user_ids = set(connection.execute(select(User.id)).scalars())
+    return project_ids, user_ids
+
+
+def _copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # Enum columns store member names.
+    return getattr(value, "name", value)
+
+
+def _copy_rows(connection: Connection, rows: List[Dict]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(_copy_value(row[column]) for column in IMPORT_COLUMNS)
+    buffer.seek(0)
+    # In CSV format an unquoted empty field is NULL.
+    statement = f"COPY task ({', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(statement, buffer)
+    finally:
+        cursor.close()
+
+
+def insert_batch(connection: Connection, rows: List[Dict]):
+    """Write ``rows`` with COPY on psycopg2, otherwise one multi-row INSERT."""
+    if not rows:
+        return
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+        _copy_rows(connection, rows)
+    else:
+        connection.execute(insert(Task.__table__).values(rows))
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _raise(exc: Exception):
+    raise exc
+
+
+def _describe(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in exc.errors()
+        )
+    return str(exc)
+
+
+class TaskImporter:
+    """Parses NDJSON or CSV task input, validates each record against
+    preloaded project and user ids, and groups the valid rows into batches.
+
+    Input is fed one physical line at a time, so the same object serves a
+    file and a streamed request body. Records are numbered by NDJSON line or
+    by CSV data row (the header is row 0); those up to ``resume_from`` are
+    skipped. The caller writes each batch from ``take_batch`` in its own
+    transaction and then calls ``committed``, which moves ``checkpoint`` past
+    every record in it.
+    """
+
+    def __init__(
+        self,
+        import_format: ExportFormat,
+        project_ids: Set[int],
+        user_ids: Set[int],
+        resume_from: int = 0,
+        batch_size: Optional[int] = None,
+        max_line_bytes: Optional[int] = None,
+    ):
+        self.import_format = import_format
+        self.project_ids = project_ids
+        self.user_ids = user_ids
+        self.resume_from = resume_from
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.max_line_bytes = max_line_bytes or settings.IMPORT_MAX_LINE_BYTES
+        self.line = 0
+        self.checkpoint = resume_from
+        self.imported = 0
+        self.failed = 0
+        self.skipped = 0
+        self.errors: List[Dict] = []
+        self.error: Optional[str] = None
+        self.pending: List[Dict] = []
+        self._header: Optional[List[str]] = None
+        self._partial: List[str] = []
+        self._started = time.perf_counter()
+
+    @property
+    def batch_ready(self) -> bool:
+        return len(self.pending) >= self.batch_size
+
+    def feed_bytes(self, raw: bytes):
+        """``feed`` for an undecoded line. One that is not valid UTF-8, or
+        longer than ``max_line_bytes``, fails the record it belongs to; in
+        place of the CSV header, it stops the import, since no row can be read
+        without it."""
+        if len(raw.rstrip(b"\r\n")) > self.max_line_bytes:
+            self._reject_line(f"Line longer than {self.max_line_bytes} bytes")
+            return
+        try:
+            text = raw.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            self._reject_line(f"Invalid UTF-8 at byte {exc.start}: {exc.reason}")
+            return
+        self.feed(text)
+
+    def _reject_line(self, error: str):
+        self._partial = []
+        if self.import_format == ExportFormat.CSV and self._header is None:
+            self.abort(f"CSV header: {error}")
+        else:
+            self._record(lambda: _raise(ValueError(error)))
+
+    def feed(self, text: str):
+        if self.import_format == ExportFormat.CSV:
+            self._feed_csv(text)
+        elif text.strip():
+            self._record(lambda: json.loads(text))
+        else:
+            self.line += 1
+
+    def _feed_csv(self, text: str):
+        self._partial.append(text)
+        joined = "".join(self._partial)
+        if joined.count('"') % 2:
+            return  # inside a quoted field that continues on the next line
+        self._partial = []
+        if not joined.strip():
+            return
+        values = next(csv.reader([joined]))
+        if self._header is None:
+            self._header = values
+            return
+        self._record(lambda: self._csv_fields(values))
+
+    def _csv_fields(self, values: List[str]) -> Dict:
+        if len(values) != len(self._header):
+            raise ValueError(f"Expected {len(self._header)} fields, got {len(values)}")
+        # Empty cells fall back to the field defaults.
+        return {name: value for name, value in zip(self._header, values) if value != ""}
+
+    def _record(self, parse: Callable[[], Dict]):
+        self.line += 1
+        if self.line <= self.resume_from:
+            self.skipped += 1
+            return
+        try:
+            data = parse()
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
+            row = TaskImportRow.model_validate(data)
+            if row.project_id not in self.project_ids:
+                raise ValueError(f"Project {row.project_id} not found")
+            if row.assigned_to_id is not None and row.assigned_to_id not in self.user_ids:
+                raise ValueError(f"Assigned user {row.assigned_to_id} not found")
+        except ValueError as exc:
+            self._fail(_describe(exc))
+            return
+        now = datetime.utcnow()
+        created_at = _naive_utc(row.created_at) or now
+        self.pending.append({
+            "title": row.title,
+            "description": row.description,
+            "status": row.status,
+            "priority": row.priority,
+            "project_id": row.project_id,
+            "assigned_to_id": row.assigned_to_id,
+            "due_date": _naive_utc(row.due_date),
+            "created_at": created_at,
+            "updated_at": now,
+            "version": 1,
+        })
+
+    def _fail(self, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": self.line, "error": error})
+
+    def finish(self):
+        if self._partial:
+            self._partial = []
+            self.line += 1
+            self._fail("Unterminated quoted field")
+
+    @property
+    def has_unsaved(self) -> bool:
+        return bool(self.pending) or self.line > self.checkpoint
+
+    def take_batch(self) -> Tuple[List[Dict], int]:
+        """The pending rows, and the last line they account for."""
+        rows, self.pending = self.pending, []
+        return rows, self.line
+
+    def committed(self, count: int, through: int):
+        self.imported += count
+        self.checkpoint = through
+
+    def abort(self, error: str):
+        self.error = error
+
+    def report(self) -> ImportReport:
+        elapsed = time.perf_counter() - self._started
+        return ImportReport(
+            imported=self.imported,
+            failed=self.failed,
+            skipped=self.skipped,
+            checkpoint=self.checkpoint,
+            completed=self.error is None,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(self.imported / elapsed, 1) if elapsed else 0.0,
+            errors=self.errors,
+            error=self.error,
+        )
+
+
+def write_batch(target: Engine, rows: List[Dict]):
+    with target.begin() as connection:
+        insert_batch(connection, rows)
+
+
+def import_lines(
+    target: Engine,
+    importer: TaskImporter,
+    lines: Iterable[bytes],
+    on_commit: Optional[Callable[[TaskImporter], None]] = None,
+) -> ImportReport:
+    """Feed ``lines`` (of a file opened in binary mode) through ``importer``,
+    committing one batch at a time.
+
+    A database error stops the import; ``checkpoint`` in the report is the
+    line to resume from.
+    """
+    def flush():
+        rows, through = importer.take_batch()
+        write_batch(target, rows)
+        importer.committed(len(rows), through)
+        if on_commit:
+            on_commit(importer)
+
+    try:
+        for line in lines:
+            importer.feed_bytes(line)
+            if importer.error:
+                return importer.report()
+            if importer.batch_ready:
+                flush()
+        importer.finish()
+        if importer.has_unsaved:
+            flush()
+    except SQLAlchemyError as exc:
+        importer.abort(str(exc.orig if getattr(exc, "orig", None) else exc))
+    return importer.report()
+
+
+def _load_reference_ids_sync(target: Engine) -> Tuple[Set[int], Set[int]]:
+    with target.connect() as connection:
+        return load_reference_ids(connection)
+
+
+async def load_reference_ids_async() -> Tuple[Set[int], Set[int]]:
+    if settings.DB_ASYNC:
+        async with get_async_engine().connect() as connection:
+            return await connection.run_sync(load_reference_ids)
+    return await run_in_threadpool(_load_reference_ids_sync, engine)
+
+
+async def _write_batch_async(rows: List[Dict]):
+    if settings.DB_ASYNC:
+        async with get_async_engine().begin() as connection:
+            await connection.run_sync(insert_batch, rows)
+    else:
+        await run_in_threadpool(write_batch, engine, rows)
+
+
+async def _lines(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    # Split before decoding: no UTF-8 sequence contains a newline byte, and
+    # an invalid one then fails only its own line. Only each new chunk is
+    # split; the unfinished line is carried over as a list of pieces, and
+    # cut off past ``max_bytes`` for ``feed_bytes`` to reject.
+    pieces: List[bytes] = []
+    size = 0
+    async for chunk in chunks:
+        *complete, rest = chunk.split(b"\n")
+        for piece in complete:
+            pieces.append(piece[:max_bytes + 1 - size] if size <= max_bytes else b"")
+            yield b"".join(pieces) + b"\n"
+            pieces, size = [], 0
+        if size <= max_bytes:
+            rest = rest[:max_bytes + 1 - size]
+            pieces.append(rest)
+            size += len(rest)
+    if size:
+        yield b"".join(pieces)
+
+
+async def import_stream(importer: TaskImporter, chunks: AsyncIterator[bytes]) -> ImportReport:
+    """``import_lines`` for a streamed request body, through whichever
+    engine the API is using."""
+    async def flush():
+        rows, through = importer.take_batch()
+        await _write_batch_async(rows)
+        importer.committed(len(rows), through)
+
+    try:
+        async for line in _lines(chunks, importer.max_line_bytes):
+            importer.feed_bytes(line)
+            if importer.error:
+                return importer.report()
+            if importer.batch_ready:
+                await flush()
+        importer.finish()
+        if importer.has_unsaved:
+            await flush()
+    except SQLAlchemyError as exc:
+        importer.abort(str(exc.orig if getattr(exc, "orig", None) else exc))
+    return importer.report()
@@ -0,0 +1,236 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+from app.core.query_recorder import QUERY_COUNT_HEADER, QUERY_DEBUG_HEADER, QueryRecorder, current_recorder
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series: Dict[Tuple, List] = {}
+
+    def observe(self, label_values: Tuple, value: float):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Process-wide request, query and connection-pool metrics, rendered in
+    the Prometheus text exposition format by ``render``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Request latency by route template.", ("method", "route"), LATENCY_BUCKETS,
+        )
+        self.request_queries = Histogram(
+            "db_queries_per_request", "Database queries issued per request.", ("method", "route"), QUERY_COUNT_BUCKETS,
+        )
+        self.request_db_time = Histogram(
+            "db_seconds_per_request", "Time spent in database queries per request.", ("method", "route"), LATENCY_BUCKETS,
+        )
+        self.pool_wait = Histogram(
+            "db_pool_wait_seconds", "Time to get a connection from the pool.", ("engine",), LATENCY_BUCKETS,
+        )
+        self.queries = 0
+        self.query_seconds = 0.0
+        self._engines: Dict[str, Engine] = {}
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def add_collector(self, collect: Callable[[], List[str]]):
+        """Append the exposition lines ``collect()`` returns to every render."""
+        self._collectors.append(collect)
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, method: str, route: str, status_code: int, seconds: float, db: QueryRecorder):
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            self.requests[(method, route, status_code)] = self.requests.get((method, route, status_code), 0) + 1
+            self.latency.observe(key, seconds)
+            self.request_queries.observe(key, db.queries)
+            self.request_db_time.observe(key, db.seconds)
+
+    def query_finished(self, statement: str, parameters, seconds: float, executemany: bool = False):
+        recorder = current_recorder.get()
+        if recorder is not None:
+            recorder.record(statement, parameters, seconds, executemany)
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+
+    def pool_wait_finished(self, engine_name: str, seconds: float):
+        with self._lock:
+            self.pool_wait.observe((engine_name,), seconds)
+
+    def instrument_engine(self, engine: Engine, name: str):
+        """Time every cursor execution on ``engine`` (a sync engine, or an
+        async engine's ``sync_engine``) and report its pool at scrape time."""
+        self._engines[name] = engine
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            seconds = time.perf_counter() - conn.info["query_started"].pop()
+            self.query_finished(statement, parameters, seconds, executemany)
+
+    def _pool_lines(self) -> List[str]:
+        gauges = {
+            "db_pool_size": ("Configured pool size.", lambda pool: pool.size()),
+            "db_pool_checked_out": ("Connections currently checked out.", lambda pool: pool.checkedout()),
+            "db_pool_checked_in": ("Idle connections in the pool.", lambda pool: pool.checkedin()),
+            # QueuePool.overflow() counts up from -pool_size
+            "db_pool_overflow": ("Connections open beyond pool_size.", lambda pool: max(0, pool.overflow())),
+        }
+        lines = []
+        for name, (help_text, read) in gauges.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for engine_name, engine in sorted(self._engines.items()):
+                if isinstance(engine.pool, QueuePool):
+                    lines.append(f'{name}{{engine="{engine_name}"}} {read(engine.pool)}')
+        return lines
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP http_requests_in_flight Requests currently being served.",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+                "# HELP http_requests_total Requests by route template and status code.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status_code), count in sorted(self.requests.items()):
+                labels = _labels(("method", "route", "status"), (method, route, status_code))
+                lines.append(f"http_requests_total{{{labels}}} {count}")
+            for histogram in (self.latency, self.request_queries, self.request_db_time, self.pool_wait):
+                lines += histogram.render()
+            lines += [
+                "# HELP db_queries_total Database queries executed.",
+                "# TYPE db_queries_total counter",
+                f"db_queries_total {self.queries}",
+                "# HELP db_query_seconds_total Time spent executing database queries.",
+                "# TYPE db_query_seconds_total counter",
+                f"db_query_seconds_total {self.query_seconds}",
+            ]
+        lines += self._pool_lines()
+        for collect in self._collectors:
+            lines += collect()
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class _TimedPoolMixin:
+    # _do_get is where QueuePool blocks for a free connection (or opens one).
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.pool_wait_finished(self._metrics_name, time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    _metrics_name = "sync"
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    _metrics_name = "async"
+
+
+def timed_pool_class(engine_name: str, is_async: bool = False):
+    """A timed pool class reporting its waits under ``engine_name``."""
+    base = TimedAsyncQueuePool if is_async else TimedQueuePool
+    return type(base.__name__, (base,), {"_metrics_name": engine_name})
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and database work per
+    route template (``/api/v1/tasks/{task_id}``, not the raw path).
+
+    A request sending ``X-Debug-Queries: 1`` gets the number of queries run
+    before its response started in ``X-DB-Query-Count``, as does every
+    response with ``QUERY_COUNT_HEADER_ALWAYS``. Statements repeated within
+    one request are logged as suspected N+1s.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status_code = 500
+        recorder = QueryRecorder()
+        token = current_recorder.set(recorder)
+        report_queries = settings.QUERY_COUNT_HEADER_ALWAYS or (
+            (QUERY_DEBUG_HEADER.lower().encode(), b"1") in scope.get("headers", [])
+        )
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if report_queries:
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.lower().encode(), str(recorder.queries).encode()))
+                    message = dict(message, headers=headers)
+            await send(message)
+
+        metrics.request_started()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_name = getattr(route, "path", None) or scope.get("root_path") or "unmatched"
+            metrics.request_finished(scope["method"], route_name, status_code, time.perf_counter() - start, recorder)
+            recorder.report_repeated(scope["method"], route_name)
+            current_recorder.reset(token)
@@ -0,0 +1,131 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex
+from sqlmodel import SQLModel
+import app.models.models  # noqa: F401  (registers the tables on SQLModel.metadata)
+from app.models.models import POSTGRES_SEARCH_DDL, SQLITE_FTS_DDL, TaskTombstone
+
+logger = logging.getLogger(__name__)
+
+# Key for pg_advisory_xact_lock; shared by every process running migrations.
+MIGRATION_LOCK_KEY = 7316112
+
+schema_metadata = MetaData()
+schema_version = Table(
+    "schema_version", schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False, server_default=func.now()),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _baseline(connection: Connection):
+    # create_all skips tables that already exist, so this also adopts
+    # databases created before migrations were tracked.
+    SQLModel.metadata.create_all(connection)
+
+
+def _task_change_tracking(connection: Connection):
+    TaskTombstone.__table__.create(connection, checkfirst=True)
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_task_updated_at_id ON task (updated_at, id)")
+
+
+def _adopted_schema(connection: Connection):
+    # Indexes and full-text search added to existing tables before migrations
+    # were tracked: the baseline's create_all skipped those tables, so an
+    # adopted database lacks them. Everything here is IF NOT EXISTS.
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+    if connection.dialect.name == "postgresql":
+        for statement in POSTGRES_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+    elif connection.dialect.name == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            connection.exec_driver_sql(statement)
+        # Index the rows that predate the triggers.
+        connection.exec_driver_sql("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+
+
+# Append-only: a released migration is never edited, a schema change gets the
+# next version. An empty database is built from the current models and
+# stamped with every version instead of replaying them.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline schema", _baseline),
+    Migration(2, "task tombstones and updated_at index for delta sync", _task_change_tracking),
+    Migration(3, "keyset, label filter and full-text search indexes on adopted databases", _adopted_schema),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def connect(engine: Engine, timeout: float) -> Connection:
+    """``engine.connect()``, retried with backoff for up to ``timeout``
+    seconds while the database is starting."""
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    while True:
+        try:
+            return engine.connect()
+        except OperationalError:
+            if time.monotonic() + delay > deadline:
+                raise
+            logger.warning("Database not reachable, retrying in %.1fs", delay)
+            time.sleep(delay)
+            delay = min(delay * 2, 2.0)
+
+
+def _lock(connection: Connection):
+    """Serialize migration runs across processes until the transaction ends."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(select(func.pg_advisory_xact_lock(MIGRATION_LOCK_KEY)))
+    elif connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def current_version(connection: Connection) -> Optional[int]:
+    """Highest applied migration, or None for an unmigrated database."""
+    if not inspect(connection).has_table(schema_version.name):
+        return None
+    return connection.execute(select(func.max(schema_version.c.version))).scalar()
+
+
+def migrate(engine: Engine, timeout: float = 60.0) -> List[int]:
+    """Apply pending migrations in one transaction, under a lock so that
+    concurrent workers run them once. Returns the versions applied."""
+    with connect(engine, timeout) as connection:
+        _lock(connection)
+        fresh = not inspect(connection).get_table_names()
+        schema_metadata.create_all(connection)
+        applied = set(connection.execute(select(schema_version.c.version)).scalars())
+        pending = [migration for migration in MIGRATIONS if migration.version not in applied]
+        if fresh:
+            SQLModel.metadata.create_all(connection)
+        for migration in pending:
+            if not fresh:
+                logger.info("Applying migration %d: %s", migration.version, migration.description)
+                migration.apply(connection)
+            connection.execute(schema_version.insert().values(
+                version=migration.version, description=migration.description,
+            ))
+        connection.commit()
+    return [migration.version for migration in pending]
+
+
+def reset_schema(engine: Engine):
+    """Drop every table, including the migration history. For scratch and
+    benchmark databases only."""
+    with engine.begin() as connection:
+        SQLModel.metadata.drop_all(connection)
+        schema_metadata.drop_all(connection)
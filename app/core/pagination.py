@@ -0,0 +1,147 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+@dataclass
+class SortKey:
+    """A column a list endpoint can be ordered and keyset-paged on.
+
+    ``column`` is the SQL expression used in ORDER BY / WHERE, ``value``
+    extracts the same key from a fetched row so the next cursor can be built
+    without another query, and ``parse`` turns the JSON cursor value back into
+    something comparable with ``column``.
+    """
+    column: Any
+    value: Callable[[Any], Any]
+    parse: Callable[[Any], Any] = _identity
+    nullable: bool = False
+
+
+def datetime_key(column: Any, attr: str, nullable: bool = False) -> SortKey:
+    return SortKey(
+        column=column,
+        value=lambda row: getattr(row, attr),
+        parse=datetime.fromisoformat,
+        nullable=nullable,
+    )
+
+
+def attr_key(column: Any, attr: str) -> SortKey:
+    return SortKey(column=column, value=lambda row: getattr(row, attr))
+
+
+@dataclass
+class Page:
+    """Result of ``paginate``: the rows plus the cursor for the following page."""
+    items: List[Any]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    payload = json.dumps({"s": sort, "v": _encode_value(value), "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, key: SortKey) -> Tuple[Any, int]:
+    invalid = HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = int(payload["id"])
+        value = payload["v"]
+        if payload["s"] != sort:
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested sort order")
+        if value is not None:
+            value = key.parse(value)
+    except HTTPException:
+        raise
+    except (ValueError, KeyError, TypeError):
+        raise invalid
+    return value, last_id
+
+
+def parse_sort(sort: str, sort_keys: Dict[str, SortKey]) -> Tuple[str, SortKey, bool]:
+    descending = sort.startswith("-")
+    name = sort[1:] if descending else sort
+    if name not in sort_keys:
+        allowed = ", ".join(sorted(sort_keys))
+        raise HTTPException(status_code=400, detail=f"Invalid sort key '{name}'. Allowed: {allowed}")
+    return name, sort_keys[name], descending
+
+
+def _seek_condition(key: SortKey, pk: Any, value: Any, last_id: int, descending: bool):
+    if key.column is pk:
+        return pk < last_id if descending else pk > last_id
+    # NULLs always sort last, in either direction.
+    if value is None:
+        return and_(key.column.is_(None), pk < last_id if descending else pk > last_id)
+    if descending:
+        condition = tuple_(key.column, pk) < tuple_(value, last_id)
+    else:
+        condition = tuple_(key.column, pk) > tuple_(value, last_id)
+    if key.nullable:
+        condition = or_(condition, key.column.is_(None))
+    return condition
+
+
+def paginate(
+    session,
+    query,
+    pk: Any,
+    sort_keys: Dict[str, SortKey],
+    sort: str = "id",
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> Page:
+    """Order ``query`` by ``sort`` (``-`` prefix for descending) with ``pk`` as
+    tie-breaker and fetch one page.
+
+    With ``cursor`` the page seeks past the last row of the previous page on
+    the indexed sort key instead of scanning ``skip`` rows, so deep pages cost
+    the same as the first one and do not shift when earlier rows change.
+    """
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="Use either skip or cursor, not both")
+
+    _, key, descending = parse_sort(sort, sort_keys)
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort, key)
+        query = query.where(_seek_condition(key, pk, value, last_id, descending))
+    elif skip:
+        query = query.offset(skip)
+
+    if key.column is pk:
+        order_by = [pk.desc() if descending else pk.asc()]
+    else:
+        column_order = key.column.desc() if descending else key.column.asc()
+        if key.nullable:
+            column_order = column_order.nullslast()
+        order_by = [column_order, pk.desc() if descending else pk.asc()]
+
+    # Fetch one extra row to learn whether another page exists.
+    rows = session.exec(query.order_by(*order_by).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if rows:
+            last = rows[-1]
+            next_cursor = encode_cursor(sort, key.value(last), last.id)
+    return Page(items=list(rows), next_cursor=next_cursor)
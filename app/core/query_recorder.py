@@ -0,0 +1,76 @@
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, List, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+# Request header (value "1") asking for QUERY_COUNT_HEADER on the response.
+QUERY_DEBUG_HEADER = "X-Debug-Queries"
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|\?|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\?, )*\?\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES (?:\((?:\?, )*\?\)(?:, )?)+", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """``statement`` with literals, placeholders and IN/VALUES lists folded,
+    so the same query with different arguments gives the same string."""
+    text = _WHITESPACE.sub(" ", statement).strip()
+    text = _STRING.sub("?", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _IN_LIST.sub("IN (...)", text)
+    return _VALUES_LIST.sub("VALUES (...)", text)
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Types of the bound parameters, never their values."""
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} x {parameter_shape(rows[0]) if rows else '()'}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+class QueryRecorder:
+    """Database work done while serving one request.
+
+    Counts queries and their time, and how often each statement fingerprint
+    ran; the same fingerprint running ``N_PLUS_ONE_THRESHOLD`` or more times
+    in one request is reported as a suspected N+1.
+    """
+    __slots__ = ("queries", "seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, parameters: Any, seconds: float, executemany: bool = False):
+        self.queries += 1
+        self.seconds += seconds
+        statement = fingerprint(statement)
+        self.statements[statement] += 1
+        if seconds * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning(
+                "Slow query (%.1f ms): %s params=%s", seconds * 1000, statement, parameter_shape(parameters, executemany),
+            )
+
+    def repeated(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        threshold = threshold or settings.N_PLUS_ONE_THRESHOLD
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def report_repeated(self, method: str, route: str):
+        for statement, count in self.repeated():
+            logger.warning("Suspected N+1 on %s %s: %d x %s", method, route, count, statement)
+
+
+current_recorder: ContextVar[Optional[QueryRecorder]] = ContextVar("current_recorder", default=None)
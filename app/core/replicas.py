@@ -0,0 +1,166 @@
+import itertools
+import logging
+import math
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import Callable, Iterable, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.query_recorder import current_recorder
+
+logger = logging.getLogger(__name__)
+
+# Set on responses to successful writes; while it is valid the client's reads
+# go to the primary, so it sees its own writes despite replication lag.
+PRIMARY_COOKIE = "read_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Seconds the replica is behind. Zero when it has replayed everything it
+# received, since an idle primary leaves the last replay timestamp old.
+LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp()) END"
+    ),
+}
+
+
+class Replica:
+    """A read replica's engines and its last known health."""
+
+    def __init__(self, name: str, engine: Engine, make_async_engine: Callable[[], AsyncEngine]):
+        self.name = name
+        self.engine = engine
+        self._make_async_engine = make_async_engine
+        self._async_engine: Optional[AsyncEngine] = None
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self.checked_at = float("-inf")
+        self._checking = threading.Lock()
+        event.listen(engine, "handle_error", self._on_error)
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        if self._async_engine is None:
+            self._async_engine = self._make_async_engine()
+            event.listen(self._async_engine.sync_engine, "handle_error", self._on_error)
+        return self._async_engine
+
+    def reset_after_fork(self):
+        self.engine.dispose(close=False)
+        self._async_engine = None
+        self._checking = threading.Lock()
+
+    def due(self) -> bool:
+        return time.monotonic() - self.checked_at >= settings.REPLICA_CHECK_INTERVAL
+
+    def check(self):
+        """Measure lag, unless another thread is already doing it."""
+        if not self._checking.acquire(blocking=False):
+            return
+        # The probe is not part of the request that happened to trigger it.
+        token = current_recorder.set(None)
+        try:
+            query = LAG_QUERIES.get(self.engine.dialect.name, "SELECT 0")
+            with self.engine.connect() as connection:
+                lag = float(connection.execute(text(query)).scalar() or 0)
+            self._set_health(lag <= settings.REPLICA_MAX_LAG_SECONDS, lag)
+        except SQLAlchemyError as e:
+            self._set_health(False, None, e)
+        finally:
+            current_recorder.reset(token)
+            self._checking.release()
+
+    def _set_health(self, healthy: bool, lag: Optional[float], error: Optional[Exception] = None):
+        if healthy != self.healthy:
+            if healthy:
+                logger.warning("Replica %s is back (lag %.1fs)", self.name, lag)
+            elif error is not None:
+                logger.warning("Replica %s unavailable, reading from the primary: %s", self.name, error)
+            else:
+                logger.warning("Replica %s is %.1fs behind, reading from the primary", self.name, lag)
+        self.healthy, self.lag, self.checked_at = healthy, lag, time.monotonic()
+
+    def _on_error(self, context):
+        # A dropped connection takes the replica out until its next check.
+        if context.is_disconnect:
+            self._set_health(False, None, context.original_exception)
+
+
+def wants_primary(cookie_header: Optional[str]) -> bool:
+    """The client wrote within the last READ_STICKY_SECONDS."""
+    if not cookie_header:
+        return False
+    cookie = SimpleCookie()
+    try:
+        cookie.load(cookie_header)
+        return float(cookie[PRIMARY_COOKIE].value) > time.time()
+    except (KeyError, ValueError, TypeError):
+        return False
+
+
+class ReadRouter:
+    """Round-robins reads over the healthy replicas; ``pick`` returns None
+    when the primary should serve the read."""
+
+    def __init__(self, replicas: List[Replica]):
+        self.replicas = replicas
+        self._next = itertools.count()
+
+    def candidates(self, cookie_header: Optional[str]) -> List[Replica]:
+        if not self.replicas or wants_primary(cookie_header):
+            return []
+        start = next(self._next) % len(self.replicas)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def pick(self, cookie_header: Optional[str]) -> Optional[Replica]:
+        for replica in self.candidates(cookie_header):
+            if replica.due():
+                replica.check()
+            if replica.healthy:
+                return replica
+        return None
+
+    async def pick_async(self, cookie_header: Optional[str]) -> Optional[Replica]:
+        for replica in self.candidates(cookie_header):
+            if replica.due():
+                await run_in_threadpool(replica.check)
+            if replica.healthy:
+                return replica
+        return None
+
+
+def primary_cookie() -> str:
+    """``Set-Cookie`` value sending the client's reads to the primary for
+    ``READ_STICKY_SECONDS``."""
+    sticky = settings.READ_STICKY_SECONDS
+    return f"{PRIMARY_COOKIE}={time.time() + sticky:.3f}; Max-Age={math.ceil(sticky)}; Path=/; HttpOnly; SameSite=Lax"
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware setting ``PRIMARY_COOKIE`` on successful writes.
+
+    ``exempt_paths`` are unsafe-method routes that decide for themselves
+    (a batch only writes when one of its sub-requests does)."""
+
+    def __init__(self, app, exempt_paths: Iterable[str] = ()):
+        self.app = app
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or scope["path"] in self.exempt_paths:
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = primary_cookie()
+                message = dict(message, headers=[*message.get("headers", []), (b"set-cookie", cookie.encode())])
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
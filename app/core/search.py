@@ -0,0 +1,47 @@
+import re
+from typing import Tuple
+from sqlalchemy import func, literal_column, or_
+from sqlalchemy.sql import column, table
+from sqlmodel import select
+from app.models.models import Task
+
+task_fts = table("task_fts", column("rowid"))
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(q: str) -> str:
+    # Quote every term so user input cannot inject FTS5 query syntax; terms
+    # are ANDed and the last one also matches as a prefix.
+    terms = _TOKEN.findall(q)
+    if not terms:
+        return '""'
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_tasks_query(dialect: str, q: str) -> Tuple:
+    """Return ``(select(Task, score), order_by)`` matching ``q``, best match
+    first. See ``app/models/models.py`` for the index definitions."""
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery("english", q)
+        vector = literal_column("task.search_vector")
+        score = func.ts_rank(vector, tsquery).label("score")
+        query = select(Task, score).where(vector.op("@@")(tsquery))
+        return query, [score.desc(), Task.id]
+    if dialect == "sqlite":
+        # bm25() is lower-is-better; negate so the score reads like ts_rank.
+        score = (-func.bm25(literal_column("task_fts"))).label("score")
+        query = (
+            select(Task, score)
+            .join(task_fts, task_fts.c.rowid == Task.id)
+            .where(literal_column("task_fts").op("MATCH")(_fts5_query(q)))
+        )
+        return query, [score.desc(), Task.id]
+    # No full-text index for this backend: unranked substring match.
+    pattern = f"%{q}%"
+    query = select(Task, literal_column("0").label("score")).where(
+        or_(Task.title.ilike(pattern), Task.description.ilike(pattern))
+    )
+    return query, [Task.id]
@@ -0,0 +1,57 @@
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from fastapi import HTTPException, Response
+from fastapi.responses import ORJSONResponse
+
+# Headers the rendered body sets itself.
+_BODY_HEADERS = (b"content-length", b"content-type")
+
+
+class RowSerializer:
+    """Reads a fixed tuple of attributes off an ORM object or a column row
+    into a dict, with one ``attrgetter`` call and no model validation.
+
+    Values are left as Python objects (datetimes, enums) for orjson, which
+    encodes them the same way the response models do.
+    """
+
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = fields
+        getter = operator.attrgetter(*fields)
+        self._values: Callable[[Any], tuple] = getter if len(fields) > 1 else lambda row: (getter(row),)
+
+    def __call__(self, row) -> Dict[str, Any]:
+        return dict(zip(self.fields, self._values(row)))
+
+
+@lru_cache(maxsize=256)
+def serializer_for(fields: Tuple[str, ...]) -> RowSerializer:
+    """The serializer for ``fields``, built once per distinct tuple. Bounded,
+    since ``?fields=`` subsets come from clients."""
+    return RowSerializer(fields)
+
+
+def parse_fields(fields: Optional[str], allowed: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """``?fields=a,b`` as a tuple of ``allowed`` names, ``id`` first and the
+    rest in ``allowed`` order, whatever order the client used; None when not
+    given."""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid fields '{', '.join(unknown)}'. Allowed: {', '.join(allowed)}",
+        )
+    requested = set(names)
+    return ("id", *(name for name in allowed if name in requested and name != "id"))
+
+
+def json_list(items: Iterable[Dict[str, Any]], response: Optional[Response] = None) -> ORJSONResponse:
+    """Render ``items`` with orjson, keeping the headers (ETag, cursor)
+    already set on the route's injected ``response``."""
+    rendered = ORJSONResponse(list(items))
+    if response is not None:
+        rendered.raw_headers.extend(header for header in response.raw_headers if header[0] not in _BODY_HEADERS)
+    return rendered
@@ -0,0 +1,125 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from sqlalchemy import func
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.models.enums import TaskPriority, TaskStatus
+from app.models.models import Project, Task, User
+
+
+class StatsCache:
+    """In-process aggregate counts for the dashboard.
+
+    The first read loads the counts with GROUP BY queries; afterwards every
+    write path in the API adjusts them in place, so reads never touch the
+    database. A write wraps its commit and its adjustment in ``writing()``,
+    so a load that may have seen the commit but not the adjustment is not
+    cached and the row is not counted twice. Writes whose effect on the
+    counts is not known (bulk status changes, seeding) call ``invalidate``
+    and the next read reloads.
+    With ``ttl_seconds`` the counts are also reloaded once they are that
+    old, which bounds staleness from writes made by other processes.
+    """
+
+    def __init__(self, ttl_seconds: float = 0):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._counts: Optional[Dict] = None
+        self._expires_at = float("inf")
+        # Bumped as every write starts and ends, and a load is only cached
+        # when no write was in flight or finished while it ran.
+        self._generation = 0
+        self._writers = 0
+
+    def _load(self, session: Session) -> Dict:
+        by_status = {status.value: 0 for status in TaskStatus}
+        for task_status, count in session.exec(select(Task.status, func.count()).group_by(Task.status)):
+            by_status[TaskStatus(task_status).value] = count
+        by_priority = {priority.value: 0 for priority in TaskPriority}
+        for priority, count in session.exec(select(Task.priority, func.count()).group_by(Task.priority)):
+            by_priority[TaskPriority(priority).value] = count
+        return {
+            "total_users": session.exec(select(func.count()).select_from(User).where(User.is_active == True)).one(),
+            "total_projects": session.exec(select(func.count()).select_from(Project).where(Project.is_active == True)).one(),
+            "total_tasks": sum(by_status.values()),
+            "tasks_by_status": by_status,
+            "tasks_by_priority": by_priority,
+        }
+
+    @staticmethod
+    def _copy(counts: Dict) -> Dict:
+        return {
+            **counts,
+            "tasks_by_status": dict(counts["tasks_by_status"]),
+            "tasks_by_priority": dict(counts["tasks_by_priority"]),
+        }
+
+    def get(self, session: Session) -> Dict:
+        with self._lock:
+            if self._counts is not None and time.monotonic() < self._expires_at:
+                return self._copy(self._counts)
+            generation = self._generation
+        counts = self._load(session)
+        with self._lock:
+            if self._generation == generation and not self._writers:
+                self._counts = counts
+                self._expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else float("inf")
+        return self._copy(counts)
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        """Wrap a write's commit and the adjustment that follows it."""
+        with self._lock:
+            self._writers += 1
+            self._generation += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._writers -= 1
+                self._generation += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._counts = None
+
+    def _adjust(self, key: str, delta: int, status: Optional[TaskStatus] = None, priority: Optional[TaskPriority] = None):
+        with self._lock:
+            self._generation += 1
+            if self._counts is None:
+                return
+            self._counts[key] += delta
+            if status is not None:
+                self._counts["tasks_by_status"][TaskStatus(status).value] += delta
+            if priority is not None:
+                self._counts["tasks_by_priority"][TaskPriority(priority).value] += delta
+
+    def task_created(self, task: Task):
+        self._adjust("total_tasks", 1, task.status, task.priority)
+
+    def task_deleted(self, status: TaskStatus, priority: TaskPriority):
+        self._adjust("total_tasks", -1, status, priority)
+
+    def task_changed(self, old_status: TaskStatus, old_priority: TaskPriority, task: Task):
+        if old_status == task.status and old_priority == task.priority:
+            return
+        self._adjust("total_tasks", -1, old_status, old_priority)
+        self._adjust("total_tasks", 1, task.status, task.priority)
+
+    def project_created(self, project: Project):
+        if project.is_active:
+            self._adjust("total_projects", 1)
+
+    def user_created(self, user: User):
+        if user.is_active:
+            self._adjust("total_users", 1)
+
+    def user_activity_changed(self, was_active: bool, is_active: bool):
+        if was_active != is_active:
+            self._adjust("total_users", 1 if is_active else -1)
+
+
+stats_cache = StatsCache(settings.STATS_CACHE_TTL_SECONDS)
@@ -0,0 +1,40 @@
+import logging
+import os
+from app.core.auth import principal_cache
+from app.core.changes import purge_tombstones
+from app.core.config import settings
+from app.core.database import dispose_engines_after_fork, engine, seed_initial_data
+from app.core.hashing import password_hasher
+from app.core.migrations import LATEST_VERSION, migrate
+from app.core.stats import stats_cache
+
+
+def run_startup_tasks():
+    """Migrations and the tombstone purge, then the optional seed: once per
+    deployment. A single process runs them from its startup event; under
+    gunicorn the master runs them before forking and the workers skip them."""
+    if settings.MIGRATE_ON_STARTUP:
+        applied = migrate(engine, timeout=settings.DB_STARTUP_TIMEOUT)
+        logging.info(f"Schema at version {LATEST_VERSION} ({len(applied)} migrations applied)")
+        with engine.begin() as connection:
+            purge_tombstones(connection)
+    if settings.SEED_ON_STARTUP:
+        seed_initial_data()
+
+
+def skip_startup_tasks():
+    """Turn the startup tasks off for processes forked (or started) from here on."""
+    settings.MIGRATE_ON_STARTUP = settings.SEED_ON_STARTUP = False
+    os.environ["MIGRATE_ON_STARTUP"] = os.environ["SEED_ON_STARTUP"] = "false"
+
+
+def reset_after_fork():
+    """Per-process state a forked worker must not share with its parent:
+    pooled connections, the hashing thread pool and the in-process caches."""
+    dispose_engines_after_fork()
+    password_hasher.reset_after_fork()
+    principal_cache.clear()
+    stats_cache.invalidate()
+
+
+os.register_at_fork(after_in_child=reset_after_fork)
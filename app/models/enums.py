@@ -12,4 +12,12 @@ class TaskStatus(str, Enum):
 class TaskPriority(str, Enum):
     LOW = "low"
     MEDIUM = "medium"
-    HIGH = "high"
\ No newline at end of file
+    HIGH = "high"
+
+class LabelMatch(str, Enum):
+    ANY = "any"
+    ALL = "all"
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
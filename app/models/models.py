@@ -1,3 +1,4 @@
+from sqlalchemy import DDL, Index, case, event, literal_column
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
 from datetime import datetime
@@ -5,7 +6,9 @@ from app.models.enums import UserRole, TaskStatus, TaskPriority
 
 class TaskLabelLink(SQLModel, table=True):
     task_id: Optional[int] = Field(default=None, foreign_key="task.id", primary_key=True)
-    label_id: Optional[int] = Field(default=None, foreign_key="label.id", primary_key=True)
+    # Indexed on its own for label filters: the primary key only serves
+    # lookups that lead with task_id.
+    label_id: Optional[int] = Field(default=None, foreign_key="label.id", primary_key=True, index=True)
 
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -55,4 +58,72 @@ class Task(SQLModel, table=True):
     
     project: Project = Relationship(back_populates="tasks")
     assigned_to: Optional[User] = Relationship()
-    labels: List[Label] = Relationship(back_populates="tasks", link_model=TaskLabelLink)
\ No newline at end of file
+    labels: List[Label] = Relationship(back_populates="tasks", link_model=TaskLabelLink)
+
+class TaskTombstone(SQLModel, table=True):
+    """A deleted task, kept for TASK_TOMBSTONE_RETENTION_DAYS so delta sync
+    (/tasks/changes) can report the deletion."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+# Ordinal rank of Task.priority (low < medium < high) so it sorts by meaning
+# rather than by its stored string. Enum columns store the member name. The
+# whens are rendered as literals so queries match the expression index below.
+task_priority_rank = case(
+    *[
+        (literal_column(f"'{priority.name}'"), literal_column(str(rank)))
+        for rank, priority in enumerate(TaskPriority)
+    ],
+    value=Task.__table__.c.priority,
+)
+
+# Composite (sort key, id) indexes backing keyset pagination on the task list.
+Index("ix_task_due_date_id", Task.__table__.c.due_date, Task.__table__.c.id)
+Index("ix_task_created_at_id", Task.__table__.c.created_at, Task.__table__.c.id)
+Index("ix_task_priority_rank_id", task_priority_rank, Task.__table__.c.id)
+Index("ix_project_created_at_id", Project.__table__.c.created_at, Project.__table__.c.id)
+Index("ix_user_created_at_id", User.__table__.c.created_at, User.__table__.c.id)
+
+# (updated_at, id) and (deleted_at, id) keysets behind delta sync.
+Index("ix_task_updated_at_id", Task.__table__.c.updated_at, Task.__table__.c.id)
+Index("ix_tasktombstone_deleted_at_id", TaskTombstone.__table__.c.deleted_at, TaskTombstone.__table__.c.id)
+
+# Full-text index over task title + description.
+#
+# PostgreSQL: a generated tsvector column with a GIN index, so every INSERT or
+# UPDATE of a task keeps it current inside the same statement.
+# SQLite: an external-content FTS5 table kept in sync by triggers on task.
+# Both are created right after the task table, so create_all sets them up.
+
+TASK_TSVECTOR = (
+    "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+)
+
+# IF NOT EXISTS throughout, so migration 3 can run the same statements on a
+# database adopted from before migrations were tracked.
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({TASK_TSVECTOR}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_task_search_vector ON task USING GIN (search_vector)",
+]
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "title, description, content='task', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF title, description ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+for statement in SQLITE_FTS_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+# The triggers go with the task table; the virtual table has to be dropped too.
+event.listen(Task.__table__, "before_drop", DDL("DROP TABLE IF EXISTS task_fts").execute_if(dialect="sqlite"))
@@ -1,7 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
-from app.models.enums import UserRole
+from app.models.enums import UserRole, TaskStatus, TaskPriority
 
 class Token(BaseModel):
     access_token: str
@@ -32,9 +32,124 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class BulkItem(BaseModel):
+    id: int
+    version: Optional[int] = None
+
 class UserUpdate(BaseModel):
     email: Optional[str] = None
     name: Optional[str] = None
     role: Optional[UserRole] = None
     is_active: Optional[bool] = None
-    version: int
\ No newline at end of file
+    # Optional when the request carries If-Match instead.
+    version: Optional[int] = None
+
+class StatsResponse(BaseModel):
+    total_users: int
+    total_projects: int
+    total_tasks: int
+    tasks_by_status: Dict[str, int]
+    tasks_by_priority: Dict[str, int]
+
+class UserSummary(BaseModel):
+    id: int
+    name: str
+    email: str
+
+class ProjectSummary(BaseModel):
+    id: int
+    name: str
+
+class LabelSummary(BaseModel):
+    id: int
+    name: str
+    color: str
+
+class TaskRead(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    status: TaskStatus
+    priority: TaskPriority
+    project_id: int
+    assigned_to_id: Optional[int] = None
+    due_date: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+    version: int
+    # Only present when requested with ?include=
+    labels: Optional[List[LabelSummary]] = None
+    assignee: Optional[UserSummary] = None
+    project: Optional[ProjectSummary] = None
+
+class TaskChanges(BaseModel):
+    changed: List[TaskRead]
+    # Ids of deleted tasks; apply them before ``changed``, since an id can be reused
+    deleted: List[int]
+    # Pass back as ``since`` on the next sync
+    watermark: str
+    has_more: bool
+
+class LabelRead(BaseModel):
+    id: int
+    name: str
+    color: str
+    created_at: datetime
+    # Only present with ?with_counts=true
+    task_count: Optional[int] = None
+
+class LabelFacet(BaseModel):
+    id: int
+    count: int
+
+class TaskFacets(BaseModel):
+    total: int
+    labels: List[LabelFacet]
+    status: Dict[str, int]
+    priority: Dict[str, int]
+
+class TaskImportRow(BaseModel):
+    title: str = Field(min_length=1)
+    description: Optional[str] = None
+    status: TaskStatus = TaskStatus.TODO
+    priority: TaskPriority = TaskPriority.MEDIUM
+    project_id: int
+    assigned_to_id: Optional[int] = None
+    due_date: Optional[datetime] = None
+    # Kept when present so exported tasks can be re-imported as they were
+    created_at: Optional[datetime] = None
+    # Accepted but not kept: an imported row changed here and now, which is
+    # what delta sync (/tasks/changes) needs to see
+    updated_at: Optional[datetime] = None
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+class ImportReport(BaseModel):
+    imported: int
+    failed: int
+    skipped: int
+    # Last input line fully processed; pass it back as resume_from
+    checkpoint: int
+    completed: bool
+    elapsed_seconds: float
+    rows_per_second: float
+    errors: List[ImportLineError]
+    error: Optional[str] = None
+
+class BatchRequestItem(BaseModel):
+    # Echoed back so results can be matched without relying on order
+    id: Optional[str] = None
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    # An /api/v1 path, with its query string
+    path: str
+    # Added to the batch's own Authorization and Cookie headers
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+class BatchResult(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any] = None
@@ -0,0 +1,71 @@
+"""Time from process start to a ready server, checked against a target.
+
+Starts uvicorn on a scratch database twice: first against an empty database
+(migrations build the schema), then restarting on the same, already migrated
+database. Each start is timed until ``/health/ready`` answers 200.
+
+    python -m benchmarks.cold_start [--runs 3] [--target 5.0] [--seed-on-startup]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import use_scratch_database
+
+PORT = 8765
+
+
+def time_start(env) -> float:
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                sys.exit(f"server exited during startup:\n{server.stderr.read()}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{PORT}/health/ready", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--target", type=float, default=5.0, help="seconds to ready, per start")
+    parser.add_argument("--seed-on-startup", action="store_true")
+    args = parser.parse_args()
+
+    env = dict(os.environ, SEED_ON_STARTUP=str(args.seed_on_startup).lower())
+    results = {"empty database": [], "migrated database": []}
+    for run in range(args.runs):
+        env.pop("DATABASE_URL", None)
+        os.environ.pop("DATABASE_URL", None)
+        env["DATABASE_URL"] = use_scratch_database(f"cold_start_{run}")
+        results["empty database"].append(time_start(env))
+        results["migrated database"].append(time_start(env))
+
+    print(f"\n{'case':<24}{'runs':>6}{'median s':>10}{'max s':>8}   target {args.target:.1f}s")
+    failed = False
+    for case, times in results.items():
+        failed |= max(times) > args.target
+        print(f"{case:<24}{len(times):>6}{statistics.median(times):>10.2f}{max(times):>8.2f}")
+    if failed:
+        print("\nover target")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
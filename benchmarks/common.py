@@ -0,0 +1,75 @@
+"""Shared helpers for the in-process benchmarks in this package.
+
+Each benchmark points the app at a throwaway SQLite database (unless
+DATABASE_URL is already set), drives ``main.app`` through an ASGI transport
+and reports latency percentiles.
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+# Benchmarks measure the app itself, from a single client address: admission
+# control would throttle the load generator (benchmarks.overload turns it on).
+os.environ.setdefault("ADMISSION_ENABLED", "false")
+
+
+def use_scratch_database(name: str) -> str:
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-"), f"{name}.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return os.environ["DATABASE_URL"]
+
+
+def prepare_database():
+    from app.core.database import engine
+    from app.core.migrations import migrate, reset_schema
+    from seed_data import seed_test_data
+
+    reset_schema(engine)
+    migrate(engine)
+    seed_test_data()
+
+
+@asynccontextmanager
+async def asgi_client():
+    import httpx
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        yield client
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(latencies),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def timed(coro_factory, latencies: List[float]):
+    start = time.perf_counter()
+    response = await coro_factory()
+    latencies.append(time.perf_counter() - start)
+    return response
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]):
+    print(f"\n{title}")
+    print(f"{'case':<32}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in rows.items():
+        print(f"{name:<32}{row['count']:>8}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}")
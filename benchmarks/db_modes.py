@@ -0,0 +1,73 @@
+"""Throughput and latency of the sync and async (DB_ASYNC) database modes
+under the same concurrent read/write mix.
+
+Each mode runs in its own subprocess because the mode is fixed at import
+time.
+
+    python -m benchmarks.db_modes [--requests 2000] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import print_table
+
+
+async def run_load(requests: int, concurrency: int):
+    from benchmarks.common import asgi_client, summarize, timed
+
+    latencies = []
+    async with asgi_client() as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i: int):
+            async with semaphore:
+                if i % 10 == 0:
+                    await timed(lambda: client.post("/api/v1/tasks/", json={"title": f"load {i}", "project_id": 1}), latencies)
+                elif i % 2:
+                    await timed(lambda: client.get("/api/v1/tasks/", params={"limit": 20}), latencies)
+                else:
+                    await timed(lambda: client.get("/api/v1/tasks/1"), latencies)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+    return dict(summarize(latencies), rps=requests / elapsed)
+
+
+def worker(args):
+    from benchmarks.common import prepare_database, use_scratch_database
+
+    use_scratch_database(f"db_modes_{os.environ.get('DB_ASYNC', 'false')}")
+    prepare_database()
+    print(json.dumps(asyncio.run(run_load(args.requests, args.concurrency))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+
+    rows = {}
+    for mode in ("false", "true"):
+        env = dict(os.environ, DB_ASYNC=mode)
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.db_modes", "--worker",
+             "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        rows[f"{'async' if mode == 'true' else 'sync'} ({result['rps']:.0f} req/s)"] = result
+    print_table(f"{args.requests} requests, concurrency {args.concurrency}", rows)
+
+
+if __name__ == "__main__":
+    main()
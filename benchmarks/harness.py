@@ -0,0 +1,244 @@
+"""Per-route latency and throughput under scripted request mixes, checked
+against stored budgets.
+
+Populates a scratch database with the synthetic data generator, then drives
+``main.app`` in-process with each mix in ``MIXES``: weighted reads, writes,
+bulk calls, logins and concurrent optimistic-lock updates of a few hot tasks
+(409s there are expected and counted as conflicts, not errors).
+
+    python -m benchmarks.harness [--mix read_heavy] [--requests 2000] [--concurrency 20]
+    python -m benchmarks.harness --write-baseline   # record budgets from this run
+
+The run fails (exit 1) when any route's p95/p99 exceeds its budget in
+``benchmarks/baseline.json`` or a route answers with an unexpected status.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks.common import asgi_client, percentile, prepare_database, use_scratch_database
+
+use_scratch_database("harness")
+
+from sqlalchemy import func, select  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.models.models import Task, User  # noqa: E402
+from seed_data import SyntheticDataConfig, generate_synthetic_data  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# operation name -> weight
+MIXES = {
+    "read_heavy": {"list_tasks": 50, "filter_tasks": 15, "read_task": 25, "create_task": 8, "login": 2},
+    "write_heavy": {"list_tasks": 20, "read_task": 10, "create_task": 35, "update_task": 25, "bulk_status": 6, "bulk_delete": 4},
+    "contention": {"read_task": 30, "hot_update": 70},
+}
+
+HOT_TASKS = 5
+
+
+class Run:
+    """State shared by the operations of one mix."""
+
+    def __init__(self, client, rng: random.Random, task_ids: List[int], emails: List[str]):
+        self.client = client
+        self.rng = rng
+        self.task_ids = task_ids
+        self.emails = emails
+        self.created: List[int] = []
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.conflicts: Dict[str, int] = defaultdict(int)
+
+    async def call(self, route: str, method: str, url: str, expected=(200, 201), **kwargs):
+        start = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        self.latencies[route].append(time.perf_counter() - start)
+        if response.status_code == 409:
+            self.conflicts[route] += 1
+        elif response.status_code not in expected:
+            self.errors[route] += 1
+        return response
+
+    async def update(self, task_id: int, route: str):
+        current = await self.call("GET /tasks/{id}", "GET", f"/api/v1/tasks/{task_id}")
+        if current.status_code != 200:
+            return
+        task = current.json()
+        payload = {"title": f"{task['title']}*", "project_id": task["project_id"], "version": task["version"]}
+        await self.call(route, "PUT", f"/api/v1/tasks/{task_id}", json=payload)
+
+
+async def list_tasks(run: Run):
+    sort = run.rng.choice(["id", "-created_at", "priority", "due_date"])
+    await run.call("GET /tasks/", "GET", "/api/v1/tasks/", params={"limit": 50, "sort": sort})
+
+
+async def filter_tasks(run: Run):
+    params = {"limit": 50, "status_filter": run.rng.choice(["todo", "in_progress", "done"]),
+              "priority_filter": run.rng.choice(["low", "medium", "high"]), "include": "project"}
+    await run.call("GET /tasks/ (filtered)", "GET", "/api/v1/tasks/", params=params)
+
+
+async def read_task(run: Run):
+    await run.call("GET /tasks/{id}", "GET", f"/api/v1/tasks/{run.rng.choice(run.task_ids)}")
+
+
+async def create_task(run: Run):
+    response = await run.call("POST /tasks/", "POST", "/api/v1/tasks/",
+                              json={"title": "harness task", "project_id": 1, "priority": "high"})
+    if response.status_code == 201:
+        run.created.append(response.json()["id"])
+
+
+async def update_task(run: Run):
+    await run.update(run.rng.choice(run.task_ids), "PUT /tasks/{id}")
+
+
+async def hot_update(run: Run):
+    await run.update(run.task_ids[run.rng.randrange(HOT_TASKS)], "PUT /tasks/{id} (contended)")
+
+
+async def bulk_status(run: Run):
+    ids = run.rng.sample(run.task_ids, 50)
+    await run.call("PUT /tasks/bulk/status", "PUT", "/api/v1/tasks/bulk/status",
+                   params={"new_status": run.rng.choice(["todo", "in_progress", "done"])}, json=ids)
+
+
+async def bulk_delete(run: Run):
+    if len(run.created) < 20:
+        return await create_task(run)
+    ids, run.created[:] = run.created[:20], run.created[20:]
+    await run.call("DELETE /tasks/bulk", "DELETE", "/api/v1/tasks/bulk", json=ids)
+
+
+async def login(run: Run):
+    await run.call("POST /auth/login", "POST", "/api/v1/auth/login",
+                   data={"username": run.rng.choice(run.emails), "password": "user123"})
+
+
+OPERATIONS = {operation.__name__: operation for operation in (
+    list_tasks, filter_tasks, read_task, create_task, update_task, hot_update, bulk_status, bulk_delete, login,
+)}
+
+
+async def run_mix(mix: Dict[str, int], requests: int, concurrency: int, seed: int, task_ids, emails):
+    rng = random.Random(seed)
+    names, weights = zip(*mix.items())
+    script = rng.choices(names, weights, k=requests)
+    async with asgi_client() as client:
+        run = Run(client, rng, task_ids, emails)
+        queue = iter(script)
+
+        async def worker():
+            for name in queue:
+                await OPERATIONS[name](run)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {
+        route: {
+            "count": len(latencies),
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "errors": run.errors[route],
+            "conflicts": run.conflicts[route],
+        }
+        for route, latencies in sorted(run.latencies.items())
+    }
+
+
+def print_results(mix: str, results: Dict[str, Dict], budgets: Dict[str, Dict]):
+    print(f"\n{mix}")
+    print(f"{'route':<30}{'count':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'budget p95/p99':>17}{'409':>6}{'err':>5}")
+    for route, row in results.items():
+        budget = budgets.get(route)
+        limits = f"{budget['p95_ms']:.0f}/{budget['p99_ms']:.0f}" if budget else "-"
+        print(f"{route:<30}{row['count']:>7}{row['rps']:>9.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+              f"{row['p99_ms']:>9.2f}{limits:>17}{row['conflicts']:>6}{row['errors']:>5}")
+
+
+def over_budget(mix: str, results: Dict[str, Dict], budgets: Dict[str, Dict]) -> List[str]:
+    failures = []
+    for route, row in results.items():
+        if row["errors"]:
+            failures.append(f"{mix} {route}: {row['errors']} unexpected responses")
+        budget = budgets.get(route)
+        if not budget:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if row[key] > budget[key]:
+                failures.append(f"{mix} {route}: {key} {row[key]:.1f} > budget {budget[key]:.1f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", choices=sorted(MIXES), action="append", help="default: every mix")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--write-baseline", action="store_true",
+                        help="store this run's p95/p99 times --headroom as the new budgets")
+    parser.add_argument("--headroom", type=float, default=3.0)
+    args = parser.parse_args()
+
+    prepare_database()
+    generate_synthetic_data(SyntheticDataConfig(
+        users=args.users, projects=args.projects, tasks=args.tasks, labels=10, seed=args.seed,
+    ))
+    with engine.connect() as connection:
+        task_ids = list(connection.execute(select(Task.id).order_by(Task.id)).scalars())
+        emails = list(connection.execute(
+            select(User.email).where(User.email.like("user%")).order_by(func.random()).limit(50)
+        ).scalars())
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    mixes = args.mix or sorted(MIXES)
+
+    async def run_all():
+        # One event loop for every mix: async-mode engines are bound to it.
+        return [await run_mix(MIXES[mix], args.requests, args.concurrency, args.seed, task_ids, emails) for mix in mixes]
+
+    failures = []
+    for mix, results in zip(mixes, asyncio.run(run_all())):
+        if args.write_baseline:
+            baseline[mix] = {
+                route: {key: round(row[key] * args.headroom, 1) for key in ("p95_ms", "p99_ms")}
+                for route, row in results.items()
+            }
+        print_results(mix, results, baseline.get(mix, {}))
+        failures += over_budget(mix, results, baseline.get(mix, {}))
+
+    if args.write_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print(f"\nwrote {args.baseline}")
+        return
+    if failures:
+        print("\nover budget:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nall routes within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""p99 of non-login routes while a burst of logins is in progress.
+
+Runs the storm twice: once hashing inline on the event loop (the behaviour
+before the dedicated hashing pool, PASSWORD_HASH_WORKERS=0) and once through
+the pool.
+
+    python -m benchmarks.login_storm [--logins 200] [--concurrency 50]
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import asgi_client, prepare_database, print_table, summarize, timed, use_scratch_database
+
+use_scratch_database("login_storm")
+
+from app.core.config import settings  # noqa: E402
+from app.core.hashing import password_hasher  # noqa: E402
+
+
+async def run_storm(logins: int, concurrency: int, probes: int):
+    probe_latencies = []
+    login_latencies = []
+    async with asgi_client() as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with semaphore:
+                await timed(lambda: client.post(
+                    "/api/v1/auth/login", data={"username": "john@example.com", "password": "user123"}
+                ), login_latencies)
+
+        async def probe():
+            for _ in range(probes):
+                await timed(lambda: client.get("/health"), probe_latencies)
+                await timed(lambda: client.get("/api/v1/stats/"), probe_latencies)
+                await asyncio.sleep(0.005)
+
+        await asyncio.gather(probe(), *(login() for _ in range(logins)))
+    return summarize(probe_latencies), summarize(login_latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probes", type=int, default=100)
+    args = parser.parse_args()
+
+    prepare_database()
+    rows = {}
+    for label, workers in (("inline (before)", 0), (f"pool x{settings.PASSWORD_HASH_WORKERS} (after)", settings.PASSWORD_HASH_WORKERS)):
+        password_hasher.configure(workers, max_queue=args.logins)
+        probe, login = asyncio.run(run_storm(args.logins, args.concurrency, args.probes))
+        rows[f"non-login, {label}"] = probe
+        rows[f"login, {label}"] = login
+    print_table(f"{args.logins} logins, concurrency {args.concurrency}", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Cost of the /metrics instrumentation: the same request mix with
+METRICS_ENABLED off and on.
+
+Each setting runs in its own subprocess because the middleware and engine
+hooks are installed at import time. The mix is run twice per process and only
+the second pass is measured, so warm-up does not count against either side.
+
+    python -m benchmarks.metrics_overhead [--requests 3000] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import print_table
+
+
+async def run_load(requests: int, concurrency: int):
+    from benchmarks.common import asgi_client, summarize, timed
+
+    async with asgi_client() as client:
+        for _ in range(2):
+            latencies = []
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one(i: int):
+                async with semaphore:
+                    if i % 2:
+                        await timed(lambda: client.get("/api/v1/tasks/", params={"limit": 20}), latencies)
+                    else:
+                        await timed(lambda: client.get(f"/api/v1/tasks/{1 + i % 5}"), latencies)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(requests)))
+            elapsed = time.perf_counter() - start
+    return dict(summarize(latencies), rps=requests / elapsed)
+
+
+def worker(args):
+    from benchmarks.common import prepare_database, use_scratch_database
+
+    use_scratch_database(f"metrics_{os.environ.get('METRICS_ENABLED', 'true')}")
+    prepare_database()
+    print(json.dumps(asyncio.run(run_load(args.requests, args.concurrency))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+
+    rows = {}
+    for enabled in ("false", "true"):
+        env = dict(os.environ, METRICS_ENABLED=enabled)
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.metrics_overhead", "--worker",
+             "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        rows[enabled] = json.loads(output.strip().splitlines()[-1])
+    print_table(f"{args.requests} requests, concurrency {args.concurrency}", {
+        f"metrics {'on' if enabled == 'true' else 'off'} ({row['rps']:.0f} req/s)": row for enabled, row in rows.items()
+    })
+    overhead = (rows["true"]["mean_ms"] / rows["false"]["mean_ms"] - 1) * 100
+    print(f"\nmean latency overhead with metrics on: {overhead:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
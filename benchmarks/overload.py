@@ -0,0 +1,179 @@
+"""Latency under overload, with and without admission control.
+
+Starts ``uvicorn main:app`` on a scratch database, finds the saturation
+throughput of a read mix (full-page task lists and task lookups) with a
+closed loop, then offers ``--overload`` times that rate as an open loop
+(arrivals do not wait for responses), first with admission control off and
+then on.
+
+    python -m benchmarks.overload [--duration 10] [--overload 2.0]
+
+Without admission control every request is accepted and queues on the
+threadpool and the connection pool, so latency keeps growing while the
+overload lasts. With it the excess is shed with fast 503s, and the admitted
+requests keep a p99 near the one at saturation. ADMISSION_CONCURRENCY and
+the other admission settings are read from the environment as usual; on
+CPU-bound workers (SQLite, few cores) a limit near the core count works best.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import percentile, use_scratch_database
+
+PORT = 8767
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+def start_server(env, log) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env, stdout=log, stderr=log,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"server exited during startup, see {log.name}")
+        try:
+            if httpx.get(f"{BASE_URL}/health/ready", timeout=1).status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    server.kill()
+    sys.exit("server did not become ready")
+
+
+def request_for(client: httpx.AsyncClient, rng: random.Random, task_ids):
+    if rng.random() < 0.7:
+        return client.get("/api/v1/tasks/", params={"limit": 100, "include": "project,labels"})
+    return client.get(f"/api/v1/tasks/{rng.choice(task_ids)}")
+
+
+async def send(client, rng, task_ids, results):
+    start = time.perf_counter()
+    try:
+        status = (await request_for(client, rng, task_ids)).status_code
+    except httpx.TransportError:
+        status = 0
+    results.append((status, time.perf_counter() - start))
+
+
+async def closed_loop(requests: int, concurrency: int, task_ids, seed: int):
+    rng = random.Random(seed)
+    results = []
+    remaining = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client:
+        async def worker():
+            for _ in remaining:
+                await send(client, rng, task_ids, results)
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+async def open_loop(rate: float, duration: float, task_ids, seed: int):
+    """Start a request every 1/rate seconds whether or not earlier ones finished."""
+    rng = random.Random(seed)
+    results = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        pending = []
+        for n in range(int(rate * duration)):
+            delay = start + n / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            pending.append(asyncio.create_task(send(client, rng, task_ids, results)))
+        await asyncio.gather(*pending)
+    return results
+
+
+def client_process(args):
+    kind, params = args
+    return asyncio.run(closed_loop(*params) if kind == "closed" else open_loop(*params))
+
+
+def run_clients(clients: int, jobs):
+    with multiprocessing.Pool(clients) as pool:
+        start = time.perf_counter()
+        parts = pool.map(client_process, jobs)
+        elapsed = time.perf_counter() - start
+    return [result for part in parts for result in part], elapsed
+
+
+def report(name: str, offered: float, results, elapsed: float):
+    admitted = [seconds for status, seconds in results if status == 200]
+    shed = [seconds for status, seconds in results if status in (429, 503)]
+    failed = len(results) - len(admitted) - len(shed)
+    print(f"{name:<22}{offered:>9.0f}{len(admitted) / elapsed:>9.0f}{len(shed) / max(1, len(results)):>8.0%}"
+          f"{percentile(admitted, 50) * 1000:>10.1f}{percentile(admitted, 99) * 1000:>10.1f}"
+          f"{percentile(shed, 99) * 1000:>10.1f}{failed:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of open-loop load per run")
+    parser.add_argument("--overload", type=float, default=2.0, help="offered load as a multiple of saturation")
+    parser.add_argument("--concurrency", type=int, default=16, help="closed-loop clients finding saturation")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="load-generator processes")
+    parser.add_argument("--tasks", type=int, default=20_000)
+    args = parser.parse_args()
+
+    use_scratch_database("overload")
+    from sqlalchemy import select
+    from app.core.database import engine
+    from app.models.models import Task
+    from benchmarks.common import prepare_database
+    from seed_data import SyntheticDataConfig, generate_synthetic_data
+
+    prepare_database()
+    generate_synthetic_data(SyntheticDataConfig(users=200, projects=20, tasks=args.tasks, labels=10))
+    with engine.connect() as connection:
+        task_ids = list(connection.execute(select(Task.id)).scalars())
+    engine.dispose()
+
+    # One load-generator address: the per-client token buckets stay off so
+    # only the concurrency limits and the queue are measured.
+    env = dict(os.environ, RATE_LIMIT_IP_PER_SECOND="0", RATE_LIMIT_USER_PER_SECOND="0")
+    log = tempfile.NamedTemporaryFile("w", prefix="overload-", suffix=".log", delete=False)
+    per_client = max(1, args.concurrency // args.clients)
+
+    server = start_server(dict(env, ADMISSION_ENABLED="false"), log)
+    try:
+        run_clients(args.clients, [("closed", (100, 4, task_ids, seed)) for seed in range(args.clients)])
+        requests = int(per_client * 20)
+        results, elapsed = run_clients(
+            args.clients, [("closed", (requests, per_client, task_ids, seed)) for seed in range(args.clients)],
+        )
+    finally:
+        server.terminate()
+        server.wait()
+    saturation = len(results) / elapsed
+    offered = saturation * args.overload
+    print(f"{os.cpu_count()} cores, {args.clients} load-generator processes, saturation {saturation:.0f} req/s")
+    print(f"{'run':<22}{'offered':>9}{'ok/s':>9}{'shed':>8}{'p50 ms':>10}{'p99 ms':>10}{'shed p99':>10}{'failed':>8}")
+    report("saturation (closed)", saturation, results, elapsed)
+
+    for admission in ("false", "true"):
+        server = start_server(dict(env, ADMISSION_ENABLED=admission), log)
+        try:
+            jobs = [("open", (offered / args.clients, args.duration, task_ids, seed)) for seed in range(args.clients)]
+            results, elapsed = run_clients(args.clients, jobs)
+        finally:
+            server.terminate()
+            server.wait()
+        report(f"{args.overload:g}x, admission {'on' if admission == 'true' else 'off'}", offered, results, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Full-text task search vs. a LIKE scan on a large synthetic corpus.
+
+    python -m benchmarks.search [--tasks 200000] [--queries 200]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.common import asgi_client, prepare_database, print_table, summarize, timed, use_scratch_database
+
+use_scratch_database("search")
+
+from sqlalchemy import insert, or_  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.models.models import Task  # noqa: E402
+
+
+def make_vocabulary(rng: random.Random, size: int):
+    syllables = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "shi", "den", "par", "qua", "zel"]
+    return sorted({"".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(size)})
+
+
+def load_corpus(tasks: int, rng: random.Random, vocabulary):
+    rows = []
+    start = time.perf_counter()
+    with Session(engine) as session:
+        for i in range(tasks):
+            rows.append({
+                "title": " ".join(rng.choices(vocabulary, k=4)),
+                "description": " ".join(rng.choices(vocabulary, k=20)),
+                "project_id": 1 + i % 2,
+            })
+            if len(rows) == 5000:
+                session.exec(insert(Task), params=rows)
+                rows = []
+        if rows:
+            session.exec(insert(Task), params=rows)
+        session.commit()
+    print(f"loaded {tasks} tasks in {time.perf_counter() - start:.1f}s")
+
+
+def like_scan(terms, latencies):
+    with Session(engine) as session:
+        start = time.perf_counter()
+        query = select(Task).where(*[
+            or_(Task.title.ilike(f"%{term}%"), Task.description.ilike(f"%{term}%")) for term in terms
+        ])
+        session.exec(query.limit(20)).all()
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_queries(queries):
+    latencies = []
+    async with asgi_client() as client:
+        for terms in queries:
+            response = await timed(lambda: client.get("/api/v1/tasks/search", params={"q": " ".join(terms), "limit": 20}), latencies)
+            response.raise_for_status()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, 5000)
+    prepare_database()
+    load_corpus(args.tasks, rng, vocabulary)
+    queries = [rng.sample(vocabulary, rng.randint(1, 2)) for _ in range(args.queries)]
+
+    like_latencies = []
+    for terms in queries[: max(1, args.queries // 10)]:
+        like_scan(terms, like_latencies)
+    rows = {
+        "GET /tasks/search (FTS)": summarize(asyncio.run(run_queries(queries))),
+        "LIKE scan (no index)": summarize(like_latencies),
+    }
+    print_table(f"{args.tasks} tasks, {engine.dialect.name}", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Serialization cost and payload size of a 10k-task list response.
+
+    python -m benchmarks.serialization [--tasks 10000] [--repeat 10]
+
+First times the body rendering alone on rows already loaded: the previous
+path (each row validated into ``TaskRead``, dumped by the response model and
+encoded with ``json``) against the precompiled row serializer with orjson,
+with and without a ``fields`` projection. Then times the whole request
+through the app, where the projection also narrows the SELECT.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import List
+
+from benchmarks.common import asgi_client, prepare_database, summarize, use_scratch_database
+
+use_scratch_database("serialization")
+# The request timings fetch every task in one page.
+os.environ.setdefault("MAX_PAGE_SIZE", "10000")
+
+import orjson  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+from app.api.tasks import TASK_FIELDS  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.core.serialization import serializer_for  # noqa: E402
+from app.models.models import Task  # noqa: E402
+from app.models.schemas import TaskRead  # noqa: E402
+
+PROJECTION = ("id", "title", "status")
+
+
+def response_model_body(tasks: List[Task]) -> bytes:
+    adapter = TypeAdapter(List[TaskRead])
+    rows = adapter.validate_python([TaskRead(**task.model_dump()) for task in tasks])
+    content = adapter.dump_python(rows, mode="json", exclude_unset=True)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def precompiled_body(tasks: List[Task], fields=TASK_FIELDS) -> bytes:
+    return orjson.dumps(list(map(serializer_for(fields), tasks)))
+
+
+def time_body(render, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = render()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings), len(body)
+
+
+async def time_requests(params: dict, repeat: int):
+    timings = []
+    async with asgi_client() as client:
+        for _ in range(repeat + 1):
+            start = time.perf_counter()
+            response = await client.get("/api/v1/tasks/", params=params)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+    return summarize(timings[1:]), len(response.content)
+
+
+def print_row(name: str, row, size: int):
+    print(f"{name:<40}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{size / 1024:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    from seed_data import SyntheticDataConfig, generate_synthetic_data
+
+    prepare_database()
+    generate_synthetic_data(SyntheticDataConfig(users=100, projects=10, tasks=args.tasks, labels=10))
+    with Session(engine) as session:
+        tasks = session.exec(select(Task).order_by(Task.id).limit(args.tasks)).all()
+
+        print(f"\nbody rendering, {len(tasks)} tasks already loaded")
+        print(f"{'case':<40}{'p50 ms':>10}{'p95 ms':>10}{'KiB':>10}")
+        print_row("response model + json", *time_body(lambda: response_model_body(tasks), args.repeat))
+        print_row("precompiled + orjson", *time_body(lambda: precompiled_body(tasks), args.repeat))
+        print_row(f"precompiled + orjson, {','.join(PROJECTION)}",
+                  *time_body(lambda: precompiled_body(tasks, PROJECTION), args.repeat))
+
+    print(f"\nGET /api/v1/tasks/?limit={args.tasks}")
+    print(f"{'case':<40}{'p50 ms':>10}{'p95 ms':>10}{'KiB':>10}")
+    print_row("all fields", *asyncio.run(time_requests({"limit": args.tasks}, args.repeat)))
+    print_row(f"fields={','.join(PROJECTION)}",
+              *asyncio.run(time_requests({"limit": args.tasks, "fields": ",".join(PROJECTION)}, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
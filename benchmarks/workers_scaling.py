@@ -0,0 +1,133 @@
+"""Throughput as the number of prefork workers grows.
+
+Populates one scratch database, then for each worker count starts
+``gunicorn main:app -c gunicorn.conf.py`` on it and drives a read-heavy mix
+over real HTTP from separate load-generator processes (so the client does not
+share a core with a single worker).
+
+    python -m benchmarks.workers_scaling [--workers 1,2,4] [--requests 4000] [--concurrency 64]
+
+Scaling flattens once the workers outnumber the free cores; on SQLite,
+writes would serialize on the file lock, which is why the mix only reads.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import summarize, use_scratch_database
+
+PORT = 8766
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+def start_server(workers: int, env, log) -> subprocess.Popen:
+    # Logs go to a file: an unread pipe fills up under load and stalls the workers.
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn.conf.py",
+         "--bind", f"127.0.0.1:{PORT}", "--workers", str(workers), "--log-level", "warning"],
+        env=dict(env, WEB_CONCURRENCY=str(workers)), stdout=log, stderr=log,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"server exited during startup, see {log.name}")
+        try:
+            if httpx.get(f"{BASE_URL}/health/ready", timeout=1).status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    server.kill()
+    sys.exit("server did not become ready")
+
+
+async def drive(requests: int, concurrency: int, task_ids, seed: int):
+    rng = random.Random(seed)
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=30) as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                if rng.random() < 0.5:
+                    request = client.get("/api/v1/tasks/", params={"limit": 20, "sort": rng.choice(["id", "priority"])})
+                else:
+                    request = client.get(f"/api/v1/tasks/{rng.choice(task_ids)}")
+                start = time.perf_counter()
+                response = await request
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def client_process(args):
+    requests, concurrency, task_ids, seed = args
+    return asyncio.run(drive(requests, concurrency, task_ids, seed))
+
+
+def measure(requests: int, concurrency: int, clients: int, task_ids):
+    share = [(requests // clients, max(1, concurrency // clients), task_ids, seed) for seed in range(clients)]
+    with multiprocessing.Pool(clients) as pool:
+        pool.map(client_process, [(50, 4, task_ids, 0)] * clients)  # warm-up
+        start = time.perf_counter()
+        results = pool.map(client_process, share)
+        elapsed = time.perf_counter() - start
+    latencies = [latency for part, _ in results for latency in part]
+    return dict(summarize(latencies), rps=len(latencies) / elapsed, errors=sum(errors for _, errors in results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    default_workers = sorted({1, 2, os.cpu_count() or 1})
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)))
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="load-generator processes")
+    parser.add_argument("--tasks", type=int, default=20_000)
+    args = parser.parse_args()
+
+    use_scratch_database("workers")
+    from sqlalchemy import select
+    from app.core.database import engine
+    from app.models.models import Task
+    from benchmarks.common import prepare_database
+    from seed_data import SyntheticDataConfig, generate_synthetic_data
+
+    prepare_database()
+    generate_synthetic_data(SyntheticDataConfig(users=200, projects=20, tasks=args.tasks, labels=10))
+    with engine.connect() as connection:
+        task_ids = list(connection.execute(select(Task.id)).scalars())
+    engine.dispose()
+
+    print(f"{os.cpu_count()} cores, {args.clients} load-generator processes, concurrency {args.concurrency}")
+    print(f"{'workers':>8}{'req/s':>10}{'speedup':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    baseline = None
+    log = tempfile.NamedTemporaryFile("w", prefix="workers-", suffix=".log", delete=False)
+    for workers in (int(count) for count in args.workers.split(",")):
+        server = start_server(workers, os.environ, log)
+        try:
+            row = measure(args.requests, args.concurrency, args.clients, task_ids)
+        finally:
+            server.terminate()
+            server.wait()
+        baseline = baseline or row["rps"]
+        print(f"{workers:>8}{row['rps']:>10.0f}{row['rps'] / baseline:>8.2f}x{row['p50_ms']:>9.2f}"
+              f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Prefork serving: gunicorn master with uvicorn workers.
+
+    gunicorn main:app -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app) and the workers are
+forked from it; ``app.core.workers.reset_after_fork`` gives each worker its
+own connection pools, hashing pool and caches. Migrations and the optional
+seed run once, in the master, before any worker starts.
+
+WEB_CONCURRENCY sets the worker count (default 1). DB_POOL_SIZE and
+DB_MAX_OVERFLOW are per worker, so the database sees up to
+workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+"""
+import logging
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+graceful_timeout = 30
+
+# Each worker caches the dashboard counts and the authenticated users, and
+# sees only its own writes: a user deactivated on one worker would otherwise
+# stay signed in on the others for the whole token cache TTL.
+if workers > 1:
+    os.environ.setdefault("STATS_CACHE_TTL_SECONDS", "5")
+    os.environ.setdefault("PRINCIPAL_CACHE_TTL_SECONDS", "5")
+
+
+def on_starting(server):
+    from app.core.config import settings
+    from app.core.database import engine
+    from app.core.workers import run_startup_tasks, skip_startup_tasks
+
+    run_startup_tasks()
+    skip_startup_tasks()
+    # The master serves nothing; close what the startup tasks opened.
+    engine.dispose()
+    per_worker = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    logging.getLogger("gunicorn.error").info(
+        "Starting %d workers, up to %d database connections each (%d total)",
+        workers, per_worker, workers * per_worker,
+    )
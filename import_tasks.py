@@ -0,0 +1,70 @@
+"""Bulk-load tasks from an NDJSON or CSV file into the configured database.
+
+Rows are validated against the existing project and user ids and written in
+committed batches (COPY on PostgreSQL). After each batch the number of the
+last processed line is saved to a checkpoint file, so re-running the same
+command after a failure resumes where it stopped.
+
+    python import_tasks.py tasks.ndjson [--format csv] [--batch-size 500] [--checkpoint FILE]
+"""
+import argparse
+import json
+import os
+import sys
+
+from app.core.database import engine
+from app.core.importer import TaskImporter, import_lines, load_reference_ids
+from app.models.enums import ExportFormat
+
+
+def read_checkpoint(path: str, source: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path) as checkpoint_file:
+        saved = json.load(checkpoint_file)
+    if saved.get("source") != source:
+        sys.exit(f"{path} is a checkpoint for {saved.get('source')}, not {source}; remove it to start over")
+    return saved["checkpoint"]
+
+
+def write_checkpoint(path: str, source: str, importer: TaskImporter):
+    # Write then rename, so a crash never leaves a truncated checkpoint.
+    with open(f"{path}.tmp", "w") as checkpoint_file:
+        json.dump({"source": source, "checkpoint": importer.checkpoint}, checkpoint_file)
+    os.replace(f"{path}.tmp", path)
+    print(f"line {importer.checkpoint}: {importer.imported} imported, {importer.failed} failed", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=[f.value for f in ExportFormat],
+                        help="default: csv for .csv files, ndjson otherwise")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--checkpoint", help="default: <path>.checkpoint")
+    args = parser.parse_args()
+
+    source = os.path.abspath(args.path)
+    import_format = ExportFormat(args.format or ("csv" if source.endswith(".csv") else "ndjson"))
+    checkpoint_path = args.checkpoint or f"{args.path}.checkpoint"
+    resume_from = read_checkpoint(checkpoint_path, source)
+    if resume_from:
+        print(f"Resuming after line {resume_from}", file=sys.stderr)
+
+    with engine.connect() as connection:
+        project_ids, user_ids = load_reference_ids(connection)
+    importer = TaskImporter(import_format, project_ids, user_ids, resume_from=resume_from, batch_size=args.batch_size)
+    with open(args.path, "rb") as source_file:
+        report = import_lines(
+            engine, importer, source_file,
+            on_commit=lambda progress: write_checkpoint(checkpoint_path, source, progress),
+        )
+
+    print(report.model_dump_json(indent=2))
+    if not report.completed:
+        sys.exit(1)
+    os.remove(checkpoint_path)
+
+
+if __name__ == "__main__":
+    main()
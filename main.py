@@ -1,47 +1,130 @@
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+import asyncio
+import logging
+import time
+from typing import Optional
+from fastapi import FastAPI, Query, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, ORJSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from app.core.config import settings
-from app.core.database import create_db_and_tables, seed_initial_data
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.database import (
+    engine, read_router, get_session, get_async_session, get_read_session, get_async_read_session,
+)
+from app.core.migrations import LATEST_VERSION, current_version
+from app.core.events import task_events
+from app.core.stats import stats_cache
+from app.core.admission import AdmissionMiddleware, admission
+from app.core.changes import purge_tombstones_periodically
+from app.core.assets import PageCache, StaticAssets
+from app.core.batch import BATCH_PATH
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core.replicas import ReadYourWritesMiddleware
+from app.core.workers import run_startup_tasks
+from app.models.enums import TaskPriority, TaskStatus
 from app.api.routes import api_router
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
 )
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+if settings.DB_ASYNC:
+    app.dependency_overrides[get_session] = get_async_session
+    app.dependency_overrides[get_read_session] = get_async_read_session
+
+app.add_middleware(
+    CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES, level=settings.COMPRESSION_LEVEL,
+)
+
+# The batch endpoint sets the cookie itself, only when a sub-request wrote.
+if read_router.replicas:
+    app.add_middleware(ReadYourWritesMiddleware, exempt_paths=[BATCH_PATH])
+
+# Inside the metrics middleware, so rejected requests are counted too.
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+    metrics.add_collector(admission.metric_lines)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+static_assets = StaticAssets("static")
+app.mount("/static", static_assets, name="static")
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["static_url"] = static_assets.url
+pages = PageCache(templates.env, ["index.html", "login.html", "dashboard.html", "admin.html"])
 
 @app.on_event("startup")
 def startup_event():
-    create_db_and_tables()
-    seed_initial_data()
+    start = time.perf_counter()
+    run_startup_tasks()
+    app.state.startup_seconds = time.perf_counter() - start
+    logging.info(f"Startup finished in {app.state.startup_seconds:.2f}s")
+
+@app.on_event("startup")
+async def start_task_events():
+    await task_events.start()
+
+@app.on_event("shutdown")
+async def stop_task_events():
+    await task_events.stop()
+
+@app.on_event("startup")
+async def start_tombstone_purge():
+    app.state.tombstone_purge = asyncio.create_task(purge_tombstones_periodically())
+
+@app.on_event("shutdown")
+async def stop_tombstone_purge():
+    app.state.tombstone_purge.cancel()
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return pages.response(request, "index.html")
 
 @app.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return pages.response(request, "login.html")
 
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard_page(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    return pages.response(request, "dashboard.html")
 
 @app.get("/admin", response_class=HTMLResponse)
 async def admin_page(request: Request):
-    return templates.TemplateResponse("admin.html", {"request": request})
+    return pages.response(request, "admin.html")
 
 @app.post("/seed-data")
-async def seed_data_endpoint():
-    from seed_data import seed_test_data
+async def seed_data_endpoint(
+    users: int = Query(0, ge=0, le=settings.SEED_MAX_ROWS),
+    projects: int = Query(0, ge=0, le=settings.SEED_MAX_ROWS),
+    tasks: int = Query(0, ge=0, le=settings.SEED_MAX_ROWS),
+    labels: int = Query(0, ge=0, le=settings.SEED_MAX_ROWS),
+    seed: int = 42,
+    status_weights: Optional[str] = Query(None, alias="status", description="e.g. todo=5,in_progress=3,done=2"),
+    priority_weights: Optional[str] = Query(None, alias="priority", description="e.g. low=3,medium=5,high=2"),
+):
+    """Seed the fixture data; with counts, also generate synthetic volume
+    (see ``seed_data.generate_synthetic_data``)."""
+    from seed_data import SyntheticDataConfig, generate_synthetic_data, parse_weights, seed_test_data
+    config = SyntheticDataConfig(users=users, projects=projects, tasks=tasks, labels=labels, seed=seed)
     try:
-        seed_test_data()
-        return {"message": "Test data seeded successfully"}
+        if status_weights:
+            config.status_weights = parse_weights(status_weights, TaskStatus)
+        if priority_weights:
+            config.priority_weights = parse_weights(priority_weights, TaskPriority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        await run_in_threadpool(seed_test_data)
+        generated = {}
+        if users or projects or tasks or labels:
+            generated = await run_in_threadpool(generate_synthetic_data, config)
+        stats_cache.invalidate()
+        return {"message": "Test data seeded successfully", "generated": generated}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -49,4 +132,38 @@ async def seed_data_endpoint():
 async def health_check():
     return {"status": "healthy", "version": settings.VERSION}
 
+@app.get("/health/live")
+async def liveness_check():
+    """The process is up and serving; never touches the database."""
+    return {"status": "alive"}
+
+def read_schema_version() -> Optional[int]:
+    with engine.connect() as connection:
+        return current_version(connection)
+
+@app.get("/health/ready")
+async def readiness_check():
+    """The database answers and its schema is at the version this code expects."""
+    try:
+        version = await run_in_threadpool(read_schema_version)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {e.__class__.__name__}")
+    if version != LATEST_VERSION:
+        raise HTTPException(status_code=503, detail=f"Schema at version {version}, expected {LATEST_VERSION}")
+    return {
+        "status": "ready",
+        "schema_version": version,
+        "startup_seconds": round(getattr(app.state, "startup_seconds", 0.0), 3),
+        # Informational: reads fall back to the primary without them.
+        "replicas": {
+            replica.name: {"healthy": replica.healthy, "lag_seconds": replica.lag} for replica in read_router.replicas
+        },
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
\ No newline at end of file
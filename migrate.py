@@ -0,0 +1,34 @@
+"""Apply pending schema migrations to the configured database.
+
+The app applies them itself on startup unless MIGRATE_ON_STARTUP=false; run
+this first when that is turned off, e.g. as a release step before the
+workers start.
+
+    python migrate.py [--status]
+"""
+import argparse
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.migrations import LATEST_VERSION, MIGRATIONS, current_version, migrate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="print the schema version without migrating")
+    args = parser.parse_args()
+
+    if args.status:
+        with engine.connect() as connection:
+            version = current_version(connection)
+        print(f"schema version {version}, latest {LATEST_VERSION}")
+        return
+    applied = migrate(engine, timeout=settings.DB_STARTUP_TIMEOUT)
+    descriptions = {migration.version: migration.description for migration in MIGRATIONS}
+    for version in applied:
+        print(f"applied {version}: {descriptions[version]}")
+    print(f"schema at version {LATEST_VERSION}")
+
+
+if __name__ == "__main__":
+    main()
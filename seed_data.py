@@ -1,9 +1,19 @@
+from sqlalchemy import func, insert, text
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, select
 from app.core.database import engine
+from app.core.migrations import migrate
 from app.models.models import User, Project, Task, Label, TaskLabelLink
 from app.models.enums import UserRole, TaskStatus, TaskPriority
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from enum import Enum
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Type
+import argparse
 import os
+import random
+import time
 
 db_host = os.getenv("DB_HOST", "localhost" if os.getenv("ENV") == "test" else "db")
 
@@ -21,7 +31,8 @@ def seed_test_data():
             regular_user1 = session.exec(select(User).where(User.email == "john@example.com")).first()
             regular_user2 = session.exec(select(User).where(User.email == "jane@example.com")).first()
         else:
-            # Create users with hashed passwords
+            # Create users with hashed passwords; both regular users share one hash
+            user_password_hash = get_password_hash("user123")
             admin_user = User(
                 email="admin@example.com",
                 name="Admin User",
@@ -32,14 +43,14 @@ def seed_test_data():
             regular_user1 = User(
                 email="john@example.com",
                 name="John Doe",
-                password_hash=get_password_hash("user123"),
+                password_hash=user_password_hash,
                 role=UserRole.REGULAR
             )
             
             regular_user2 = User(
                 email="jane@example.com",
                 name="Jane Smith",
-                password_hash=get_password_hash("user123"),
+                password_hash=user_password_hash,
                 role=UserRole.REGULAR
             )
             
@@ -51,7 +62,9 @@ def seed_test_data():
             print("Test users created successfully")
         
         # Create labels (check if they exist first)
-        existing_labels = session.exec(select(Label)).all()
+        # Only the first few rows of each table are used below; never load
+        # whole tables, which may hold millions of synthetic rows.
+        existing_labels = session.exec(select(Label).order_by(Label.id).limit(5)).all()
         if not existing_labels:
             labels = [
                 Label(name="Frontend", color="#007bff"),
@@ -68,7 +81,7 @@ def seed_test_data():
             print("Test labels already exist, skipping label creation")
         
         # Create projects (check if they exist first)
-        existing_projects = session.exec(select(Project)).all()
+        existing_projects = session.exec(select(Project).order_by(Project.id).limit(2)).all()
         if not existing_projects:
             project1 = Project(
                 name="E-commerce Platform",
@@ -93,7 +106,7 @@ def seed_test_data():
             print("Test projects already exist, skipping project creation")
         
         # Create tasks (check if they exist first)
-        existing_tasks = session.exec(select(Task)).all()
+        existing_tasks = session.exec(select(Task).order_by(Task.id).limit(5)).all()
         if not existing_tasks:
             tasks = [
                 Task(
@@ -150,8 +163,8 @@ def seed_test_data():
             print("Test tasks already exist, skipping task creation")
         
         # Assign labels to tasks (check if they exist first)
-        existing_links = session.exec(select(TaskLabelLink)).all()
-        if not existing_links and len(tasks) >= 5 and len(labels) >= 5:
+        existing_link = session.exec(select(TaskLabelLink.task_id).limit(1)).first()
+        if existing_link is None and len(tasks) >= 5 and len(labels) >= 5:
             task_label_links = [
                 TaskLabelLink(task_id=tasks[0].id, label_id=labels[1].id),  # Backend
                 TaskLabelLink(task_id=tasks[0].id, label_id=labels[3].id),  # Feature
@@ -170,11 +183,236 @@ def seed_test_data():
             print("Task-label relationships already exist or insufficient data, skipping")
         
         print("Initial data seeding completed!")
-        user_count = len(session.exec(select(User)).all())
-        label_count = len(session.exec(select(Label)).all())
-        project_count = len(session.exec(select(Project)).all())
-        task_count = len(session.exec(select(Task)).all())
+        user_count, label_count, project_count, task_count = (
+            session.exec(select(func.count()).select_from(model)).one() for model in (User, Label, Project, Task)
+        )
         print(f"Database contains: {user_count} users, {label_count} labels, {project_count} projects, {task_count} tasks")
 
+def parse_weights(spec: str, enum_type: Type[Enum]) -> Dict[Enum, float]:
+    """Parse ``"todo=5,in_progress=3,done=2"`` into enum member weights."""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        try:
+            weights[enum_type(name.strip())] = float(weight)
+        except ValueError:
+            allowed = ", ".join(member.value for member in enum_type)
+            raise ValueError(f"Invalid weight '{part}'; expected name=number with name one of: {allowed}")
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError(f"Weights '{spec}' must include a positive value")
+    return weights
+
+@dataclass
+class SyntheticDataConfig:
+    """Volume and shape of the data made by ``generate_synthetic_data``.
+
+    The same ``seed`` against the same starting database gives the same rows.
+    """
+    users: int = 0
+    projects: int = 0
+    tasks: int = 0
+    labels: int = 0
+    max_labels_per_task: int = 3
+    seed: int = 42
+    password: str = "user123"
+    status_weights: Dict[TaskStatus, float] = field(default_factory=lambda: {
+        TaskStatus.TODO: 5, TaskStatus.IN_PROGRESS: 3, TaskStatus.DONE: 2,
+    })
+    priority_weights: Dict[TaskPriority, float] = field(default_factory=lambda: {
+        TaskPriority.LOW: 3, TaskPriority.MEDIUM: 5, TaskPriority.HIGH: 2,
+    })
+    # Share of tasks with no assignee / no due date
+    unassigned_ratio: float = 0.2
+    no_due_date_ratio: float = 0.3
+    # Assignees are picked with weight 1 / rank ** skew (0 = uniform)
+    assignee_skew: float = 1.0
+    # Due dates fall this many days before/after now
+    due_days_before: int = 30
+    due_days_after: int = 90
+    batch_size: int = 10_000
+
+def _next_id(connection, model) -> int:
+    return (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def _batches(rows: Iterator, size: int) -> Iterator[List]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class _BatchWriter:
+    """executemany INSERTs, one commit per batch, with per-table timings."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+
+    def write(self, model, rows: List[Dict]):
+        name = model.__tablename__
+        self.rows.setdefault(name, 0)
+        self.seconds.setdefault(name, 0.0)
+        if not rows:
+            return
+        start = time.perf_counter()
+        self.connection.execute(insert(model.__table__), rows)
+        self.connection.commit()
+        self.rows[name] += len(rows)
+        self.seconds[name] += time.perf_counter() - start
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "rows": count,
+                "seconds": round(self.seconds[name], 3),
+                "rows_per_second": round(count / self.seconds[name], 1) if self.seconds[name] else 0.0,
+            }
+            for name, count in self.rows.items()
+        }
+
+def _reset_sequences(connection):
+    # Rows are inserted with explicit ids, so move the Postgres sequences past them.
+    for model in (User, Project, Label, Task):
+        table = f'"{model.__tablename__}"'
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+    connection.commit()
+
+def generate_synthetic_data(config: SyntheticDataConfig, target: Optional[Engine] = None) -> Dict[str, Dict[str, float]]:
+    """Add ``config``'s volume of users, labels, projects, tasks and
+    task-label links on top of whatever the database already holds.
+
+    Rows get explicit ids (continuing from the current maximum) so projects,
+    tasks and links can reference them without reading anything back. They
+    are written with executemany in batches of ``config.batch_size``, each
+    batch of tasks together with its label links, and every user shares one
+    precomputed password hash. Returns per-table row counts and rows/second.
+    """
+    from app.core.auth import get_password_hash
+
+    rng = random.Random(config.seed)
+    now = datetime.utcnow()
+    password_hash = get_password_hash(config.password)
+
+    def past(days: int) -> datetime:
+        return now - timedelta(seconds=rng.randrange(days * 86400))
+
+    with (target or engine).connect() as connection:
+        writer = _BatchWriter(connection)
+
+        first = _next_id(connection, User)
+        users = ({
+            "id": user_id, "email": f"user{user_id}@example.com", "name": f"User {user_id}",
+            "password_hash": password_hash, "role": UserRole.REGULAR, "is_active": True,
+            "created_at": past(365), "version": 1,
+        } for user_id in range(first, first + config.users))
+        for batch in _batches(users, config.batch_size):
+            writer.write(User, batch)
+
+        first = _next_id(connection, Label)
+        labels = ({
+            "id": label_id, "name": f"Label {label_id}", "color": f"#{rng.randrange(0x1000000):06x}",
+            "created_at": past(365),
+        } for label_id in range(first, first + config.labels))
+        for batch in _batches(labels, config.batch_size):
+            writer.write(Label, batch)
+
+        user_ids = list(connection.execute(select(User.id).order_by(User.id)).scalars())
+        label_ids = list(connection.execute(select(Label.id).order_by(Label.id)).scalars())
+
+        def project(project_id: int) -> Dict:
+            created_at = past(365)
+            return {
+                "id": project_id, "name": f"Project {project_id}", "description": f"Synthetic project {project_id}",
+                "owner_id": rng.choice(user_ids), "created_at": created_at, "updated_at": created_at,
+                "is_active": True, "version": 1,
+            }
+
+        first = _next_id(connection, Project)
+        for batch in _batches(map(project, range(first, first + config.projects)), config.batch_size):
+            writer.write(Project, batch)
+
+        project_ids = list(connection.execute(select(Project.id).order_by(Project.id)).scalars())
+        if config.tasks and not project_ids:
+            raise ValueError("Tasks need at least one project")
+        statuses, status_weights = zip(*config.status_weights.items())
+        priorities, priority_weights = zip(*config.priority_weights.items())
+        # Cumulative weights make each pick a bisect instead of a scan.
+        assignee_weights = list(accumulate(1 / rank ** config.assignee_skew for rank in range(1, len(user_ids) + 1)))
+        max_labels = min(config.max_labels_per_task, len(label_ids))
+
+        def task(task_id: int) -> Dict:
+            created_at = past(365)
+            due_date = None
+            if rng.random() >= config.no_due_date_ratio:
+                due_date = now + timedelta(days=rng.uniform(-config.due_days_before, config.due_days_after))
+            assigned_to_id = None
+            if user_ids and rng.random() >= config.unassigned_ratio:
+                assigned_to_id = rng.choices(user_ids, cum_weights=assignee_weights)[0]
+            return {
+                "id": task_id, "title": f"Task {task_id}", "description": f"Synthetic task {task_id}",
+                "status": rng.choices(statuses, status_weights)[0],
+                "priority": rng.choices(priorities, priority_weights)[0],
+                "project_id": rng.choice(project_ids), "assigned_to_id": assigned_to_id,
+                "due_date": due_date, "created_at": created_at, "updated_at": created_at, "version": 1,
+            }
+
+        first = _next_id(connection, Task)
+        for batch in _batches(map(task, range(first, first + config.tasks)), config.batch_size):
+            links = [
+                {"task_id": row["id"], "label_id": label_id}
+                for row in batch
+                for label_id in rng.sample(label_ids, rng.randint(0, max_labels))
+            ]
+            writer.write(Task, batch)
+            writer.write(TaskLabelLink, links)
+
+        if connection.dialect.name == "postgresql":
+            _reset_sequences(connection)
+    return writer.report()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Seed the fixture users, projects and tasks, then optionally add synthetic volume, "
+                    "e.g. --users 100000 --projects 10000 --tasks 5000000 --labels 50",
+    )
+    defaults = SyntheticDataConfig()
+    parser.add_argument("--users", type=int, default=0)
+    parser.add_argument("--projects", type=int, default=0)
+    parser.add_argument("--tasks", type=int, default=0)
+    parser.add_argument("--labels", type=int, default=0)
+    parser.add_argument("--max-labels-per-task", type=int, default=defaults.max_labels_per_task)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--status", help="weights, e.g. todo=5,in_progress=3,done=2")
+    parser.add_argument("--priority", help="weights, e.g. low=3,medium=5,high=2")
+    parser.add_argument("--unassigned-ratio", type=float, default=defaults.unassigned_ratio)
+    parser.add_argument("--no-due-date-ratio", type=float, default=defaults.no_due_date_ratio)
+    parser.add_argument("--assignee-skew", type=float, default=defaults.assignee_skew)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    args = parser.parse_args()
+
+    # Standalone runs may start from an empty database; this never drops anything.
+    migrate(engine)
+    seed_test_data()
+    config = SyntheticDataConfig(
+        users=args.users, projects=args.projects, tasks=args.tasks, labels=args.labels,
+        max_labels_per_task=args.max_labels_per_task, seed=args.seed,
+        unassigned_ratio=args.unassigned_ratio, no_due_date_ratio=args.no_due_date_ratio,
+        assignee_skew=args.assignee_skew, batch_size=args.batch_size,
+    )
+    if args.status:
+        config.status_weights = parse_weights(args.status, TaskStatus)
+    if args.priority:
+        config.priority_weights = parse_weights(args.priority, TaskPriority)
+    if not (config.users or config.projects or config.tasks or config.labels):
+        return
+    for table, row in generate_synthetic_data(config).items():
+        print(f"{table:<12}{row['rows']:>10} rows {row['seconds']:>9.2f}s {row['rows_per_second']:>12.0f} rows/s")
+
 if __name__ == "__main__":
-    seed_test_data()
\ No newline at end of file
+    main()
\ No newline at end of file
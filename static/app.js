@@ -1,101 +1,182 @@
-let currentPage = 0;
+let nextCursor = null;
 let currentFilters = {};
 let allTasks = [];
+let taskEvents = null;
+let streamReady = false;
+let refreshTimer = null;
+
+const TASK_EVENT_TYPES = [
+    'task.created', 'task.updated', 'task.deleted',
+    'tasks.bulk_updated', 'tasks.bulk_deleted', 'tasks.imported'
+];
 
 document.addEventListener('DOMContentLoaded', function() {
-    loadStats();
-    loadTasks();
-    loadProjects();
-    loadUsers();
+    loadInitialData();
     setupEventListeners();
+    subscribeToTaskEvents();
 });
 
 function setupEventListeners() {
     document.getElementById('createTaskForm').addEventListener('submit', handleCreateTask);
 }
 
-async function loadStats() {
-    try {
-        const [usersResponse, projectsResponse, tasksResponse] = await Promise.all([
-            fetch('/api/v1/users/'),
-            fetch('/api/v1/projects/'),
-            fetch('/api/v1/tasks/')
-        ]);
+function subscribeToTaskEvents() {
+    if (!window.EventSource) {
+        return;
+    }
+    taskEvents = new EventSource('/api/v1/tasks/stream');
+    // `ready` follows every reconnect (including after `overflow`); changes
+    // may have been missed in between, so refetch then too.
+    taskEvents.addEventListener('ready', () => {
+        if (streamReady) {
+            scheduleRefresh();
+        }
+        streamReady = true;
+    });
+    TASK_EVENT_TYPES.forEach(type => taskEvents.addEventListener(type, scheduleRefresh));
+}
 
-        const users = await usersResponse.json();
-        const projects = await projectsResponse.json();
-        const tasks = await tasksResponse.json();
+function scheduleRefresh() {
+    // Coalesce bursts of events (bulk edits, imports) into one refetch.
+    clearTimeout(refreshTimer);
+    refreshTimer = setTimeout(() => {
+        loadTasks(true);
+        loadStats();
+    }, 250);
+}
+
+function refreshAfterChange() {
+    // While the stream is open, the change comes back as an event.
+    if (!taskEvents || taskEvents.readyState !== EventSource.OPEN) {
+        scheduleRefresh();
+    }
+}
 
-        const todoTasks = tasks.filter(t => t.status === 'todo').length;
-        const inProgressTasks = tasks.filter(t => t.status === 'in_progress').length;
-        const doneTasks = tasks.filter(t => t.status === 'done').length;
+async function fetchBatch(paths) {
+    // Several GETs in one round trip; results come back in the same order.
+    const response = await fetch('/api/v1/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(paths.map(path => ({ method: 'GET', path })))
+    });
+    if (!response.ok) {
+        throw new Error(`Batch failed with ${response.status}`);
+    }
+    return response.json();
+}
 
-        document.getElementById('stats-container').innerHTML = `
-            <div class="row text-center">
-                <div class="col">
-                    <h4>${users.length}</h4>
-                    <small class="text-muted">Users</small>
-                </div>
-                <div class="col">
-                    <h4>${projects.length}</h4>
-                    <small class="text-muted">Projects</small>
-                </div>
-                <div class="col">
-                    <h4>${tasks.length}</h4>
-                    <small class="text-muted">Tasks</small>
-                </div>
-            </div>
-            <hr>
-            <div class="row text-center">
-                <div class="col">
-                    <span class="badge bg-secondary">${todoTasks} To Do</span>
-                </div>
-                <div class="col">
-                    <span class="badge bg-warning">${inProgressTasks} In Progress</span>
-                </div>
-                <div class="col">
-                    <span class="badge bg-success">${doneTasks} Done</span>
-                </div>
-            </div>
-        `;
+async function loadInitialData() {
+    let results;
+    try {
+        results = await fetchBatch([
+            '/api/v1/stats/', `/api/v1/tasks/?${taskParams()}`, '/api/v1/projects/?limit=100', '/api/v1/users/?limit=100'
+        ]);
+    } catch (error) {
+        console.error('Error loading page data in one batch:', error);
+        loadStats();
+        loadTasks();
+        loadProjects();
+        loadUsers();
+        return;
+    }
+    const [stats, tasks, projects, users] = results;
+    // A panel whose request failed loads itself again, as on a refresh.
+    const panels = [
+        [stats, body => showStats(body), loadStats],
+        [tasks, body => showTasks(body, tasks.headers['x-next-cursor'] || null, true), loadTasks],
+        [projects, body => showProjects(body), loadProjects],
+        [users, body => showUsers(body), loadUsers]
+    ];
+    panels.forEach(([result, show, load]) => {
+        if (result.status === 200) {
+            show(result.body);
+        } else {
+            load();
+        }
+    });
+}
+
+async function loadStats() {
+    try {
+        const response = await fetch('/api/v1/stats/');
+        showStats(await response.json());
     } catch (error) {
         console.error('Error loading stats:', error);
         document.getElementById('stats-container').innerHTML = '<p class="text-danger">Error loading stats</p>';
     }
 }
 
+function showStats(stats) {
+    document.getElementById('stats-container').innerHTML = `
+        <div class="row text-center">
+            <div class="col">
+                <h4>${stats.total_users}</h4>
+                <small class="text-muted">Users</small>
+            </div>
+            <div class="col">
+                <h4>${stats.total_projects}</h4>
+                <small class="text-muted">Projects</small>
+            </div>
+            <div class="col">
+                <h4>${stats.total_tasks}</h4>
+                <small class="text-muted">Tasks</small>
+            </div>
+        </div>
+        <hr>
+        <div class="row text-center">
+            <div class="col">
+                <span class="badge bg-secondary">${stats.tasks_by_status.todo} To Do</span>
+            </div>
+            <div class="col">
+                <span class="badge bg-warning">${stats.tasks_by_status.in_progress} In Progress</span>
+            </div>
+            <div class="col">
+                <span class="badge bg-success">${stats.tasks_by_status.done} Done</span>
+            </div>
+        </div>
+    `;
+}
+
 async function loadTasks(reset = true) {
     if (reset) {
-        currentPage = 0;
+        nextCursor = null;
         allTasks = [];
     }
 
     try {
-        const params = new URLSearchParams({
-            skip: currentPage * 10,
-            limit: 10,
-            ...currentFilters
-        });
-
-        const response = await fetch(`/api/v1/tasks/?${params}`);
-        const tasks = await response.json();
-
-        if (reset) {
-            allTasks = tasks;
-        } else {
-            allTasks = [...allTasks, ...tasks];
-        }
-
-        renderTasks();
-        
-        document.getElementById('loadMoreBtn').style.display = tasks.length === 10 ? 'block' : 'none';
-        currentPage++;
+        const response = await fetch(`/api/v1/tasks/?${taskParams()}`);
+        showTasks(await response.json(), response.headers.get('X-Next-Cursor'), reset);
     } catch (error) {
         console.error('Error loading tasks:', error);
         document.getElementById('tasks-container').innerHTML = '<p class="text-danger">Error loading tasks</p>';
     }
 }
 
+function taskParams() {
+    const params = new URLSearchParams({
+        limit: 10,
+        include: 'project',
+        ...currentFilters
+    });
+    if (nextCursor) {
+        params.set('cursor', nextCursor);
+    }
+    return params;
+}
+
+function showTasks(tasks, cursor, reset) {
+    nextCursor = cursor;
+    if (reset) {
+        allTasks = tasks;
+    } else {
+        allTasks = [...allTasks, ...tasks];
+    }
+
+    renderTasks();
+
+    document.getElementById('loadMoreBtn').style.display = nextCursor ? 'block' : 'none';
+}
+
 function renderTasks() {
     const container = document.getElementById('tasks-container');
     
@@ -119,7 +200,7 @@ function renderTasks() {
                     </div>
                 </div>
                 <div class="d-flex justify-content-between align-items-center mt-2">
-                    <small class="text-muted">Project ID: ${task.project_id}</small>
+                    <small class="text-muted">Project: ${task.project ? task.project.name : task.project_id}</small>
                     <div>
                         <button class="btn btn-sm btn-outline-primary" onclick="editTask(${task.id})">Edit</button>
                         <button class="btn btn-sm btn-outline-danger" onclick="deleteTask(${task.id})">Delete</button>
@@ -142,56 +223,60 @@ function getStatusColor(status) {
 
 async function loadProjects() {
     try {
-        const response = await fetch('/api/v1/projects/');
-        const projects = await response.json();
-
-        const container = document.getElementById('projects-container');
-        container.innerHTML = projects.map(project => `
-            <div class="card mb-2">
-                <div class="card-body py-2">
-                    <h6 class="card-title mb-1">${project.name}</h6>
-                    <p class="card-text small text-muted">${project.description || 'No description'}</p>
-                    <small class="text-muted">Owner ID: ${project.owner_id}</small>
-                </div>
-            </div>
-        `).join('');
-
-        // Populate project dropdown in modal
-        const projectSelect = document.getElementById('taskProject');
-        projectSelect.innerHTML = '<option value="">Select a project</option>' +
-            projects.map(p => `<option value="${p.id}">${p.name}</option>`).join('');
+        const response = await fetch('/api/v1/projects/?limit=100');
+        showProjects(await response.json());
     } catch (error) {
         console.error('Error loading projects:', error);
         document.getElementById('projects-container').innerHTML = '<p class="text-danger">Error loading projects</p>';
     }
 }
 
-async function loadUsers() {
-    try {
-        const response = await fetch('/api/v1/users/');
-        const users = await response.json();
-
-        const container = document.getElementById('users-container');
-        container.innerHTML = users.map(user => `
-            <div class="card mb-2">
-                <div class="card-body py-2">
-                    <h6 class="card-title mb-1">${user.name}</h6>
-                    <p class="card-text small">${user.email}</p>
-                    <span class="badge bg-${user.role === 'admin' ? 'primary' : 'secondary'}">${user.role}</span>
-                </div>
+function showProjects(projects) {
+    const container = document.getElementById('projects-container');
+    container.innerHTML = projects.map(project => `
+        <div class="card mb-2">
+            <div class="card-body py-2">
+                <h6 class="card-title mb-1">${project.name}</h6>
+                <p class="card-text small text-muted">${project.description || 'No description'}</p>
+                <small class="text-muted">Owner ID: ${project.owner_id}</small>
             </div>
-        `).join('');
+        </div>
+    `).join('');
 
-        // Populate assignee dropdown in modal
-        const assigneeSelect = document.getElementById('taskAssignee');
-        assigneeSelect.innerHTML = '<option value="">Unassigned</option>' +
-            users.map(u => `<option value="${u.id}">${u.name}</option>`).join('');
+    // Populate project dropdown in modal
+    const projectSelect = document.getElementById('taskProject');
+    projectSelect.innerHTML = '<option value="">Select a project</option>' +
+        projects.map(p => `<option value="${p.id}">${p.name}</option>`).join('');
+}
+
+async function loadUsers() {
+    try {
+        const response = await fetch('/api/v1/users/?limit=100');
+        showUsers(await response.json());
     } catch (error) {
         console.error('Error loading users:', error);
         document.getElementById('users-container').innerHTML = '<p class="text-danger">Error loading users</p>';
     }
 }
 
+function showUsers(users) {
+    const container = document.getElementById('users-container');
+    container.innerHTML = users.map(user => `
+        <div class="card mb-2">
+            <div class="card-body py-2">
+                <h6 class="card-title mb-1">${user.name}</h6>
+                <p class="card-text small">${user.email}</p>
+                <span class="badge bg-${user.role === 'admin' ? 'primary' : 'secondary'}">${user.role}</span>
+            </div>
+        </div>
+    `).join('');
+
+    // Populate assignee dropdown in modal
+    const assigneeSelect = document.getElementById('taskAssignee');
+    assigneeSelect.innerHTML = '<option value="">Unassigned</option>' +
+        users.map(u => `<option value="${u.id}">${u.name}</option>`).join('');
+}
+
 function filterTasks() {
     const status = document.getElementById('statusFilter').value;
     const priority = document.getElementById('priorityFilter').value;
@@ -203,18 +288,31 @@ function filterTasks() {
     loadTasks(true);
 }
 
-function searchTasks() {
-    const searchTerm = document.getElementById('searchInput').value.toLowerCase();
+async function searchTasks() {
+    const searchTerm = document.getElementById('searchInput').value.trim();
     
     if (searchTerm === '') {
         renderTasks();
         return;
     }
 
-    const filteredTasks = allTasks.filter(task => 
-        task.title.toLowerCase().includes(searchTerm) ||
-        (task.description && task.description.toLowerCase().includes(searchTerm))
-    );
+    let filteredTasks;
+    try {
+        const params = new URLSearchParams({
+            q: searchTerm,
+            limit: 50,
+            include: 'project',
+            ...currentFilters
+        });
+        const response = await fetch(`/api/v1/tasks/search?${params}`);
+        filteredTasks = await response.json();
+    } catch (error) {
+        console.error('Error searching tasks:', error);
+        return;
+    }
+    if (document.getElementById('searchInput').value.trim() !== searchTerm) {
+        return;  // a newer keystroke has started its own search
+    }
 
     const container = document.getElementById('tasks-container');
     if (filteredTasks.length === 0) {
@@ -237,7 +335,7 @@ function searchTasks() {
                     </div>
                 </div>
                 <div class="d-flex justify-content-between align-items-center mt-2">
-                    <small class="text-muted">Project ID: ${task.project_id}</small>
+                    <small class="text-muted">Project: ${task.project ? task.project.name : task.project_id}</small>
                     <div>
                         <button class="btn btn-sm btn-outline-primary" onclick="editTask(${task.id})">Edit</button>
                         <button class="btn btn-sm btn-outline-danger" onclick="deleteTask(${task.id})">Delete</button>
@@ -282,8 +380,7 @@ async function handleCreateTask(e) {
             const modal = bootstrap.Modal.getInstance(document.getElementById('createTaskModal'));
             modal.hide();
             document.getElementById('createTaskForm').reset();
-            loadTasks(true);
-            loadStats();
+            refreshAfterChange();
         } else {
             const error = await response.json();
             alert(`Error creating task: ${error.detail}`);
@@ -305,8 +402,7 @@ async function deleteTask(taskId) {
         });
 
         if (response.ok) {
-            loadTasks(true);
-            loadStats();
+            refreshAfterChange();
         } else {
             alert('Error deleting task');
         }
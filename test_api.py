@@ -1,8 +1,18 @@
 # Pytest suite to validate the QA take-home FastAPI platform via API testing
+import asyncio
+import gc
+import json
+import os
+import re
+from datetime import datetime
 import httpx
 import pytest
+from app.core.changes import Watermark
+from app.core.migrations import LATEST_VERSION
 
 BASE_URL = "http://localhost:8000"
+# Asks the server to report X-DB-Query-Count on its response.
+QUERY_DEBUG_HEADERS = {"X-Debug-Queries": "1"}
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -90,6 +100,101 @@ def test_seed_data_endpoint():  # SC-DEF-007
     response = httpx.post(f"{BASE_URL}/seed-data")
     assert response.status_code in [200, 201]
 
+@pytest.mark.default
+def test_seed_data_generates_synthetic_volume():  # SC-DEF-009
+    before = httpx.get(f"{BASE_URL}/api/v1/stats/").json()
+    response = httpx.post(f"{BASE_URL}/seed-data", params={"users": 5, "projects": 2, "tasks": 40, "status": "done=1"})
+    assert response.status_code == 200
+    generated = response.json()["generated"]
+    assert generated["task"]["rows"] == 40 and generated["task"]["rows_per_second"] > 0
+    after = httpx.get(f"{BASE_URL}/api/v1/stats/").json()
+    assert after["total_tasks"] == before["total_tasks"] + 40
+    assert after["tasks_by_status"]["done"] == before["tasks_by_status"]["done"] + 40
+    assert after["total_users"] == before["total_users"] + 5
+
+    created = httpx.post(f"{BASE_URL}/api/v1/tasks/", json={"title": "After generation", "project_id": 1})
+    assert created.status_code == 201
+    assert httpx.post(f"{BASE_URL}/seed-data", params={"tasks": 1, "status": "finished=1"}).status_code == 400
+    assert httpx.post(f"{BASE_URL}/seed-data", params={"tasks": 10**9}).status_code == 422
+
+@pytest.mark.default
+def test_metrics_expose_routes_queries_and_pool():  # SC-DEF-010
+    httpx.get(f"{BASE_URL}/api/v1/tasks/1")
+    response = httpx.get(f"{BASE_URL}/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/tasks/{task_id}",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/v1/tasks/{task_id}",le="+Inf"}' in body
+    assert 'db_queries_per_request_sum{method="GET",route="/api/v1/tasks/{task_id}"}' in body
+    assert "db_pool_checked_out{" in body and "db_pool_wait_seconds_count{" in body
+    assert "/api/v1/tasks/1\"" not in body
+    assert 'admission_requests_total{limiter="global",outcome="admitted"}' in body
+
+@pytest.mark.default
+def test_liveness_and_readiness_probes():  # SC-DEF-011
+    assert httpx.get(f"{BASE_URL}/health/live").json() == {"status": "alive"}
+    response = httpx.get(f"{BASE_URL}/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["schema_version"] == LATEST_VERSION
+
+
+@pytest.mark.default
+def test_fingerprinted_assets_and_cached_pages():  # SC-DEF-015
+    page = httpx.get(f"{BASE_URL}/", headers={"Accept-Encoding": "gzip"})
+    assert page.headers["content-encoding"] == "gzip" and page.headers["cache-control"] == "no-cache"
+    assert httpx.get(f"{BASE_URL}/", headers={"Accept-Encoding": "gzip", "If-None-Match": page.headers["etag"]}).status_code == 304
+
+    script = re.search(r'src="(/static/app\.[0-9a-f]+\.js)"', page.text).group(1)
+    asset = httpx.get(f"{BASE_URL}{script}", headers={"Accept-Encoding": "gzip"})
+    assert asset.status_code == 200 and "immutable" in asset.headers["cache-control"]
+    assert asset.headers["content-encoding"] == "gzip"
+    plain = httpx.get(f"{BASE_URL}/static/app.js", headers={"Accept-Encoding": "identity"})
+    assert plain.content == asset.content and "content-encoding" not in plain.headers
+    assert plain.headers["cache-control"] == "no-cache"
+
+    # Large JSON is gzipped on the fly, small JSON and streams are not.
+    tasks = httpx.get(f"{BASE_URL}/api/v1/tasks/", headers={"Accept-Encoding": "gzip"})
+    assert len(tasks.content) >= 1024 and tasks.headers["content-encoding"] == "gzip"
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/", headers={"If-None-Match": tasks.headers["etag"]}).status_code == 304
+    assert "content-encoding" not in httpx.get(f"{BASE_URL}/health").headers
+    assert "content-encoding" not in httpx.get(f"{BASE_URL}/api/v1/tasks/export").headers
+
+@pytest.mark.default
+def test_batch_runs_sub_requests_in_one_round_trip():  # SC-DEF-016
+    token = get_token_for_user("admin@example.com", "admin123")
+    response = httpx.post(f"{BASE_URL}/api/v1/batch", headers={"Authorization": f"Bearer {token}"}, json=[
+        {"id": "me", "path": "/api/v1/auth/me"},
+        {"id": "admin", "path": "/api/v1/auth/admin-only"},
+        {"id": "users", "path": "/api/v1/users/?limit=1"},
+        {"id": "create", "method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Batched", "project_id": 1}},
+        {"id": "missing", "path": "/api/v1/tasks/999999"},
+    ])
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["id"] for result in results] == ["me", "admin", "users", "create", "missing"]
+    assert [result["status"] for result in results] == [200, 200, 200, 201, 404]
+    assert results[0]["body"]["email"] == "admin@example.com"
+    assert "x-next-cursor" in results[2]["headers"]
+    # Item headers reach the route; without a token on the batch, none is inherited.
+    created = results[3]["body"]
+    again = httpx.post(f"{BASE_URL}/api/v1/batch", json=[
+        {"path": f"/api/v1/tasks/{created['id']}", "headers": {"If-None-Match": '"v1"'}},
+        {"path": "/api/v1/auth/me"},
+    ]).json()
+    assert [result["status"] for result in again] == [304, 403]
+
+    assert httpx.post(f"{BASE_URL}/api/v1/batch", json=[{"path": "/api/v1/batch"}]).status_code == 400
+    assert httpx.post(f"{BASE_URL}/api/v1/batch", json=[{"path": "/health"}]).status_code == 400
+
+    # Logins cannot be batched past the login rate limit.
+    login = {"method": "POST", "path": "/api/v1/auth/login", "body": "username=admin@example.com&password=wrong",
+             "headers": {"Content-Type": "application/x-www-form-urlencoded"}}
+    refused = httpx.post(f"{BASE_URL}/api/v1/batch", json=[login] * 20)
+    assert refused.status_code == 400 and "/api/v1/auth/login" in refused.json()["detail"]
+    assert httpx.post(f"{BASE_URL}/api/v1/batch", json=[{"method": "POST", "path": "/api/v1/tasks/import"}]).status_code == 400
+
 @pytest.mark.default
 def test_nonexistent_route_404():  # SC-DEF-008
     response = httpx.get(f"{BASE_URL}/nonexistent")
@@ -157,6 +262,582 @@ def test_regular_user_access_admin_only_returns_403():  # TC-AUTH-008 / SC-AUTH-
     response = httpx.get(f"{BASE_URL}/api/v1/auth/admin-only", headers=headers)
     assert response.status_code == 403
 
+@pytest.mark.auth
+def test_principal_cache_hits_on_repeat_requests():  # TC-AUTH-009
+    headers = {"Authorization": f"Bearer {get_token_for_user('admin@example.com', 'admin123')}"}
+    before = httpx.get(f"{BASE_URL}/api/v1/auth/principal-cache", headers=headers).json()
+    for _ in range(3):
+        assert httpx.get(f"{BASE_URL}/api/v1/auth/me", headers=headers).status_code == 200
+    after = httpx.get(f"{BASE_URL}/api/v1/auth/principal-cache", headers=headers).json()
+    assert after["hits"] >= before["hits"] + 4
+
+@pytest.mark.auth
+def test_password_hashing_pool_reports_queue_metrics():  # TC-AUTH-011
+    headers = {"Authorization": f"Bearer {get_token_for_user('admin@example.com', 'admin123')}"}
+    before = httpx.get(f"{BASE_URL}/api/v1/auth/password-hashing", headers=headers).json()
+    get_token_for_user("john@example.com", "user123")
+    after = httpx.get(f"{BASE_URL}/api/v1/auth/password-hashing", headers=headers).json()
+    assert after["completed"] == before["completed"] + 1
+    assert after["queue_depth"] >= 0
+    assert after["max_workers"] > 0
+
+@pytest.mark.auth
+def test_user_creation_hashes_off_the_event_loop():  # TC-AUTH-012
+    async def scenario():
+        async with httpx.AsyncClient(base_url=BASE_URL, timeout=60) as client:
+            async def create(index):
+                payload = {"email": f"hash-{index}-{os.urandom(4).hex()}@example.com", "name": "Hash", "password": "hash123"}
+                assert (await client.post("/api/v1/users/", json=payload)).status_code == 201
+
+            async def liveness():
+                worst = 0.0
+                for _ in range(20):
+                    start = asyncio.get_running_loop().time()
+                    await client.get("/health/live")
+                    worst = max(worst, asyncio.get_running_loop().time() - start)
+                    await asyncio.sleep(0.02)
+                return worst
+
+            worst, *_ = await asyncio.gather(liveness(), *(create(index) for index in range(8)))
+            return worst
+
+    # Eight bcrypt hashes take far longer than this; none may hold up the loop.
+    # The probe is timed here, so keep this process's own collector pauses
+    # (its heap holds the app modules test_units.py imports) out of it.
+    gc.collect()
+    gc.disable()
+    try:
+        assert asyncio.run(scenario()) < 0.2
+    finally:
+        gc.enable()
+
+@pytest.mark.auth
+def test_deactivated_user_token_rejected_after_cache_invalidation():  # TC-AUTH-010
+    admin_headers = {"Authorization": f"Bearer {get_token_for_user('admin@example.com', 'admin123')}"}
+    payload = {"email": "cached-user@example.com", "name": "Cached User", "password": "cached123", "role": "regular"}
+    created = httpx.post(f"{BASE_URL}/api/v1/users/", headers=admin_headers, json=payload)
+    assert created.status_code == 201
+
+    user_headers = {"Authorization": f"Bearer {get_token_for_user('cached-user@example.com', 'cached123')}"}
+    assert httpx.get(f"{BASE_URL}/api/v1/auth/me", headers=user_headers).status_code == 200
+
+    assert httpx.delete(f"{BASE_URL}/api/v1/users/{created.json()['id']}", headers=admin_headers).status_code == 200
+    response = httpx.get(f"{BASE_URL}/api/v1/auth/me", headers=user_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+# ---------- TASK TESTS ----------
+def collect_task_pages(params):
+    # Follows X-Next-Cursor until the last page and returns every task seen.
+    tasks, cursor = [], None
+    while True:
+        page_params = dict(params, cursor=cursor) if cursor else params
+        response = httpx.get(f"{BASE_URL}/api/v1/tasks/", params=page_params)
+        assert response.status_code == 200, response.text
+        tasks.extend(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return tasks
+
+@pytest.mark.tasks
+def test_task_cursor_pagination_sorted_by_priority():  # TC-TSK-001
+    all_tasks = collect_task_pages({"project_id": 1, "limit": 100})
+    paged = collect_task_pages({"project_id": 1, "limit": 2, "sort": "-priority"})
+
+    assert sorted(t["id"] for t in paged) == sorted(t["id"] for t in all_tasks)
+    rank = {"low": 0, "medium": 1, "high": 2}
+    keys = [(rank[t["priority"]], t["id"]) for t in paged]
+    assert keys == sorted(keys, reverse=True)
+
+    # Without a limit, lists still return up to 100 rows, as they always have.
+    default_page = httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"project_id": 1}).json()
+    assert [t["id"] for t in default_page] == [t["id"] for t in all_tasks[:100]]
+    for params in ({"limit": 101}, {"limit": 0}, {"skip": -1}):
+        assert httpx.get(f"{BASE_URL}/api/v1/tasks/", params=params).status_code == 422
+
+@pytest.mark.tasks
+def test_task_cursor_rejects_invalid_cursor_and_sort():  # TC-TSK-002
+    response = httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    response = httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"sort": "title"})
+    assert response.status_code == 400
+
+def create_task(**fields):
+    payload = {"title": "QA task", "project_id": 1, **fields}
+    response = httpx.post(f"{BASE_URL}/api/v1/tasks/", json=payload)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+@pytest.mark.tasks
+def test_bulk_status_update_reports_per_id_results():  # TC-TSK-003
+    first, second = create_task(), create_task()
+    payload = [first["id"], {"id": second["id"], "version": second["version"] + 1}, 999999]
+    response = httpx.put(f"{BASE_URL}/api/v1/tasks/bulk/status", params={"new_status": "done"}, json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated_count"] == 1
+    assert body["results"] == {"updated": [first["id"]], "missing": [999999], "conflict": [second["id"]]}
+
+    updated = httpx.get(f"{BASE_URL}/api/v1/tasks/{first['id']}").json()
+    assert updated["status"] == "done"
+    assert updated["version"] == first["version"] + 1
+
+@pytest.mark.tasks
+def test_bulk_delete_route_is_not_shadowed():  # TC-TSK-004
+    first, second = create_task(), create_task()
+    payload = [first["id"], {"id": second["id"], "version": second["version"]}]
+    response = httpx.request("DELETE", f"{BASE_URL}/api/v1/tasks/bulk", json=payload)
+    assert response.status_code == 200, response.text
+    assert response.json()["deleted_count"] == 2
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/{first['id']}").status_code == 404
+
+@pytest.mark.tasks
+def test_task_include_embeds_relations():  # TC-TSK-005
+    task = create_task(assigned_to_id=2)
+    response = httpx.get(f"{BASE_URL}/api/v1/tasks/{task['id']}", params={"include": "labels,assignee,project"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["project"]["id"] == 1 and body["project"]["name"]
+    assert body["assignee"]["id"] == 2
+    assert body["labels"] == []
+
+    plain = httpx.get(f"{BASE_URL}/api/v1/tasks/{task['id']}").json()
+    assert "project" not in plain and "labels" not in plain
+
+    listed = httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"include": "project", "limit": 5}).json()
+    assert all(t["project"]["id"] == t["project_id"] for t in listed)
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"include": "owner"}).status_code == 400
+
+@pytest.mark.tasks
+def test_task_search_ranks_and_filters():  # TC-TSK-006
+    title_hit = create_task(title="Quokka migration plan", description="move the quokka herd", priority="high")
+    body_hit = create_task(title="Unrelated chore", description="mentions quokka once", priority="low")
+
+    response = httpx.get(f"{BASE_URL}/api/v1/tasks/search", params={"q": "quokka"})
+    assert response.status_code == 200
+    ids = [t["id"] for t in response.json()]
+    assert ids.index(title_hit["id"]) < ids.index(body_hit["id"])
+
+    filtered = httpx.get(f"{BASE_URL}/api/v1/tasks/search", params={"q": "quokka", "priority_filter": "low"}).json()
+    assert [t["id"] for t in filtered] == [body_hit["id"]]
+
+    updated = httpx.put(f"{BASE_URL}/api/v1/tasks/{body_hit['id']}", json={"title": "Wombat chore", "description": "no match", "project_id": 1, "version": body_hit["version"]})
+    assert updated.status_code == 200
+    ids = [t["id"] for t in httpx.get(f"{BASE_URL}/api/v1/tasks/search", params={"q": "quokka"}).json()]
+    assert body_hit["id"] not in ids
+
+@pytest.mark.tasks
+def test_task_search_requires_query():  # TC-TSK-007
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/search").status_code == 422
+
+@pytest.mark.tasks
+@pytest.mark.labels
+def test_task_label_filter_any_and_all():  # TC-TSK-008
+    labels = httpx.get(f"{BASE_URL}/api/v1/labels/", params={"with_counts": True}).json()
+    used = [label for label in labels if label["task_count"] > 0][:2]
+    assert len(used) == 2
+    ids = [label["id"] for label in used]
+
+    any_ids = {t["id"] for t in collect_task_pages({"label_ids": ids})}
+    all_ids = {t["id"] for t in collect_task_pages({"label_ids": ids, "label_match": "all"})}
+    first_only = {t["id"] for t in collect_task_pages({"label_ids": ids[:1]})}
+    assert len(first_only) == used[0]["task_count"]
+    assert all_ids <= first_only <= any_ids
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"label_ids": ids, "label_match": "some"}).status_code == 422
+
+@pytest.mark.tasks
+@pytest.mark.labels
+def test_task_facets_match_filtered_list():  # TC-TSK-009
+    response = httpx.get(f"{BASE_URL}/api/v1/tasks/facets", params={"project_id": 1})
+    assert response.status_code == 200
+    facets = response.json()
+    tasks = collect_task_pages({"project_id": 1})
+    assert facets["total"] == len(tasks)
+    assert sum(facets["status"].values()) == sum(facets["priority"].values()) == facets["total"]
+    assert facets["status"]["todo"] == sum(t["status"] == "todo" for t in tasks)
+    for label in facets["labels"]:
+        labelled = collect_task_pages({"project_id": 1, "label_ids": [label["id"]]})
+        assert label["count"] == len(labelled)
+
+@pytest.mark.labels
+def test_labels_with_counts_is_opt_in():  # TC-LBL-001
+    plain = httpx.get(f"{BASE_URL}/api/v1/labels/").json()
+    assert plain and all("task_count" not in label for label in plain)
+    counted = httpx.get(f"{BASE_URL}/api/v1/labels/", params={"with_counts": True}).json()
+    assert sorted(label["id"] for label in counted) == sorted(label["id"] for label in plain)
+
+@pytest.mark.tasks
+def test_task_conditional_get_and_if_match():  # TC-TSK-010
+    task = create_task()
+    url = f"{BASE_URL}/api/v1/tasks/{task['id']}"
+    first = httpx.get(url)
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+    cached = httpx.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert httpx.get(url, headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+
+    updated = httpx.put(url, json={"title": "Conditional", "project_id": 1}, headers={"If-Match": etag})
+    assert updated.status_code == 200
+    assert updated.json()["version"] == task["version"] + 1
+    assert updated.headers["etag"] != etag
+    stale = httpx.put(url, json={"title": "Stale", "project_id": 1}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert httpx.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+@pytest.mark.tasks
+def test_task_list_etag_changes_with_filtered_rows():  # TC-TSK-011
+    params = {"project_id": 2}
+    etag = httpx.get(f"{BASE_URL}/api/v1/tasks/", params=params).headers["etag"]
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/", params=params, headers={"If-None-Match": etag}).status_code == 304
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"project_id": 2, "limit": 1}, headers={"If-None-Match": etag}).status_code == 200
+
+    create_task(project_id=2)
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/", params=params, headers={"If-None-Match": etag}).status_code == 200
+
+    # Cursor pages are tagged from their own rows, with no query beyond the page.
+    first = httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"limit": 2})
+    assert "x-db-query-count" not in first.headers
+    following = {"limit": 2, "cursor": first.headers["x-next-cursor"]}
+    page = httpx.get(f"{BASE_URL}/api/v1/tasks/", params=following, headers=QUERY_DEBUG_HEADERS)
+    assert page.headers["x-db-query-count"] == "1"
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/", params=following, headers={"If-None-Match": page.headers["etag"]}).status_code == 304
+
+@pytest.mark.tasks
+def test_task_export_streams_filtered_rows():  # TC-TSK-012
+    listed = collect_task_pages({"project_id": 1})
+    response = httpx.get(f"{BASE_URL}/api/v1/tasks/export", params={"project_id": 1})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert [t["id"] for t in exported] == sorted(t["id"] for t in listed)
+
+    csv_export = httpx.get(f"{BASE_URL}/api/v1/tasks/export", params={"project_id": 1, "format": "csv"})
+    lines = csv_export.text.splitlines()
+    assert lines[0].startswith("id,title,")
+    assert len(lines) == len(listed) + 1
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/export", params={"format": "xml"}).status_code == 422
+
+@pytest.mark.tasks
+def test_task_import_reports_line_errors_and_resumes():  # TC-TSK-014
+    lines = [json.dumps({"title": f"Imported pelican {n}", "project_id": 2, "priority": "low"}) for n in range(6)]
+    lines[1] = json.dumps({"title": "Orphan", "project_id": 999999})
+    lines[2] = "{not json"
+    body = "\n".join(lines) + "\n"
+
+    response = httpx.post(f"{BASE_URL}/api/v1/tasks/import", content=body)
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["failed"], report["checkpoint"], report["completed"]) == (4, 2, 6, True)
+    assert [error["line"] for error in report["errors"]] == [2, 3]
+    assert "999999" in report["errors"][0]["error"]
+
+    resumed = httpx.post(f"{BASE_URL}/api/v1/tasks/import", params={"resume_from": 4}, content=body).json()
+    assert (resumed["imported"], resumed["skipped"], resumed["failed"]) == (2, 4, 0)
+    found = httpx.get(f"{BASE_URL}/api/v1/tasks/search", params={"q": "pelican", "limit": 50}).json()
+    assert len(found) == 6
+
+@pytest.mark.tasks
+def test_task_import_reports_invalid_utf8_lines():  # TC-TSK-020
+    body = b'{"title": "Valid heron", "project_id": 1}\n{"title": "Bad \xff\xfe", "project_id": 1}\n'
+    response = httpx.post(f"{BASE_URL}/api/v1/tasks/import", content=body)
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["failed"], report["completed"]) == (1, 1, True)
+    assert report["errors"][0]["line"] == 2 and "UTF-8" in report["errors"][0]["error"]
+
+    csv_report = httpx.post(f"{BASE_URL}/api/v1/tasks/import", params={"format": "csv"}, content=b"ti\xfftle\nx\n").json()
+    assert csv_report["completed"] is False and "UTF-8" in csv_report["error"]
+
+@pytest.mark.tasks
+def test_task_import_round_trips_csv_export():  # TC-TSK-015
+    exported = httpx.get(f"{BASE_URL}/api/v1/tasks/export", params={"format": "csv", "project_id": 1}).text
+    report = httpx.post(f"{BASE_URL}/api/v1/tasks/import", params={"format": "csv"}, content=exported).json()
+    assert report["failed"] == 0
+    assert report["imported"] == len(exported.splitlines()) - 1
+
+@pytest.mark.tasks
+def test_task_stream_pushes_filtered_changes():  # TC-TSK-016
+    project = httpx.post(f"{BASE_URL}/api/v1/projects/", json={"name": "Streamed", "owner_id": 1}).json()
+
+    def next_event(lines):
+        fields = {}
+        for line in lines:
+            if not line:
+                if fields:
+                    return fields["event"], json.loads(fields["data"])
+            elif not line.startswith(":"):
+                name, _, value = line.partition(": ")
+                fields[name] = value
+
+    with httpx.stream("GET", f"{BASE_URL}/api/v1/tasks/stream", params={"project_id": project["id"]}, timeout=10) as stream:
+        assert stream.headers["content-type"].startswith("text/event-stream")
+        lines = stream.iter_lines()
+        assert next_event(lines) == ("ready", {})
+
+        httpx.post(f"{BASE_URL}/api/v1/tasks/", json={"title": "Elsewhere", "project_id": 1})
+        task = httpx.post(f"{BASE_URL}/api/v1/tasks/", json={"title": "Streamed", "project_id": project["id"]}).json()
+        event_type, event = next_event(lines)
+        assert event_type == "task.created"
+        assert [(streamed["id"], streamed["title"]) for streamed in event["tasks"]] == [(task["id"], "Streamed")]
+
+        # Moving the task out of the project still reaches this stream.
+        httpx.put(f"{BASE_URL}/api/v1/tasks/{task['id']}", json={"project_id": 1, "version": task["version"]})
+        event_type, event = next_event(lines)
+        assert event_type == "task.updated"
+        assert event["tasks"][0]["project_id"] == 1
+        assert event["tasks"][0]["previous"]["project_id"] == project["id"]
+
+@pytest.mark.tasks
+def test_task_changes_return_updates_and_tombstones_since_watermark():  # TC-TSK-017
+    kept, updated, deleted = create_task(title="Synced"), create_task(title="Synced"), create_task(title="Synced")
+    params, has_more = {"limit": 1000}, True
+    while has_more:
+        page = httpx.get(f"{BASE_URL}/api/v1/tasks/changes", params=params).json()
+        params["since"] = page["watermark"]
+        has_more = page["has_more"]
+
+    httpx.put(f"{BASE_URL}/api/v1/tasks/{updated['id']}", json={"title": "Synced 2", "version": updated["version"]})
+    httpx.delete(f"{BASE_URL}/api/v1/tasks/{deleted['id']}")
+    page = httpx.get(f"{BASE_URL}/api/v1/tasks/changes", params={"since": params["since"]}).json()
+    changed = {task["id"]: task for task in page["changed"]}
+    assert changed[updated["id"]]["title"] == "Synced 2"
+    assert deleted["id"] in page["deleted"] and deleted["id"] not in changed
+    # Writes from the last few seconds are sent again, older ones are not.
+    assert kept["id"] in changed
+
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/changes", params={"since": "bogus"}).status_code == 400
+    expired = Watermark((datetime(2000, 1, 1), 0), (datetime(2000, 1, 1), 0)).encode()
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/changes", params={"since": expired}).status_code == 410
+
+@pytest.mark.tasks
+def test_task_list_sparse_fieldsets():  # TC-TSK-018
+    response = httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"fields": "title,status", "limit": 2, "sort": "-priority"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert all(set(task) == {"id", "title", "status"} for task in response.json())
+    # The projection still pages by the sort key it does not return.
+    following = httpx.get(f"{BASE_URL}/api/v1/tasks/", params={
+        "fields": "title", "limit": 2, "sort": "-priority", "cursor": response.headers["x-next-cursor"],
+    }).json()
+    assert {task["id"] for task in following}.isdisjoint(task["id"] for task in response.json())
+
+    for task in response.json():
+        full = httpx.get(f"{BASE_URL}/api/v1/tasks/{task['id']}").json()
+        assert task == {name: full[name] for name in ("id", "title", "status")}
+    found = httpx.get(f"{BASE_URL}/api/v1/tasks/search", params={"q": "authentication", "fields": "priority"}).json()
+    assert found and all(set(task) == {"id", "priority"} for task in found)
+
+    reordered = httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"fields": "status,title,title", "limit": 2, "sort": "-priority"})
+    assert reordered.content == response.content
+
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"fields": "title,secret"}).status_code == 400
+    assert httpx.get(f"{BASE_URL}/api/v1/tasks/", params={"fields": "title", "include": "labels"}).status_code == 400
+
+@pytest.mark.tasks
+def test_compressed_task_etag_works_in_if_match():  # TC-TSK-019
+    task = create_task(description="x" * 2048)
+    url = f"{BASE_URL}/api/v1/tasks/{task['id']}"
+    fetched = httpx.get(url, headers={"Accept-Encoding": "gzip"})
+    assert fetched.headers["content-encoding"] == "gzip"
+    etag = fetched.headers["etag"]
+    assert etag == f'"v{task["version"]}-gzip"'
+    assert httpx.get(url, headers={"Accept-Encoding": "identity"}).headers["etag"] == f'"v{task["version"]}"'
+    cached = httpx.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert cached.status_code == 304 and cached.headers["etag"] == etag
+    updated = httpx.put(url, json={"title": "Compressed", "project_id": 1}, headers={"If-Match": etag})
+    assert updated.status_code == 200
+
+@pytest.mark.tasks
+def test_task_list_conditional_get():  # TC-TSK-022
+    url, params = f"{BASE_URL}/api/v1/tasks/", {"project_id": 1}
+    create_task()
+    page = httpx.get(url, params=params)
+    etag, last_modified = page.headers["etag"], page.headers["last-modified"]
+    assert httpx.get(url, params=params, headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert httpx.get(url, params={**params, "fields": "id,title"}, headers={"If-None-Match": etag}).status_code == 200
+    # Embedded rows carry their own update times, so the task's is not sent.
+    assert "last-modified" not in httpx.get(url, params={**params, "include": "project"}).headers
+
+    first = page.json()[0]
+    updated = httpx.put(f"{url}{first['id']}", json={"title": "Listed", "project_id": 1})
+    assert updated.status_code == 200
+    assert httpx.get(url, params=params, headers={"If-None-Match": etag}).status_code == 200
+
+@pytest.mark.users
+def test_user_update_accepts_if_match():  # TC-USR-012
+    token = get_token_for_user("admin@example.com", "admin123")
+    headers = {"Authorization": f"Bearer {token}"}
+    created = httpx.post(f"{BASE_URL}/api/v1/users/", headers=headers, json={
+        "email": "if-match@example.com", "name": "If Match", "password": "ifmatch123", "role": "regular",
+    }).json()
+    url = f"{BASE_URL}/api/v1/users/{created['id']}"
+    etag = httpx.get(url, headers=headers).headers["etag"]
+
+    renamed = httpx.put(url, headers={**headers, "If-Match": etag}, json={"name": "Renamed"})
+    assert renamed.status_code == 200 and renamed.json()["name"] == "Renamed"
+    assert httpx.put(url, headers={**headers, "If-Match": etag}, json={"name": "Stale"}).status_code == 412
+    assert httpx.put(url, headers=headers, json={"name": "No precondition"}).status_code == 428
+
+@pytest.mark.users
+def test_users_cursor_pagination_by_email():  # TC-USR-011
+    users = []
+    cursor = None
+    while True:
+        params = {"limit": 1, "sort": "email"}
+        if cursor:
+            params["cursor"] = cursor
+        response = httpx.get(f"{BASE_URL}/api/v1/users/", params=params)
+        assert response.status_code == 200
+        users.extend(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    emails = [u["email"] for u in users]
+    assert emails == sorted(emails)
+    assert len(emails) == len(set(emails))
+
+# ---------- QUERY BUDGET TESTS ----------
+# Most queries one call to each /api/v1 route may run, as reported by the
+# server in X-DB-Query-Count. List routes are called with includes and a
+# full page so per-row lookups (N+1s) push them over budget.
+QUERY_BUDGETS = {
+    "POST /api/v1/auth/login": 1,
+    "GET /api/v1/auth/me": 1,
+    "GET /api/v1/auth/protected": 1,
+    "GET /api/v1/auth/admin-only": 1,
+    "GET /api/v1/auth/principal-cache": 1,
+    "GET /api/v1/auth/password-hashing": 1,
+    "POST /api/v1/users/": 3,
+    "GET /api/v1/users/": 1,
+    "GET /api/v1/users/{user_id}": 1,
+    "PUT /api/v1/users/{user_id}": 3,
+    "DELETE /api/v1/users/{user_id}": 2,
+    "POST /api/v1/projects/": 3,
+    "GET /api/v1/projects/": 1,
+    "GET /api/v1/projects/{project_id}": 1,
+    "POST /api/v1/tasks/": 3,
+    "GET /api/v1/tasks/": 4,
+    "GET /api/v1/tasks/search": 3,
+    "GET /api/v1/tasks/export": 1,
+    "POST /api/v1/tasks/import": 4,
+    "GET /api/v1/tasks/facets": 1,
+    "GET /api/v1/tasks/stream": 0,
+    "GET /api/v1/tasks/changes": 2,
+    "DELETE /api/v1/tasks/bulk": 3,
+    "PUT /api/v1/tasks/bulk/status": 1,
+    "GET /api/v1/tasks/{task_id}": 4,
+    "PUT /api/v1/tasks/{task_id}": 3,
+    "DELETE /api/v1/tasks/{task_id}": 5,
+    "POST /api/v1/labels/": 3,
+    "GET /api/v1/labels/": 1,
+    "GET /api/v1/stats/": 4,
+    "POST /api/v1/batch": 5,
+}
+
+
+class QueryBudget:
+    """``query_budget(route, response)`` asserts the response ran no more
+    queries than ``QUERY_BUDGETS[route]``; returns the response. Requests go
+    through ``query_budget.client``, which sends the debug flag."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def __call__(self, route, response):
+        assert response.status_code < 400, f"{route}: {response.status_code} {response.text}"
+        count = int(response.headers["x-db-query-count"])
+        assert count <= QUERY_BUDGETS[route], f"{route} ran {count} queries, budget {QUERY_BUDGETS[route]}"
+        return response
+
+
+@pytest.fixture
+def query_budget():
+    with httpx.Client(headers=QUERY_DEBUG_HEADERS) as client:
+        yield QueryBudget(client)
+
+@pytest.mark.queries
+def test_every_api_route_has_a_query_budget():  # TC-QRY-001
+    paths = httpx.get(f"{BASE_URL}/api/v1/openapi.json").json()["paths"]
+    routes = {f"{method.upper()} {path}" for path, methods in paths.items() if path.startswith("/api/v1/") for method in methods}
+    assert routes == set(QUERY_BUDGETS)
+
+@pytest.mark.queries
+def test_api_routes_stay_within_query_budgets(query_budget):  # TC-QRY-002
+    api = query_budget.client
+    unique = int(datetime.now().timestamp() * 1000)
+    token = get_token_for_user("admin@example.com", "admin123")
+    auth = {"Authorization": f"Bearer {token}"}
+    query_budget("POST /api/v1/auth/login", api.post(
+        f"{BASE_URL}/api/v1/auth/login", data={"username": "admin@example.com", "password": "admin123"}))
+    for route in ("me", "protected", "admin-only", "principal-cache", "password-hashing"):
+        query_budget(f"GET /api/v1/auth/{route}", api.get(f"{BASE_URL}/api/v1/auth/{route}", headers=auth))
+
+    user = query_budget("POST /api/v1/users/", api.post(f"{BASE_URL}/api/v1/users/", headers=auth, json={
+        "email": f"budget-{unique}@example.com", "name": "Budget", "password": "budget123"})).json()
+    query_budget("GET /api/v1/users/", api.get(f"{BASE_URL}/api/v1/users/", params={"limit": 100}))
+    query_budget("GET /api/v1/users/{user_id}", api.get(f"{BASE_URL}/api/v1/users/{user['id']}"))
+    query_budget("PUT /api/v1/users/{user_id}", api.put(
+        f"{BASE_URL}/api/v1/users/{user['id']}", headers=auth, json={"name": "Budget 2", "version": user["version"]}))
+    query_budget("DELETE /api/v1/users/{user_id}", api.delete(f"{BASE_URL}/api/v1/users/{user['id']}", headers=auth))
+
+    query_budget("POST /api/v1/projects/", api.post(
+        f"{BASE_URL}/api/v1/projects/", json={"name": f"Budget {unique}", "owner_id": 1}))
+    query_budget("GET /api/v1/projects/", api.get(f"{BASE_URL}/api/v1/projects/", params={"limit": 100}))
+    query_budget("GET /api/v1/projects/{project_id}", api.get(f"{BASE_URL}/api/v1/projects/1"))
+    query_budget("POST /api/v1/labels/", api.post(f"{BASE_URL}/api/v1/labels/", json={"name": f"budget-{unique}"}))
+    query_budget("GET /api/v1/labels/", api.get(f"{BASE_URL}/api/v1/labels/", params={"with_counts": True}))
+
+    task = query_budget("POST /api/v1/tasks/", api.post(
+        f"{BASE_URL}/api/v1/tasks/", json={"title": "Budget task", "project_id": 1})).json()
+    ids = [create_task(title=f"Budget {i}")["id"] for i in range(10)]
+    include = {"include": "project,assignee,labels"}
+    query_budget("GET /api/v1/tasks/", api.get(f"{BASE_URL}/api/v1/tasks/", params={"limit": 100, **include}))
+    query_budget("GET /api/v1/tasks/search", api.get(
+        f"{BASE_URL}/api/v1/tasks/search", params={"q": "budget", "limit": 100, **include}))
+    query_budget("GET /api/v1/tasks/export", api.get(f"{BASE_URL}/api/v1/tasks/export"))
+    query_budget("POST /api/v1/tasks/import", api.post(
+        f"{BASE_URL}/api/v1/tasks/import", content='{"title": "Imported budget", "project_id": 1}\n'))
+    query_budget("GET /api/v1/tasks/facets", api.get(f"{BASE_URL}/api/v1/tasks/facets"))
+    with api.stream("GET", f"{BASE_URL}/api/v1/tasks/stream") as stream:
+        query_budget("GET /api/v1/tasks/stream", stream)
+    query_budget("GET /api/v1/tasks/{task_id}", api.get(f"{BASE_URL}/api/v1/tasks/{task['id']}", params=include))
+    query_budget("PUT /api/v1/tasks/{task_id}", api.put(
+        f"{BASE_URL}/api/v1/tasks/{task['id']}", json={"title": "Budget task 2", "project_id": 1, "version": task["version"]}))
+    query_budget("PUT /api/v1/tasks/bulk/status", api.put(
+        f"{BASE_URL}/api/v1/tasks/bulk/status", params={"new_status": "done"}, json=ids))
+    query_budget("DELETE /api/v1/tasks/bulk", api.request("DELETE", f"{BASE_URL}/api/v1/tasks/bulk", json=ids))
+    query_budget("DELETE /api/v1/tasks/{task_id}", api.delete(f"{BASE_URL}/api/v1/tasks/{task['id']}"))
+    query_budget("GET /api/v1/tasks/changes", api.get(f"{BASE_URL}/api/v1/tasks/changes", params={"limit": 100}))
+    query_budget("GET /api/v1/stats/", api.get(f"{BASE_URL}/api/v1/stats/"))
+    # The sum of its sub-requests, with the principal looked up at most once.
+    query_budget("POST /api/v1/batch", api.post(f"{BASE_URL}/api/v1/batch", headers=auth, json=[
+        {"path": "/api/v1/auth/me"}, {"path": "/api/v1/auth/protected"},
+        {"path": "/api/v1/users/?limit=100"}, {"path": "/api/v1/projects/?limit=100"},
+    ]))
+
+# ---------- STATS TESTS ----------
+@pytest.mark.stats
+def test_stats_track_task_writes():  # TC-STS-001
+    before = httpx.get(f"{BASE_URL}/api/v1/stats/").json()
+    task = create_task(priority="high", status="in_progress")
+
+    after_create = httpx.get(f"{BASE_URL}/api/v1/stats/").json()
+    assert after_create["total_tasks"] == before["total_tasks"] + 1
+    assert after_create["tasks_by_status"]["in_progress"] == before["tasks_by_status"]["in_progress"] + 1
+    assert after_create["tasks_by_priority"]["high"] == before["tasks_by_priority"]["high"] + 1
+
+    assert httpx.delete(f"{BASE_URL}/api/v1/tasks/{task['id']}").status_code == 200
+    assert httpx.get(f"{BASE_URL}/api/v1/stats/").json() == before
+
+@pytest.mark.stats
+def test_stats_match_list_endpoints():  # TC-STS-002
+    stats = httpx.get(f"{BASE_URL}/api/v1/stats/").json()
+    tasks = collect_task_pages({"limit": 100})
+    assert stats["total_tasks"] == len(tasks)
+    assert sum(stats["tasks_by_status"].values()) == len(tasks)
+    assert stats["tasks_by_status"]["done"] == len([t for t in tasks if t["status"] == "done"])
+
 # ---------- USER MANAGEMENT TESTS ----------
 @pytest.mark.users
 def test_admin_can_create_user():  # TC-USR-001 / SC-USR-017
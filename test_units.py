@@ -0,0 +1,242 @@
+# In-process unit tests: these exercise app modules directly and need no
+# running server (test_api.py covers the API over HTTP).
+import asyncio
+import os
+import signal
+import tracemalloc
+from datetime import datetime
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, insert, select
+from sqlmodel import Session, SQLModel
+from app.core import batch, changes, importer
+from app.core.admission import AdmissionController, ConcurrencyLimiter, Overloaded, TokenBuckets
+from app.core.auth import PrincipalCache, principal_claims
+from app.core.batch import BatchDispatcher
+from app.core.export import NdjsonEncoder, stream_export
+from app.core.hashing import PasswordHasher, build_context
+from app.core.migrations import LATEST_VERSION, migrate
+from app.core.replicas import PRIMARY_COOKIE, ReadRouter, Replica
+from app.core.search import search_tasks_query
+from app.core.stats import StatsCache
+from app.models.enums import ExportFormat, TaskStatus
+from app.models.models import Task, User
+from app.models.schemas import BatchRequestItem
+
+
+@pytest.mark.default
+def test_read_router_prefers_healthy_replicas(tmp_path):  # SC-DEF-012
+    def replica(name, path):
+        return Replica(name, create_engine(f"sqlite:///{path}"), lambda: None)
+
+    healthy = replica("healthy", tmp_path / "replica.db")
+    broken = replica("broken", tmp_path / "missing" / "replica.db")
+    router = ReadRouter([broken, healthy])
+    assert [router.pick(None) for _ in range(3)] == [healthy, healthy, healthy]
+    assert not broken.healthy and healthy.healthy and healthy.lag == 0
+
+    assert router.pick(f"{PRIMARY_COOKIE}={datetime.now().timestamp() + 5}") is None
+    assert router.pick(f"{PRIMARY_COOKIE}={datetime.now().timestamp() - 5}") is healthy
+    assert ReadRouter([broken]).pick(None) is None
+    assert ReadRouter([]).pick(None) is None
+
+@pytest.mark.default
+def test_password_hasher_survives_fork():  # SC-DEF-013
+    hasher = PasswordHasher(build_context(4), max_workers=2, max_queue=8)
+    hashed = hasher.hash_sync("secret")
+    pid = os.fork()
+    if pid == 0:
+        # The parent's pool threads are gone; without the reset this blocks forever.
+        signal.alarm(10)
+        hasher.reset_after_fork()
+        os._exit(0 if hasher.verify_sync("secret", hashed) else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+@pytest.mark.default
+def test_admission_queues_then_sheds_load():  # SC-DEF-014
+    async def scenario():
+        limiter = ConcurrencyLimiter("test", limit=1, max_queue=1, max_wait=0.2)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as full:
+            await limiter.acquire()
+        assert full.value.reason == "queue_full"
+        limiter.release(0.05)
+        await waiter
+        assert limiter.in_use == 1
+
+        limiter.hold_seconds = 1.0  # the queue could not drain in time
+        with pytest.raises(Overloaded) as late:
+            await limiter.acquire()
+        assert late.value.reason == "deadline"
+        limiter.hold_seconds = 0.01
+        with pytest.raises(Overloaded) as expired:
+            await limiter.acquire()
+        assert expired.value.reason == "timeout"
+        limiter.release(0.0)
+        assert (limiter.in_use, limiter.queued) == (0, 0)
+
+    asyncio.run(scenario())
+    buckets = TokenBuckets("test", rate=1, burst=2)
+    assert [buckets.take("client") == 0 for _ in range(3)] == [True, True, False]
+    assert buckets.take("other") == 0
+
+@pytest.mark.default
+def test_batch_sub_requests_pass_admission(monkeypatch):  # SC-DEF-018
+    app = FastAPI()
+
+    @app.get("/api/v1/slow")
+    async def slow():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    controller = AdmissionController()
+    controller.ip_buckets = TokenBuckets("ip", rate=0.001, burst=3)
+    controller.route_limiters = {"GET /api/v1/slow": ConcurrencyLimiter("GET /api/v1/slow", 1, 0, 0.1)}
+    monkeypatch.setattr(batch, "admission", controller)
+    scope = {"type": "http", "method": "POST", "path": "/api/v1/batch", "headers": [], "client": ("10.0.0.1", 1)}
+    items = [BatchRequestItem(path="/api/v1/slow") for _ in range(4)]
+
+    results = asyncio.run(BatchDispatcher(app, scope).run(items))
+    # One item holds the route's only slot, two find no queue room and the
+    # last is over the caller's rate.
+    assert [result["status"] for result in results] == [200, 503, 503, 429]
+    assert all("Retry-After" in result["headers"] for result in results[1:])
+    assert controller.route_limiters["GET /api/v1/slow"].in_use == 0
+
+def export_peak_memory(path, rows):
+    # Streams an export of `rows` tasks from a scratch SQLite database and
+    # returns (bytes exported, peak traced allocation while streaming).
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(insert(Task), [
+            {"title": f"Task {n}", "description": "x" * 200, "status": "TODO", "priority": "MEDIUM",
+             "project_id": 1, "created_at": now, "updated_at": now, "version": 1}
+            for n in range(rows)
+        ])
+    columns = Task.__table__.columns
+    encoder = NdjsonEncoder([column.name for column in columns])
+    tracemalloc.start()
+    try:
+        exported = sum(len(chunk) for chunk in stream_export(engine, select(*columns), encoder, batch_size=500))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        engine.dispose()
+    return exported, peak
+
+@pytest.mark.tasks
+def test_task_export_memory_stays_flat(tmp_path):  # TC-TSK-013
+    small_bytes, small_peak = export_peak_memory(tmp_path / "small.db", 2_000)
+    large_bytes, large_peak = export_peak_memory(tmp_path / "large.db", 20_000)
+    assert large_bytes > 9 * small_bytes
+    assert large_peak < 2 * small_peak, (small_peak, large_peak)
+
+@pytest.mark.tasks
+def test_task_import_splits_chunks_and_rejects_long_lines():  # TC-TSK-023
+    body = b'{"title": "First", "project_id": 1}\n{"title": "%s", "project_id": 1}\n{"title": "Last", "project_id": 1}' % (b"x" * 100)
+
+    async def source():
+        for start in range(0, len(body), 7):
+            yield body[start:start + 7]
+
+    async def collect():
+        return [line async for line in importer._lines(source(), 64)]
+
+    lines = asyncio.run(collect())
+    assert len(lines) == 3 and lines[0] == body.split(b"\n")[0] + b"\n" and lines[2] == body.split(b"\n")[2]
+    assert len(lines[1]) == 66  # cut off one byte past the limit, plus the newline
+
+    task_importer = importer.TaskImporter(ExportFormat.NDJSON, {1}, set(), max_line_bytes=64)
+    for line in lines:
+        task_importer.feed_bytes(line)
+    assert [row["title"] for row in task_importer.pending] == ["First", "Last"]
+    assert task_importer.errors == [{"line": 2, "error": "Line longer than 64 bytes"}]
+
+@pytest.mark.tasks
+def test_tombstone_purge_runs_on_a_schedule(monkeypatch):  # TC-TSK-021
+    purges = []
+    monkeypatch.setattr(changes, "_purge_committed", lambda: purges.append(1) or 0)
+
+    async def scenario():
+        purger = asyncio.create_task(changes.purge_tombstones_periodically(0.01))
+        await asyncio.sleep(0.1)
+        purger.cancel()
+
+    asyncio.run(scenario())
+    assert len(purges) >= 3
+
+@pytest.mark.auth
+def test_principal_cache_drops_loads_that_raced_an_invalidation():  # TC-AUTH-013
+    cache = PrincipalCache(maxsize=2, ttl_seconds=60)
+    user = User(id=1, email="a@example.com", name="A", password_hash="x")
+    assert "role" not in principal_claims(user)
+
+    # The user was deactivated while their row was being loaded.
+    generation = cache.generation()
+    cache.invalidate("a@example.com")
+    cache.put("a@example.com", user, generation)
+    cache.put("b@example.com", user, generation)
+    assert cache.get("a@example.com") is None
+    assert cache.get("b@example.com") is user
+
+    cache.put("a@example.com", user, cache.generation())
+    assert cache.get("a@example.com") is user
+
+    # Forgotten invalidations still keep loads that started before them out.
+    generation = cache.generation()
+    cache.invalidate("c@example.com", "d@example.com", "e@example.com")
+    cache.put("c@example.com", user, generation)
+    assert cache.get("c@example.com") is None
+
+@pytest.mark.stats
+def test_stats_load_during_a_write_is_not_cached():  # TC-STS-003
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    stats = StatsCache()
+    with Session(engine) as session:
+        task = Task(title="Counted once", project_id=1)
+        with stats.writing():
+            session.add(task)
+            session.commit()
+            session.refresh(task)
+            # A dashboard read lands between the commit and the adjustment.
+            assert stats.get(session)["total_tasks"] == 1
+            stats.task_created(task)
+        assert stats.get(session)["total_tasks"] == 1
+        assert stats.get(session)["tasks_by_status"][TaskStatus.TODO.value] == 1
+    engine.dispose()
+
+def test_migrate_adopts_a_pre_migration_database(tmp_path):  # SC-DEF-017
+    # A database created before migrations were tracked: the tables, but none
+    # of the indexes or full-text search added to them since.
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    SQLModel.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE task_fts")
+        for trigger in ("insert", "delete", "update"):
+            connection.exec_driver_sql(f"DROP TRIGGER task_fts_{trigger}")
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.exec_driver_sql(f"DROP INDEX {index.name}")
+        connection.execute(insert(Task), [{
+            "title": "Legacy authentication task", "status": "TODO", "priority": "MEDIUM",
+            "project_id": 1, "created_at": now, "updated_at": now, "version": 1,
+        }])
+
+    assert migrate(engine) == list(range(1, LATEST_VERSION + 1))
+    with engine.connect() as connection:
+        indexes = set(connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+    assert {index.name for table in SQLModel.metadata.sorted_tables for index in table.indexes} <= indexes
+    query, order_by = search_tasks_query("sqlite", "auth")
+    with Session(engine) as session:
+        assert [task.title for task, _ in session.exec(query.order_by(*order_by))] == ["Legacy authentication task"]
+        session.add(Task(title="New authentication flow", project_id=1))
+        session.commit()
+        assert len(session.exec(query).all()) == 2
+    engine.dispose()